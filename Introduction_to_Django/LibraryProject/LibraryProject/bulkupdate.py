@@ -0,0 +1,174 @@
+"""
+Bulk UPDATEs for admin actions.
+
+bulk_update() turns an action's queryset into a single UPDATE ... WHERE,
+so no instances are loaded and nothing is counted first. An action run
+on "select all" across more than BACKGROUND_THRESHOLD rows is stored as
+a BulkUpdateJob instead, and the request returns at once.
+
+`manage.py process_bulk_updates` leases one job at a time and updates
+CHUNK_SIZE rows per transaction in primary key order, pausing PAUSE
+seconds between chunks, so the table's write lock is never held for
+long. Each chunk's transaction also records the last primary key done
+and renews the lease. A worker that dies mid-job leaves the job leased;
+once LEASE_SECONDS have passed another worker picks it up and carries on
+after that key, so no row is skipped and finished chunks are not redone.
+"""
+import datetime
+import logging
+import pickle
+import time
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from bookshelf.models import BulkUpdateJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKGROUND_THRESHOLD': 10000,
+    'CHUNK_SIZE': 5000,
+    'PAUSE': 0.01,
+    'LEASE_SECONDS': 300,
+}
+
+
+class LeaseLost(Exception):
+    """The job was reclaimed by another worker while this one ran it."""
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'BULK_UPDATE', {}))
+    return config
+
+
+def update_in_chunks(queryset, values, chunk_size=None, pause=None, log=None, start_after=None, progress=None):
+    """
+    queryset.update(**values), CHUNK_SIZE rows per transaction. Chunks are
+    primary key ranges, so each UPDATE is a range scan and never carries a
+    long IN list. Only rows after start_after are touched; progress(last,
+    updated) runs inside each chunk's transaction (last is None for the
+    final chunk). Returns the number of rows updated.
+    """
+    config = get_config()
+    chunk_size = chunk_size or config['CHUNK_SIZE']
+    pause = config['PAUSE'] if pause is None else pause
+    queryset = queryset.order_by()
+    updated = 0
+    last = start_after
+    while True:
+        remaining = queryset if last is None else queryset.filter(pk__gt=last)
+        bound = list(remaining.order_by('pk').values_list('pk', flat=True)[chunk_size - 1:chunk_size])
+        chunk = remaining.filter(pk__lte=bound[0]) if bound else remaining
+        with transaction.atomic(using=queryset.db):
+            updated += chunk.update(**values)
+            if progress:
+                progress(bound[0] if bound else None, updated)
+        if log:
+            log(f'Updated {updated} rows')
+        if not bound:
+            return updated
+        last = bound[0]
+        time.sleep(pause)
+
+
+def enqueue(queryset, values):
+    """Store queryset.update(**values) for process_bulk_updates."""
+    return BulkUpdateJob.objects.create(
+        model=queryset.model._meta.label_lower,
+        # Pickling .query is how Django documents saving a queryset for later
+        query=pickle.dumps(queryset.query),
+        values=values,
+    )
+
+
+def job_queryset(job):
+    model = apps.get_model(job.model)
+    queryset = model._base_manager.all()
+    queryset.query = pickle.loads(job.query)
+    return queryset
+
+
+def claim_job(lease_seconds):
+    """Lease the oldest pending job, or one whose lease expired, to this worker."""
+    now = timezone.now()
+    available = Q(status=BulkUpdateJob.PENDING) | Q(status=BulkUpdateJob.RUNNING, locked_until__lt=now)
+    job_id = BulkUpdateJob.objects.filter(available).order_by('id').values_list('id', flat=True).first()
+    if job_id is None:
+        return None
+    claim = uuid.uuid4()
+    claimed = BulkUpdateJob.objects.filter(available, id=job_id).update(
+        status=BulkUpdateJob.RUNNING, claim=claim, locked_until=now + datetime.timedelta(seconds=lease_seconds),
+    )
+    # Another worker took it between the SELECT and the UPDATE: try again
+    return BulkUpdateJob.objects.get(claim=claim) if claimed else claim_job(lease_seconds)
+
+
+def run_job(job, lease_seconds, log=None):
+    """Apply job from where it stopped; returns the rows updated by this run."""
+    ours = BulkUpdateJob.objects.filter(id=job.id, claim=job.claim)
+    done_before = job.rows_updated
+
+    def progress(last, updated):
+        fields = {'rows_updated': done_before + updated,
+                  'locked_until': timezone.now() + datetime.timedelta(seconds=lease_seconds)}
+        if last is None:
+            fields.update(status=BulkUpdateJob.DONE, finished_at=timezone.now(), claim=None, locked_until=None)
+        else:
+            fields['last_pk'] = last
+        if not ours.update(**fields):
+            raise LeaseLost(f'Bulk update job {job.id} was reclaimed')  # rolls back this chunk
+
+    return update_in_chunks(job_queryset(job), job.values, log=log, start_after=job.last_pk, progress=progress)
+
+
+def run_worker(once=False, idle_sleep=1.0, log=None):
+    """
+    Run jobs one at a time. With once, return when none are left;
+    otherwise poll every idle_sleep seconds. Returns (done, failed) jobs.
+    """
+    config = get_config()
+    totals = [0, 0]
+    while True:
+        job = claim_job(config['LEASE_SECONDS'])
+        if job is None:
+            if once:
+                return tuple(totals)
+            time.sleep(idle_sleep)
+            continue
+        try:
+            updated = run_job(job, config['LEASE_SECONDS'], log=log)
+        except LeaseLost:
+            logger.warning('Bulk update job %d was taken over by another worker', job.id)
+            continue
+        except Exception as exc:
+            logger.exception('Bulk update job %d failed', job.id)
+            BulkUpdateJob.objects.filter(id=job.id, claim=job.claim).update(
+                status=BulkUpdateJob.FAILED, last_error=repr(exc), claim=None, locked_until=None,
+            )
+            totals[1] += 1
+            continue
+        logger.info('Bulk update job %d of %s set %s on %d rows', job.id, job.model, job.values, updated)
+        totals[0] += 1
+
+
+def bulk_update(queryset, values, select_across=False):
+    """
+    Apply values to every row of queryset. Returns (rows, background):
+    rows updated, or for a queued job a lower bound on the rows
+    selected.
+    """
+    if select_across:
+        # Only "select all" can be large; stop counting past the threshold
+        threshold = get_config()['BACKGROUND_THRESHOLD']
+        selected = queryset.order_by()[:threshold + 1].count()
+        if selected > threshold:
+            enqueue(queryset, values)
+            return selected, True
+    return queryset.update(**values), False
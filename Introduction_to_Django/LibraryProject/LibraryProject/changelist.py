@@ -0,0 +1,188 @@
+"""
+Admin changelist helpers for large tables.
+
+CachedFacetFilter replaces list_filter's default AllValuesFieldListFilter.
+The default runs SELECT DISTINCT over the whole table on every
+changelist load. This one runs a single GROUP BY (an index-only scan
+when the column is indexed), keeps the FACET_LIMIT most common values
+with their counts, and caches them. After FACET_TTL seconds the cached
+counts are still served while one background thread recomputes them, so
+only the very first load pays for the GROUP BY. Counts are for the whole
+table, not the current filter.
+
+EstimatedCountPaginator replaces the changelist's COUNT(*) with a count
+over a LIMIT of COUNT_CAP + 1, so the scan stops early; past the cap the
+total shows as "10,000+". Counts are cached for COUNT_TTL seconds, keyed
+by the query's SQL, so paging through the same filter counts once. With
+ESTIMATE_UNFILTERED on, an unfiltered list past the cap shows the
+planner's row estimate instead (PostgreSQL reltuples, SQLite
+sqlite_stat1 after ANALYZE). Pages are always bounded by the capped
+count, so a stale estimate can only change the displayed total, never
+hide rows.
+
+Pair it with show_full_result_count = False so the admin does not run a
+second, unfiltered COUNT(*).
+"""
+import hashlib
+
+import threading
+import time
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Count
+from django.utils.functional import cached_property
+from django.utils.translation import gettext as _
+
+DEFAULTS = {
+    'FACET_TTL': 300,
+    'FACET_LIMIT': 100,
+    'COUNT_TTL': 60,
+    'COUNT_CAP': 10000,
+    'ESTIMATE_UNFILTERED': False,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'ADMIN_CHANGELIST', {}))
+    return config
+
+
+class CachedFacetFilter(admin.AllValuesFieldListFilter):
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        # super() only built a lazy DISTINCT queryset; it is never run
+        self.facets = self.get_facets(model_admin.get_queryset(request))
+
+    def get_facets(self, queryset):
+        config = get_config()
+        key = f'admin-facets:{queryset.model._meta.label_lower}:{self.field_path}'
+        entry = cache.get(key)
+        if entry is None:
+            return self.refresh(queryset, key)
+        fresh_until, facets = entry
+        if fresh_until < time.time() and cache.add(f'{key}:refreshing', True, config['FACET_TTL']):
+            threading.Thread(target=self.refresh_in_background, args=(queryset, key), daemon=True).start()
+        return facets
+
+    def refresh(self, queryset, key):
+        config = get_config()
+        rows = (
+            queryset.order_by()
+            .values_list(self.field_path)
+            .annotate(count=Count('pk'))
+            .order_by('-count')[:config['FACET_LIMIT']]
+        )
+        facets = sorted(rows, key=lambda row: (row[0] is None, row[0]))
+        # Stale counts stay usable for ten TTLs while a refresh runs
+        cache.set(key, (time.time() + config['FACET_TTL'], facets), config['FACET_TTL'] * 10)
+        return facets
+
+    def refresh_in_background(self, queryset, key):
+        try:
+            self.refresh(queryset, key)
+        finally:
+            cache.delete(f'{key}:refreshing')
+            connections.close_all()  # this thread's own connections
+
+    def choices(self, changelist):
+        yield {
+            'selected': self.lookup_val is None and self.lookup_val_isnull is None,
+            'query_string': changelist.get_query_string(remove=[self.lookup_kwarg, self.lookup_kwarg_isnull]),
+            'display': _('All'),
+        }
+        for value, count in self.facets:
+            if value is None:
+                yield {
+                    'selected': bool(self.lookup_val_isnull),
+                    'query_string': changelist.get_query_string({self.lookup_kwarg_isnull: 'True'}, [self.lookup_kwarg]),
+                    'display': f'{self.empty_value_display} ({count})',
+                }
+                continue
+            value = str(value)
+            yield {
+                'selected': self.lookup_val is not None and value in self.lookup_val,
+                'query_string': changelist.get_query_string({self.lookup_kwarg: value}, [self.lookup_kwarg_isnull]),
+                'display': f'{value} ({count})',
+            }
+
+
+def estimate_rows(model, using):
+    """The database's own row estimate for model's table, or None."""
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+                row = cursor.fetchone()
+                if row and row[0] >= 0:
+                    return row[0]
+            elif connection.vendor == 'sqlite':
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+                if not cursor.fetchone():
+                    return None
+                # A partial index only counts the rows it covers
+                cursor.execute(f'PRAGMA index_list({connection.ops.quote_name(table)})')
+                partial = {row[1] for row in cursor.fetchall() if row[4]}
+                cursor.execute('SELECT idx, stat FROM sqlite_stat1 WHERE tbl = %s', [table])
+                for idx, stat in cursor.fetchall():
+                    if idx is None or idx not in partial:
+                        return int(stat.split()[0])
+    except DatabaseError:
+        return None
+    return None
+
+
+class CappedCount(int):
+    """A lower bound on the row count; renders as "10,000+"."""
+
+    def __str__(self):
+        return f'{int(self):,}+'
+
+
+class EstimatedCountPaginator(Paginator):
+    def is_unfiltered(self):
+        query = self.object_list.query
+        base = self.object_list.model._default_manager.all().query
+        return query.where == base.where and not query.combinator and not query.distinct
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, 'query'):
+            return super().count
+        count = self.capped_count(queryset)
+        # Only a total already past the cap is replaced, and only upwards
+        if isinstance(count, CappedCount) and get_config()['ESTIMATE_UNFILTERED'] and self.is_unfiltered():
+            estimate = estimate_rows(queryset.model, queryset.db)
+            if estimate is not None and estimate > count:
+                return estimate
+        return count
+
+    def capped_count(self, queryset):
+        config = get_config()
+        cap = config['COUNT_CAP']
+        try:
+            sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+        except EmptyResultSet:
+            return 0
+        key = 'admin-count:' + hashlib.md5(repr((queryset.db, sql, params)).encode()).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = queryset.order_by()[:cap + 1].count()
+            cache.set(key, count, config['COUNT_TTL'])
+        if count > cap:
+            return CappedCount(cap)
+        return count
+
+    def page(self, number):
+        """Like Paginator.page, without clamping the slice to an estimate."""
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
@@ -81,6 +81,29 @@ DATABASES = {
 }
 
 
+# Admin changelists on big tables (LibraryProject/changelist.py): filter
+# sidebars show the FACET_LIMIT most common values, cached FACET_TTL seconds;
+# lists are counted up to COUNT_CAP rows, cached COUNT_TTL seconds;
+# ESTIMATE_UNFILTERED shows the planner's estimate past the cap
+ADMIN_CHANGELIST = {
+    'FACET_TTL': 300,
+    'FACET_LIMIT': 100,
+    'COUNT_TTL': 60,
+    'COUNT_CAP': 10000,
+    'ESTIMATE_UNFILTERED': False,
+}
+
+# Admin bulk actions (LibraryProject/bulkupdate.py): "select all" over more
+# than BACKGROUND_THRESHOLD rows is queued as a BulkUpdateJob, which
+# `manage.py process_bulk_updates` applies CHUNK_SIZE rows at a time
+BULK_UPDATE = {
+    'BACKGROUND_THRESHOLD': 10000,
+    'CHUNK_SIZE': 5000,
+    'PAUSE': 0.01,
+    'LEASE_SECONDS': 300,  # a crashed worker's job is resumed after this
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -4,11 +4,52 @@ class Book(models.Model):
     title = models.CharField(max_length=200)
     author = models.CharField(max_length=100)
     publication_year = models.IntegerField()
+    is_classic = models.BooleanField(default=False)
     
     def __str__(self):
         return f"{self.title} by {self.author} ({self.publication_year})"
     
     class Meta:
         ordering = ['publication_year']
+        # Admin changelist: default sort (title) and the two filters
+        indexes = [
+            models.Index(fields=['title'], name='bookshelf_book_title_idx'),
+            models.Index(fields=['author'], name='bookshelf_book_author_idx'),
+            models.Index(fields=['publication_year'], name='bookshelf_book_year_idx'),
+        ]
         verbose_name = "Book"
-        verbose_name_plural = "Books"
\ No newline at end of file
+        verbose_name_plural = "Books"
+
+
+class BulkUpdateJob(models.Model):
+    """
+    A "select all" admin update too large to run in the request. The
+    action inserts it; process_bulk_updates applies it chunk by chunk,
+    recording the last primary key done so a restarted worker resumes
+    there (LibraryProject/bulkupdate.py). Setting a failed job back to
+    pending resumes it the same way.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [(PENDING, "Pending"), (RUNNING, "Running"), (DONE, "Done"), (FAILED, "Failed")]
+
+    model = models.CharField(max_length=100)
+    query = models.BinaryField()
+    values = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    last_pk = models.BigIntegerField(null=True, blank=True)
+    rows_updated = models.PositiveIntegerField(default=0)
+    claim = models.UUIDField(null=True, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "id"], name="bookshelf_bulk_update_idx")]
+
+    def __str__(self):
+        return f"{self.model} {self.values} ({self.status})"
@@ -1,3 +1,157 @@
-from django.test import TestCase
+import datetime
+import io
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from LibraryProject import bulkupdate
+from .models import Book, BulkUpdateJob
+
+
+class BookAdminChangelistTestCase(TestCase):
+    """
+    Test suite for the BookAdmin filter sidebar and paginator.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser(username='admin', password='password123'))
+        Book.objects.bulk_create(
+            Book(title=f'Book {i}', author=f'Author {i % 3}', publication_year=2000 + i % 2) for i in range(30)
+        )
+        self.url = reverse('admin:bookshelf_book_changelist')
+
+    def test_filter_sidebar_counts_are_cached(self):
+        """Ensure the sidebar lists counted values and skips the GROUP BY once cached."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Author 0 (10)')
+        self.assertContains(response, '2001 (15)')
+        self.assertEqual(len([q for q in queries.captured_queries if 'GROUP BY' in q['sql']]), 2)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        self.assertFalse([q for q in queries.captured_queries if 'GROUP BY' in q['sql'] or 'DISTINCT' in q['sql']])
+
+    def test_stale_counts_are_served_while_refreshing(self):
+        """Ensure expired counts are still shown and refreshed off the request."""
+        self.client.get(self.url)
+        key = 'admin-facets:bookshelf.book:author'
+        _, facets = cache.get(key)
+        cache.set(key, (0, facets))
+        with mock.patch('LibraryProject.changelist.threading.Thread') as thread:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.url)
+        self.assertContains(response, 'Author 0 (10)')
+        self.assertFalse([q for q in queries.captured_queries if 'GROUP BY "bookshelf_book"."author"' in q['sql']])
+        thread.assert_called_once()
+
+    def test_unfiltered_list_is_counted_by_default(self):
+        """Ensure the unfiltered changelist gets an exact capped count unless estimates are on."""
+        Book.objects.filter(author='Author 2').delete()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        counts = [q['sql'] for q in queries.captured_queries if 'COUNT(*)' in q['sql']]
+        self.assertEqual(len(counts), 1)
+        self.assertIn('LIMIT', counts[0])
+        self.assertEqual(response.context['cl'].result_count, 20)
+
+    @override_settings(ADMIN_CHANGELIST={'COUNT_CAP': 26, 'ESTIMATE_UNFILTERED': True})
+    def test_estimate_only_raises_the_displayed_total(self):
+        """Ensure a stale low estimate neither shrinks the total nor cuts the page short."""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            cursor.execute("UPDATE sqlite_stat1 SET stat = '3 1' WHERE tbl = 'bookshelf_book'")
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['cl'].result_count, 26)
+        self.assertEqual(len(response.context['cl'].result_list), 25)
+        response = self.client.get(self.url, {'p': 2})
+        self.assertEqual(len(response.context['cl'].result_list), 5)
+
+        cache.clear()
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE sqlite_stat1 SET stat = '1000 1' WHERE tbl = 'bookshelf_book'")
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['cl'].result_count, 1000)
+        self.assertEqual(len(response.context['cl'].result_list), 25)
+
+    @override_settings(ADMIN_CHANGELIST={'COUNT_CAP': 5})
+    def test_filtered_count_is_capped_and_cached(self):
+        """Ensure a filtered count stops at the cap, renders as "5+" and is reused."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'author': 'Author 1'})
+        counts = [q['sql'] for q in queries.captured_queries if 'COUNT(*)' in q['sql']]
+        self.assertEqual(len(counts), 1)
+        self.assertIn('LIMIT 6', counts[0])
+        self.assertContains(response, '5+ results')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {'author': 'Author 1'})
+        self.assertFalse([q for q in queries.captured_queries if 'COUNT(*)' in q['sql']])
+
+
+class BookAdminActionTestCase(TestCase):
+    """
+    Test suite for the is_classic bulk actions.
+    """
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser(username='admin', password='password123'))
+        Book.objects.bulk_create(Book(title=f'Book {i}', author='Author', publication_year=2000) for i in range(30))
+        self.url = reverse('admin:bookshelf_book_changelist')
+
+    def updates(self, queries):
+        return [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+
+    def test_mark_as_classic_is_one_update(self):
+        """Ensure the action writes the selection with a single UPDATE."""
+        ids = list(Book.objects.values_list('pk', flat=True)[:3])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'action': 'mark_as_classic', '_selected_action': ids}, follow=True)
+        self.assertContains(response, '3 books marked as classics.')
+        self.assertEqual(len(self.updates(queries)), 1)
+        self.assertEqual(set(Book.objects.filter(is_classic=True).values_list('pk', flat=True)), set(ids))
+
+        self.client.post(self.url, {'action': 'unmark_as_classic', '_selected_action': ids[:1]})
+        self.assertEqual(Book.objects.filter(is_classic=True).count(), 2)
+
+    @override_settings(BULK_UPDATE={'BACKGROUND_THRESHOLD': 5, 'CHUNK_SIZE': 4, 'PAUSE': 0, 'LEASE_SECONDS': 300})
+    def test_select_all_over_threshold_is_queued(self):
+        """Ensure a large "select all" is stored as a job, then updated in chunks by the worker."""
+        data = {'action': 'mark_as_classic', '_selected_action': [1], 'select_across': '1'}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data, follow=True)
+        self.assertContains(response, 'More than 5 books are being marked as classics in the background.')
+        self.assertEqual(self.updates(queries), [])
+        self.assertFalse(Book.objects.filter(is_classic=True).exists())
+        job = BulkUpdateJob.objects.get()
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command('process_bulk_updates', '--once', stdout=io.StringIO())
+        self.assertEqual(len([sql for sql in self.updates(queries) if 'bookshelf_book"' in sql]), 8)
+        self.assertEqual(Book.objects.filter(is_classic=True).count(), 30)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.rows_updated), (BulkUpdateJob.DONE, 30))
+
+    @override_settings(BULK_UPDATE={'CHUNK_SIZE': 4, 'PAUSE': 0})
+    def test_interrupted_job_resumes_after_last_chunk(self):
+        """Ensure a job left behind by a dead worker is reclaimed once its lease runs out."""
+        job = bulkupdate.enqueue(Book.objects.all(), {'is_classic': True})
+        bulkupdate.claim_job(lease_seconds=300)
+        pks = list(Book.objects.order_by('pk').values_list('pk', flat=True))
+        BulkUpdateJob.objects.filter(pk=job.pk).update(
+            last_pk=pks[7], rows_updated=8, locked_until=timezone.now() - datetime.timedelta(seconds=1),
+        )
+        self.assertEqual(bulkupdate.run_worker(once=True), (1, 0))
+        # Rows before last_pk belong to chunks the dead worker had committed
+        self.assertFalse(Book.objects.filter(pk__lte=pks[7], is_classic=True).exists())
+        self.assertEqual(Book.objects.filter(is_classic=True).count(), 22)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.rows_updated), (BulkUpdateJob.DONE, 30))
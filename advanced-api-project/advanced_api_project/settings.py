@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -51,8 +53,40 @@ REST_FRAMEWORK = {
     ]
 }
 
+# Cache
+# LocMemCache is per process; use a shared backend (Redis, Memcached)
+# when running several workers so Book cache invalidation reaches all of them.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'advanced-api-project',
+    }
+}
+
+# Seconds a cached /api/books/ response may live before it is recomputed
+BOOK_CACHE_TIMEOUT = 300
+
+# Seconds a BookChange entry must age before /books/changes/ hands it out,
+# so a lower id committed late is not skipped. None: 0 on SQLite (one
+# writer at a time), 5 elsewhere. Keep it above the longest write
+# transaction plus clock skew between app servers.
+BOOK_CHANGES_VISIBILITY_WINDOW = None
+
+# Prometheus metrics (api/metrics.py), served at /metrics.
+# Every worker on a host writes its snapshot into DIR; a scrape of any
+# worker returns the sum. Scrapers send "Authorization: Bearer <TOKEN>";
+# staff sessions need no token, and with TOKEN None only staff get in.
+METRICS = {
+    'DIR': Path(tempfile.gettempdir()) / 'advanced_api_project_metrics',
+    'FLUSH_INTERVAL': 5,  # seconds between snapshot writes per worker
+    'TOKEN': os.environ.get('DJANGO_METRICS_TOKEN'),
+}
+
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',  # first, so latency covers the whole stack
+    'api.replica.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -92,6 +126,23 @@ DATABASES = {
     }
 }
 
+# Read replica routing and its local replay stand-in, see api/replica.py
+REPLICA = {
+    'ENABLED': os.environ.get('DJANGO_READ_REPLICA') == '1',
+    'ALIAS': 'replica',
+    'STICKY_SECONDS': 5,
+    'REPLAY': True,
+    'LAG': float(os.environ.get('DJANGO_REPLICA_LAG', 0)),
+}
+if REPLICA['ENABLED']:
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['api.replica.PrimaryReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -0,0 +1,69 @@
+"""
+Async (ASGI) read views for the Book API.
+
+They reuse BookListView's filtering, search, ordering and sparse
+fieldsets to build the queryset (which costs no query), then evaluate it
+with Django's async ORM, so under ASGI a request waiting on a slow client
+does not pin a worker thread. They serve the same payloads as the sync
+views but skip the response cache.
+"""
+from django.http import HttpResponseNotModified, JsonResponse
+from django.views import View
+from rest_framework.exceptions import ValidationError
+
+from .conditional import none_match
+from .models import Book, book_etag
+from .serializers import BookSerializer
+from .views import BookListView
+
+
+def build_list_queryset(request):
+    """
+    Run BookListView's filter backends and ?fields= handling against
+    request. Returns (queryset, requested_fields) without touching the DB.
+    """
+    view = BookListView()
+    view.setup(request)
+    view.request = view.initialize_request(request)
+    view.format_kwarg = None
+    return view.filter_queryset(view.get_queryset()), view.get_requested_fields()
+
+
+class AsyncBookListView(View):
+    """
+    GET: Same as BookListView, evaluated with the async ORM.
+    """
+    replica_reads = True
+
+    async def get(self, request):
+        try:
+            queryset, fields = build_list_queryset(request)
+        except ValidationError as exc:
+            return JsonResponse(exc.detail, status=400, safe=False)
+        books = [book async for book in queryset]
+        data = BookSerializer(books, many=True, context={'fields': fields}).data
+        return JsonResponse(data, safe=False)
+
+
+class AsyncBookDetailView(View):
+    """
+    GET: Same as BookDetailView (including ETag / If-None-Match),
+    evaluated with the async ORM.
+    """
+    replica_reads = True
+
+    async def get(self, request, pk):
+        header = request.headers.get('If-None-Match')
+        if header:
+            version = await Book.objects.filter(pk=pk).values_list('version', flat=True).afirst()
+            if version is not None and none_match(header, book_etag(pk, version)):
+                response = HttpResponseNotModified()
+                response['ETag'] = book_etag(pk, version)
+                return response
+
+        book = await Book.objects.filter(pk=pk).afirst()
+        if book is None:
+            return JsonResponse({'detail': 'No Book matches the given query.'}, status=404)
+        response = JsonResponse(BookSerializer(book).data)
+        response['ETag'] = book.etag
+        return response
@@ -0,0 +1,129 @@
+"""
+Response cache for the Book read endpoints.
+
+Cached responses are keyed on a version counter plus the normalized query
+parameters. Write views bump the version, which orphans every cached entry
+at once (they simply expire); nothing has to enumerate or delete keys.
+
+The cache backend is the project's default cache. LocMemCache is per
+process, so a multi-worker deployment should point CACHES at a shared
+backend (Redis, Memcached) for invalidation to reach every worker.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from . import metrics
+
+VERSION_KEY = 'api:books:version'
+HITS_KEY = 'api:books:stats:hits'
+MISSES_KEY = 'api:books:stats:misses'
+
+# Query parameters that change the response body. Anything else
+# (cache-busters, tracking params) is ignored when building the key.
+CACHE_KEY_PARAMS = (
+    'title', 'author', 'publication_year',
+    'search', 'ordering', 'cursor', 'page', 'page_size', 'fields',
+)
+
+
+def get_timeout():
+    return getattr(settings, 'BOOK_CACHE_TIMEOUT', 300)
+
+
+def get_version():
+    """Return the current collection version, seeding it if missing."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a version evicted from the cache never
+        # goes back to a value that older entries were stored under.
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    """Invalidate every cached Book response."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def normalize_params(query_params):
+    """
+    Return a canonical string for the cache-relevant query parameters:
+    known keys only, sorted, with values stripped and sorted. Search
+    terms keep their case: SearchFilter's LIKE is case-sensitive for
+    non-ASCII text on SQLite, so "Ö" and "ö" can match different rows.
+    """
+    parts = []
+    for name in CACHE_KEY_PARAMS:
+        values = sorted(v.strip() for v in query_params.getlist(name) if v.strip())
+        if name == 'search':
+            values = [' '.join(v.split()) for v in values]
+        elif name == 'fields':
+            # Output order follows the serializer, not the request
+            values = sorted({f.strip() for v in values for f in v.split(',') if f.strip()})
+        if values:
+            parts.append(f"{name}={','.join(values)}")
+    return '&'.join(parts)
+
+
+def make_key(scope, query_params, **kwargs):
+    raw = '|'.join([scope, normalize_params(query_params)] + [f'{k}={v}' for k, v in sorted(kwargs.items())])
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'api:books:v{get_version()}:{scope}:{digest}'
+
+
+def record(hit):
+    metrics.record_cache('books', hit)
+    key = HITS_KEY if hit else MISSES_KEY
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def get_stats():
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else 0.0,
+        'version': get_version(),
+    }
+
+
+def reset_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
+
+
+class CachedReadMixin:
+    """
+    Serve GET responses for a Book read view from the cache.
+    cache_scope distinguishes list and detail entries.
+    """
+    cache_scope = None
+
+    def get(self, request, *args, **kwargs):
+        key = make_key(self.cache_scope, request.query_params, **kwargs)
+        data = cache.get(key)
+        if data is not None:
+            record(hit=True)
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        record(hit=False)
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            data = response.data
+            cache.set(key, list(data) if isinstance(data, list) else dict(data), get_timeout())
+        response['X-Cache'] = 'MISS'
+        return response
+
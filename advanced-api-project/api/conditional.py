@@ -0,0 +1,35 @@
+"""
+Conditional request helpers for the Book API (ETag, If-None-Match, If-Match).
+"""
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The book has been modified since the given ETag.'
+    default_code = 'precondition_failed'
+
+
+def _strip_weak(etag):
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def none_match(header, etag):
+    """
+    True when an If-None-Match header matches etag (weak comparison,
+    as RFC 9110 requires for If-None-Match).
+    """
+    if header.strip() == '*':
+        return True
+    return _strip_weak(etag) in {_strip_weak(tag) for tag in parse_etags(header)}
+
+
+def if_match(header, etag):
+    """
+    True when an If-Match header matches etag (strong comparison).
+    """
+    if header.strip() == '*':
+        return True
+    return etag in {tag for tag in parse_etags(header) if not tag.startswith('W/')}
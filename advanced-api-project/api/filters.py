@@ -0,0 +1,28 @@
+import django_filters
+from django.db.models import Value
+from django.db.models.functions import Lower
+
+from .models import Book
+
+
+class BookFilter(django_filters.FilterSet):
+    """
+    Filters for BookListView.
+    - title: case-insensitive exact match, answered by the indexed
+      title_normalized column instead of a LIKE scan. The value is
+      lowered by the database too, so both sides use the same LOWER().
+      Inner whitespace is compared as stored, so a title with doubled
+      spaces is still found by its exact spelling.
+    - author: exact match on the author id. A plain number filter instead
+      of a model choice, so validating it costs no query.
+    - publication_year: exact match.
+    """
+    title = django_filters.CharFilter(method='filter_title')
+    author = django_filters.NumberFilter(field_name='author_id')
+
+    class Meta:
+        model = Book
+        fields = ['title', 'author', 'publication_year']
+
+    def filter_title(self, queryset, name, value):
+        return queryset.filter(title_normalized=Lower(Value(value)))
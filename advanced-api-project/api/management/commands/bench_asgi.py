@@ -0,0 +1,132 @@
+import asyncio
+import time
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+
+from api.models import Author, Book
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class InFlight:
+    """Counts requests between start and the last response message."""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+    def __enter__(self):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        self.current -= 1
+
+
+class SlowQueries:
+    """execute_wrapper that makes every query take `delay` seconds longer."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def __call__(self, execute, sql, params, many, context):
+        time.sleep(self.delay)
+        return execute(sql, params, many, context)
+
+    def install(self, sender, connection, **kwargs):
+        connection.execute_wrappers.append(self)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the sync and the async Book list under the same ASGI '
+        'application, with every query slowed down inside the view'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Total requests per run')
+        parser.add_argument('--concurrency', type=int, default=50, help='Concurrent clients')
+        parser.add_argument('--query-delay', type=float, default=0.01, help='Seconds added to every SQL query')
+        parser.add_argument('--books', type=int, default=50, help='Books to create if the table is empty')
+
+    def handle(self, *args, **options):
+        if not Book.objects.exists():
+            author = Author.objects.create(name='Benchmark Author')
+            Book.objects.bulk_create(
+                Book(title=f'Benchmark Book {i}',
+                     publication_year=2000, author=author)
+                for i in range(options['books'])
+            )
+
+        self.stdout.write(
+            f"{options['requests']} requests, {options['concurrency']} concurrent clients, "
+            f"{options['query_delay'] * 1000:.0f} ms added to every query"
+        )
+        slow = SlowQueries(options['query_delay'])
+        # Requests open their own connections; each one gets the delay
+        connections.close_all()
+        connection_created.connect(slow.install)
+        try:
+            # The sync list is cached; without this every request after the first would skip the view
+            with override_settings(BOOK_CACHE_TIMEOUT=0):
+                for label, path in [
+                    ('ASGI /api/books/ (sync view)', '/api/books/'),
+                    ('ASGI /api/async/books/ (async view)', '/api/async/books/'),
+                ]:
+                    self.report(label, *asyncio.run(self.run_asgi(path, options)))
+        finally:
+            connection_created.disconnect(slow.install)
+            connections.close_all()
+
+    async def run_asgi(self, path, options):
+        application = get_asgi_application()
+        in_flight = InFlight()
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def request(submitted):
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+                'query_string': b'', 'root_path': '', 'headers': [(b'host', b'localhost')],
+                'server': ('localhost', 80), 'client': ('127.0.0.1', 50000),
+            }
+            messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+            status = []
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                await asyncio.Event().wait()  # the client never disconnects early
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+
+            async with semaphore:
+                with in_flight:
+                    await application(scope, receive, send)
+            assert status[0] == 200, status[0]
+            return time.perf_counter() - submitted
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(request(start) for _ in range(options['requests'])))
+        return latencies, time.perf_counter() - start, in_flight.peak
+
+    def report(self, label, latencies, elapsed, peak):
+        # Latency counts from submission, so it includes time spent queued
+        # for a client slot
+        latencies = [latency * 1000 for latency in latencies]
+        self.stdout.write(self.style.SUCCESS(label))
+        self.stdout.write(
+            f"  {len(latencies) / elapsed:8.1f} req/s   peak in-flight {peak:4d}   "
+            f"p50 {percentile(latencies, 50):7.1f} ms   p95 {percentile(latencies, 95):7.1f} ms"
+        )
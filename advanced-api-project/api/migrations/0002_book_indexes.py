@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:07
+
+from django.db import migrations, models
+
+
+def populate_title_normalized(apps, schema_editor):
+    # The column is recomputed by the database from 0005 on
+    def normalize_title(value):
+        return " ".join((value or "").casefold().split())
+
+    Book = apps.get_model('api', 'Book')
+    books = list(Book.objects.only('id', 'title'))
+    for book in books:
+        book.title_normalized = normalize_title(book.title)
+    Book.objects.bulk_update(books, ['title_normalized'], batch_size=500)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='title_normalized',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=200),
+        ),
+        migrations.RunPython(populate_title_normalized, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['title'], name='api_book_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['publication_year', 'title'], name='api_book_year_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['author', 'title'], name='api_book_author_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['author', 'publication_year'], name='api_book_author_year_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+def seed_change_log(apps, schema_editor):
+    # Books that predate the log get a 'created' entry so a sync from
+    # token 0 returns the whole catalogue.
+    Book = apps.get_model('api', 'Book')
+    BookChange = apps.get_model('api', 'BookChange')
+    book_ids = Book.objects.order_by('id').values_list('id', flat=True)
+    BookChange.objects.bulk_create(
+        (BookChange(book_id=book_id, action='created') for book_id in book_ids.iterator()),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_book_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('book_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=10)),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.RunPython(seed_change_log, migrations.RunPython.noop),
+    ]
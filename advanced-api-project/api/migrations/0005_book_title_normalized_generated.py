@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:20
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_book_change_log'),
+    ]
+
+    operations = [
+        # A column cannot be altered into a generated one; replace it
+        migrations.RemoveField(
+            model_name='book',
+            name='title_normalized',
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='title_normalized',
+            field=models.GeneratedField(db_index=True, db_persist=True, expression=django.db.models.functions.text.Lower('title'), output_field=models.CharField(max_length=200)),
+        ),
+    ]
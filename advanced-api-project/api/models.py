@@ -1,4 +1,13 @@
 from django.db import models
+from django.db.models.functions import Lower
+
+
+def book_etag(pk, version):
+    """
+    Strong ETag for a book row: the id plus its row version.
+    """
+    return f'"{pk}-{version}"'
+
 
 class Author(models.Model):
     """
@@ -14,14 +23,84 @@ class Book(models.Model):
     """
     Represents a book written by an author.
     Includes title, publication year, and a foreign key to Author.
+
+    The indexes mirror the filters and orderings exposed by BookListView,
+    so every filter/ordering combination is answered by an index instead
+    of a full table scan. title_normalized is a stored, indexed LOWER(title)
+    computed by the database, so case-insensitive title lookups can use an
+    index too, whichever way the row was written.
+    version is incremented on every update for ETags and If-Match.
     """
     title = models.CharField(max_length=200)
+    title_normalized = models.GeneratedField(
+        expression=Lower('title'),
+        output_field=models.CharField(max_length=200),
+        db_persist=True,
+        db_index=True,
+    )
     publication_year = models.IntegerField()
     author = models.ForeignKey(
         Author,
         on_delete=models.CASCADE,
         related_name='books'
     )
+    # Bumped on every save; backs the ETag sent by BookDetailView.
+    # QuerySet.update() bypasses save(), so bulk writes must bump it too.
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['title'], name='api_book_title_idx'),
+            models.Index(fields=['publication_year', 'title'], name='api_book_year_title_idx'),
+            models.Index(fields=['author', 'title'], name='api_book_author_title_idx'),
+            models.Index(fields=['author', 'publication_year'], name='api_book_author_year_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version += 1
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields) | {'version'}
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+    @property
+    def etag(self):
+        return book_etag(self.pk, self.version)
 
     def __str__(self):
         return f"{self.title} ({self.publication_year})"
+
+
+class BookChange(models.Model):
+    """
+    Append-only log of Book writes, used by BookChangesView for delta sync.
+    The auto-increment id doubles as the sync token: a client that last
+    saw change N asks for everything with id > N. The view holds back
+    entries younger than a commit-visibility window, since ids can become
+    visible out of order with concurrent writers.
+    """
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTION_CHOICES = [
+        (CREATED, 'Created'),
+        (UPDATED, 'Updated'),
+        (DELETED, 'Deleted'),
+    ]
+
+    # Plain integer, not a ForeignKey: entries must outlive deleted books.
+    book_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.pk} {self.action} book {self.book_id}"
+
+    @classmethod
+    def record(cls, book_id, action):
+        return cls.objects.create(book_id=book_id, action=action)
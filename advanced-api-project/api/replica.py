@@ -0,0 +1,245 @@
+"""
+Read-replica routing.
+
+With REPLICA['ENABLED'] and a "replica" entry in DATABASES,
+PrimaryReplicaRouter sends every write to "default". Reads go to the
+replica only while ReplicaRoutingMiddleware has classified the current
+request as a replica read: a GET/HEAD of a class-based view with
+replica_reads = True, from a client outside its sticky window.
+Any other request (POST, PUT, PATCH, DELETE) pins its client to the
+primary for REPLICA['STICKY_SECONDS'] with a cookie. The client then
+reads its own writes even while the replica lags.
+
+Views whose responses are cached (api/cache.py) must not set
+replica_reads: a miss right after a write would store the replica's
+stale rows under the freshly bumped cache version.
+
+Local stand-in for replication: with REPLICA['REPLAY'] on, every
+committed INSERT/UPDATE/DELETE/DDL statement on "default" is replayed on
+the replica alias, in commit order, optionally REPLICA['LAG'] seconds
+late. An empty replica is first seeded with a full copy of the primary
+(SQLite only). Test databases are never replayed: the replica mirrors
+"default" there (TEST['MIRROR']).
+"""
+import contextvars
+import queue
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+SAFE_METHODS = ('GET', 'HEAD')
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'CREATE', 'ALTER', 'DROP')
+
+# True while the current request may read from the replica
+replica_allowed = contextvars.ContextVar('replica_allowed', default=False)
+
+# The primary as configured, before the test runner swaps in a test database
+PRIMARY_NAME = settings.DATABASES['default']['NAME']
+
+
+def get_config():
+    config = {
+        'ENABLED': False,
+        'ALIAS': 'replica',
+        'STICKY_SECONDS': 5,
+        'COOKIE': 'db_primary_until',
+        'REPLAY': False,
+        'LAG': 0,
+    }
+    config.update(getattr(settings, 'REPLICA', {}))
+    return config
+
+
+def is_replica_view(view_func, method):
+    """Read/write classification for a resolved view."""
+    view_class = getattr(view_func, 'view_class', None)
+    return method in SAFE_METHODS and getattr(view_class, 'replica_reads', False)
+
+
+@contextmanager
+def execute_wrapper_all(wrapper):
+    """
+    connection.execute_wrapper(wrapper) on every alias in DATABASES, so
+    statements routed to the replica are seen as well as the primary's.
+    """
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(wrapper))
+        yield
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        config = get_config()
+        if replica_allowed.get() and config['ENABLED']:
+            return config['ALIAS']
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Classifies each request for PrimaryReplicaRouter and pins writers to
+    the primary. Runs in either mode, so under ASGI a request to an async
+    view does not hop through a sync thread for the classification.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Django adapts process_view to the handler's mode
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = replica_allowed.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_allowed.reset(token)
+        return self.pin_writer(request, response)
+
+    async def __acall__(self, request):
+        token = replica_allowed.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            replica_allowed.reset(token)
+        return self.pin_writer(request, response)
+
+    def pin_writer(self, request, response):
+        if request.method not in SAFE_METHODS:
+            config = get_config()
+            response.set_cookie(
+                config['COOKIE'],
+                str(time.time() + config['STICKY_SECONDS']),
+                max_age=config['STICKY_SECONDS'],
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def is_pinned(self, request):
+        try:
+            return float(request.COOKIES.get(get_config()['COOKIE'], 0)) > time.time()
+        except ValueError:
+            return False
+
+    def classify(self, request, view_func):
+        if is_replica_view(view_func, request.method) and not self.is_pinned(request):
+            replica_allowed.set(True)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.classify(request, view_func)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.classify(request, view_func)
+
+
+# ---------------------------------------------------------------------------
+# Replication stand-in
+# ---------------------------------------------------------------------------
+
+def copy_primary(alias):
+    """Overwrite the replica with a consistent copy of the primary (SQLite)."""
+    source, target = connections['default'], connections[alias]
+    source.ensure_connection()
+    target.ensure_connection()
+    source.connection.backup(target.connection)
+
+
+def ensure_seeded(alias):
+    """Copy the primary into the replica if the replica has no schema yet."""
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'django_migrations'")
+        seeded = cursor.fetchone()
+    if not seeded:
+        copy_primary(alias)
+
+
+class Replayer:
+    """Applies statements to the replica in order, LAG seconds late."""
+
+    def __init__(self, alias, lag):
+        self.alias = alias
+        self.lag = lag
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def apply(self, sql, params, many):
+        with connections[self.alias].cursor() as cursor:
+            if many:
+                cursor.executemany(sql, params)
+            else:
+                cursor.execute(sql, params)
+
+    def submit(self, sql, params, many):
+        if not self.lag:
+            self.apply(sql, params, many)
+            return
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='replica-replay', daemon=True)
+                self.thread.start()
+        self.queue.put((time.monotonic() + self.lag, sql, params, many))
+
+    def run(self):
+        while True:
+            due, sql, params, many = self.queue.get()
+            time.sleep(max(0, due - time.monotonic()))
+            self.apply(sql, params, many)
+
+
+_replayer = None
+
+
+def get_replayer():
+    global _replayer
+    if _replayer is None:
+        config = get_config()
+        _replayer = Replayer(config['ALIAS'], config['LAG'])
+    return _replayer
+
+
+def replay_writes(execute, sql, params, many, context):
+    """execute_wrapper on "default": queue committed writes for the replica."""
+    if many:
+        params = list(params)  # executemany may be handed a one-shot iterator
+    result = execute(sql, params, many, context)
+    if sql.lstrip()[:7].upper().startswith(WRITE_PREFIXES):
+        # Runs at once in autocommit; dropped if the transaction rolls back
+        transaction.on_commit(partial(get_replayer().submit, sql, params, many), using='default')
+    return result
+
+
+@receiver(connection_created)
+def install_replay(sender, connection, **kwargs):
+    config = get_config()
+    if not (config['ENABLED'] and config['REPLAY']) or connection.alias != 'default':
+        return
+    if connection.settings_dict['NAME'] != PRIMARY_NAME or connection.vendor != 'sqlite':
+        return
+    # Seed before the first write so no statement is both copied and replayed
+    ensure_seeded(config['ALIAS'])
+    connection.execute_wrappers.append(replay_writes)
@@ -1,10 +1,24 @@
 from rest_framework import serializers
 from .models import Author, Book
 
-class BookSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    Drops every field not listed in the 'fields' serializer context entry.
+    Views that support ?fields= put the parsed list there.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.context.get('fields')
+        if requested:
+            for name in set(self.fields) - set(requested):
+                self.fields.pop(name)
+
+
+class BookSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Book
-        fields = '__all__'
+        fields = ['id', 'title', 'publication_year', 'author', 'version']
 
     def validate_publication_year(self, value):
         from datetime import datetime
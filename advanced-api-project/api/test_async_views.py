@@ -0,0 +1,42 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from .models import Book, Author
+
+
+class AsyncBookViewsTestCase(TestCase):
+    """
+    Test suite for the async (ASGI) Book read views.
+    They must return the same payloads as their sync counterparts.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.author = Author.objects.create(name="Test Author")
+        self.other = Author.objects.create(name="Other Author")
+        self.book1 = Book.objects.create(title="Book One", author=self.author, publication_year=2020)
+        self.book2 = Book.objects.create(title="Book Two", author=self.other, publication_year=2021)
+
+    async def test_list_matches_sync_view(self):
+        """Ensure filters, ordering and fields give the same payload as BookListView."""
+        for params in ({}, {"ordering": "-publication_year"}, {"author": self.other.pk}, {"fields": "id,title"}):
+            with self.subTest(params=params):
+                sync = await self.async_client.get(reverse("book-list"), params)
+                response = await self.async_client.get(reverse("book-list-async"), params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), sync.json())
+
+    async def test_list_rejects_bad_params(self):
+        """Ensure filter validation errors are reported with a 400."""
+        response = await self.async_client.get(reverse("book-list-async"), {"fields": "isbn"})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_detail_etag_and_404(self):
+        """Ensure the async detail view sends ETags, honours If-None-Match and 404s."""
+        url = reverse("book-detail-async", kwargs={"pk": self.book1.pk})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.json()["title"], "Book One")
+        response = await self.async_client.get(url, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+        response = await self.async_client.get(reverse("book-detail-async", kwargs={"pk": 999}))
+        self.assertEqual(response.status_code, 404)
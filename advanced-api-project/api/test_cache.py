@@ -0,0 +1,86 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth.models import User
+from .models import Book, Author
+
+
+class BookCacheTestCase(APITestCase):
+    """
+    Test suite for the Book response cache.
+    Covers hits, key normalization, write-through invalidation and stats.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+        self.user = User.objects.create_user(username="testuser", password="password123")
+        self.client = APIClient()
+        self.client.login(username="testuser", password="password123")
+
+        self.author = Author.objects.create(name="Test Author")
+        self.book = Book.objects.create(title="Book One", author=self.author, publication_year=2020)
+
+        self.list_url = reverse("book-list")
+        self.detail_url = reverse("book-detail", kwargs={"pk": self.book.pk})
+
+    def test_list_is_served_from_cache(self):
+        """Ensure a repeated list request is a hit and runs no queries."""
+        client = APIClient()  # Anonymous, so no session/user queries
+        first = client.get(self.list_url)
+        self.assertEqual(first["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            second = client.get(self.list_url)
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.data, first.data)
+
+    def test_key_normalizes_parameters(self):
+        """Ensure parameter order, search whitespace and unknown params share a key."""
+        self.client.get(self.list_url, {"search": "Book  One", "ordering": "title"})
+        response = self.client.get(f"{self.list_url}?ordering=title&search=%20Book%20One&utm_source=x")
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_search_case_is_part_of_the_key(self):
+        """Ensure searches that differ only in case never share a cached response."""
+        Book.objects.create(title="Der Ölsucher", author=self.author, publication_year=2020)
+        self.assertEqual(len(self.client.get(self.list_url, {"search": "ölsucher"}).data), 0)
+        response = self.client.get(self.list_url, {"search": "Ölsucher"})
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data), 1)
+
+    def test_create_invalidates_list(self):
+        """Ensure creating a book bumps the version so the list is recomputed."""
+        self.client.get(self.list_url)
+        data = {"title": "Book Two", "author": self.author.id, "publication_year": 2021}
+        self.client.post(reverse("book-create"), data, format="json")
+        response = self.client.get(self.list_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data), 2)
+
+    def test_update_and_delete_invalidate_detail(self):
+        """Ensure update and delete views invalidate cached detail responses."""
+        self.client.get(self.detail_url)
+        data = {"title": "Renamed", "author": self.author.id, "publication_year": 2020}
+        self.client.put(reverse("book-update", kwargs={"pk": self.book.pk}), data, format="json")
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.data["title"], "Renamed")
+
+        self.client.delete(reverse("book-delete", kwargs={"pk": self.book.pk}))
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stats_endpoint_reports_hit_rate(self):
+        """Ensure the stats endpoint is staff-only and reports hits and misses."""
+        self.client.get(self.list_url)
+        self.client.get(self.list_url)
+        stats_url = reverse("book-cache-stats")
+        self.assertEqual(self.client.get(stats_url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(stats_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["hits"], 1)
+        self.assertEqual(response.data["misses"], 1)
+        self.assertEqual(response.data["hit_rate"], 0.5)
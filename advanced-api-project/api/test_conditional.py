@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth.models import User
+from .models import Book, Author
+
+
+class BookConditionalRequestTestCase(APITestCase):
+    """
+    Test suite for ETag / If-None-Match / If-Match handling on the Book API.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+        self.user = User.objects.create_user(username="testuser", password="password123")
+        self.client = APIClient()
+        self.client.login(username="testuser", password="password123")
+
+        self.author = Author.objects.create(name="Test Author")
+        self.book = Book.objects.create(title="Book One", author=self.author, publication_year=2020)
+
+        self.detail_url = reverse("book-detail", kwargs={"pk": self.book.pk})
+        self.update_url = reverse("book-update", kwargs={"pk": self.book.pk})
+        self.payload = {"title": "Updated", "author": self.author.id, "publication_year": 2020}
+
+    def test_detail_sends_strong_etag(self):
+        """Ensure the detail view sends a strong ETag built from the row version."""
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response["ETag"], f'"{self.book.pk}-1"')
+
+    def test_if_none_match_returns_304_with_one_query(self):
+        """Ensure a matching If-None-Match answers 304 after a single version lookup."""
+        etag = self.client.get(self.detail_url)["ETag"]
+        client = APIClient()  # Anonymous, so no session/user queries
+        with self.assertNumQueries(1):
+            response = client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(response.content)
+
+    def test_update_changes_etag(self):
+        """Ensure an update bumps the version so old ETags no longer match."""
+        etag = self.client.get(self.detail_url)["ETag"]
+        self.client.put(self.update_url, self.payload, format="json")
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_if_match_allows_current_version(self):
+        """Ensure If-Match with the current ETag applies the update."""
+        response = self.client.put(self.update_url, self.payload, format="json", HTTP_IF_MATCH=self.book.etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["ETag"], f'"{self.book.pk}-2"')
+
+    def test_if_match_rejects_stale_version(self):
+        """Ensure If-Match with a stale ETag is rejected and nothing is written."""
+        stale = self.book.etag
+        Book.objects.get(pk=self.book.pk).save()
+        response = self.client.patch(self.update_url, {"title": "Lost Update"}, format="json", HTTP_IF_MATCH=stale)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.title, "Book One")
@@ -0,0 +1,114 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from .metrics import registry, collect, render
+from .models import Book, Author
+
+
+class MetricsTestCase(TestCase):
+    """
+    Test suite for the metrics middleware, the cross-process store and
+    the /metrics exposition.
+    """
+
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(METRICS={'DIR': self.tmp.name, 'FLUSH_INTERVAL': 0, 'TOKEN': 's3cret'})
+        override.enable()
+        self.addCleanup(override.disable)
+        author = Author.objects.create(name="Author")
+        Book.objects.create(title="Book", author=author, publication_year=2020)
+
+    def scrape(self, token="s3cret"):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        response = self.client.get(reverse("metrics"), headers=headers)
+        return response, response.content.decode()
+
+    def test_request_latency_queries_and_cache_are_exposed(self):
+        """Ensure a list request shows up in the histogram, DB and cache counters."""
+        self.client.get(reverse("book-list"))
+        self.client.get(reverse("book-list"))
+
+        response, body = self.scrape()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn('http_request_duration_seconds_count{view="book-list"} 2', body)
+        self.assertIn('http_request_duration_seconds_bucket{view="book-list",le="+Inf"} 2', body)
+        self.assertIn('http_requests_total{method="GET",status="200",view="book-list"} 2', body)
+        self.assertIn('db_queries_total{view="book-list"} 1', body)  # the second request is a cache hit
+        self.assertIn('cache_requests_total{cache="books",result="hit"} 1', body)
+        self.assertIn('cache_requests_total{cache="books",result="miss"} 1', body)
+
+    def test_snapshots_from_other_processes_are_summed(self):
+        """Ensure counters and histograms from every worker's file are merged."""
+        self.client.get(reverse("book-list"))
+        self.scrape()  # flushes this process's snapshot
+        labels = [["view", "book-list"]]
+        other = {
+            "counters": [["cache_requests_total", [["cache", "books"], ["result", "hit"]], 5]],
+            "histograms": [["http_request_duration_seconds", labels, [3] + [0] * 10 + [0.003, 3]]],
+        }
+        with open(f"{self.tmp.name}/other-worker.json", "w") as f:
+            json.dump(other, f)
+
+        counters, histograms = collect(self.tmp.name)
+        self.assertEqual(histograms[("http_request_duration_seconds", (("view", "book-list"),))][-1], 4)
+        body = render(counters, histograms)
+        self.assertIn('cache_requests_total{cache="books",result="hit"} 5', body)
+        self.assertIn('http_request_duration_seconds_bucket{view="book-list",le="0.005"}', body)
+
+    def test_unmatched_paths_share_one_label(self):
+        """Ensure 404s do not create a label per path."""
+        self.client.get("/no/such/path/1")
+        self.client.get("/no/such/path/2")
+        _, body = self.scrape()
+        self.assertIn('http_requests_total{method="GET",status="404",view="unmatched"} 2', body)
+
+    def test_token_or_staff_is_required(self):
+        """Ensure only the scrape token or a staff session gets in, even with no token configured."""
+        self.assertEqual(self.scrape(token=None)[0].status_code, 403)
+        self.assertEqual(self.scrape(token="wrong")[0].status_code, 403)
+        with self.settings(METRICS={'DIR': self.tmp.name, 'TOKEN': None}):
+            self.assertEqual(self.scrape(token=None)[0].status_code, 403)
+            self.client.force_login(User.objects.create_user(username="reader", password="password123"))
+            self.assertEqual(self.scrape(token=None)[0].status_code, 403)
+            self.client.force_login(User.objects.create_user(username="staff", password="password123", is_staff=True))
+            self.assertEqual(self.scrape(token=None)[0].status_code, 200)
+
+    def test_snapshot_files_are_per_process_not_per_pid(self):
+        """Ensure a worker that reuses a pid gets its own file instead of overwriting one."""
+        self.scrape()
+        self.assertEqual(os.listdir(self.tmp.name).count(registry.name), 1)
+        self.assertNotEqual(registry.name, f"{os.getpid()}.json")
+        labels = [["cache", "books"], ["result", "hit"]]
+        for name in ("a.json", "b.json"):  # same pid, two generations of workers
+            with open(f"{self.tmp.name}/{name}", "w") as f:
+                json.dump({"pid": 1, "counters": [["cache_requests_total", labels, 2]], "histograms": []}, f)
+        counters, _ = collect(self.tmp.name)
+        self.assertEqual(counters[("cache_requests_total", (("cache", "books"), ("result", "hit")))], 4)
+
+    def test_exited_workers_are_retired_once(self):
+        """Ensure an exited worker's totals move to retired.json, its file goes, and nothing is counted twice."""
+        exited = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+        labels = [["cache", "books"], ["result", "hit"]]
+        with open(f"{self.tmp.name}/exited.json", "w") as f:
+            json.dump({"pid": int(exited.stdout), "counters": [["cache_requests_total", labels, 7]], "histograms": []}, f)
+
+        for _ in range(2):
+            _, body = self.scrape()
+            self.assertIn('cache_requests_total{cache="books",result="hit"} 7', body)
+        self.assertNotIn("exited.json", os.listdir(self.tmp.name))
+        self.assertIn(registry.name, os.listdir(self.tmp.name))
+        with open(f"{self.tmp.name}/retired.json") as f:
+            self.assertEqual(json.load(f)["files"], [])
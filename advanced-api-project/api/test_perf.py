@@ -0,0 +1,88 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from .models import Book, BookChange, Author
+from .perf import SCALES, assert_constant_queries, query_budget
+
+
+# Measure the views themselves, not the response cache in front of them
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class BookViewPerformanceTestCase(TestCase):
+    """
+    Query budgets for the Book read endpoints, with the table seeded at
+    each of perf.SCALES rows (PERF_SCALES=10,1000,100000 for a larger
+    run). Query counts must not depend on the number of rows.
+    """
+
+    # (url name, max queries)
+    LIST_BUDGET = ('book-list', 1)
+    DETAIL_BUDGETS = [
+        ('book-detail', 1),
+        ('book-detail-async', 1),
+    ]
+    # since=<last token> only reads the tail of the change log
+    CHANGES_BUDGET = ('book-changes', 2)
+
+    def setUp(self):
+        cache.clear()
+        self.author = Author.objects.create(name="Perf Author")
+        self.seeded = 0
+
+    def seed(self, rows):
+        """Grow the Book table (and its change log) to `rows` rows."""
+        books = Book.objects.bulk_create(
+            Book(
+                title=f"Book {i}",
+                publication_year=1900 + i % 120,
+                author=self.author,
+            )
+            for i in range(self.seeded, rows)
+        )
+        BookChange.objects.bulk_create(
+            BookChange(book_id=book.pk, action=BookChange.CREATED) for book in books
+        )
+        self.seeded = rows
+
+    def measure(self, url, max_queries, params=None):
+        with query_budget(max_queries, label=url) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_read_views_within_budget_at_every_scale(self):
+        """Ensure query counts stay within budget and flat as the table grows."""
+        counts = {}
+        for rows in SCALES:
+            self.seed(rows)
+            book = Book.objects.order_by('-pk').first()
+            token = BookChange.objects.order_by('-pk').values_list('pk', flat=True).first()
+
+            with self.subTest(rows=rows):
+                name, max_queries = self.LIST_BUDGET
+                counts.setdefault(name, {})[rows] = self.measure(reverse(name), max_queries)
+
+                for name, max_queries in self.DETAIL_BUDGETS:
+                    url = reverse(name, kwargs={'pk': book.pk})
+                    counts.setdefault(name, {})[rows] = self.measure(url, max_queries)
+
+                name, max_queries = self.CHANGES_BUDGET
+                url = reverse(name)
+                counts.setdefault(name, {})[rows] = self.measure(url, max_queries, {'since': token - 1})
+
+        for name, count in counts.items():
+            with self.subTest(view=name):
+                assert_constant_queries(count, label=name)
+
+    def test_query_budget_reports_queries(self):
+        """Ensure exceeding a budget fails with the offending SQL listed."""
+        self.seed(3)
+        with self.assertRaisesMessage(AssertionError, 'ran 4 queries, budget is 1'):
+            with query_budget(1, label='loop'):
+                for book in Book.objects.all():
+                    book.author.name
+
+    def test_constant_queries_reports_growth(self):
+        """Ensure a query count that changes with the table size fails."""
+        assert_constant_queries({10: 2, 1000: 2}, label='flat')
+        with self.assertRaisesMessage(AssertionError, 'grows ran 2 queries at 10 rows but 3 at 1000 rows'):
+            assert_constant_queries({10: 2, 1000: 3}, label='grows')
@@ -0,0 +1,97 @@
+import itertools
+
+from django.db import connection
+from rest_framework.test import APITestCase, APIRequestFactory
+
+from .models import Book, Author
+from .views import BookListView
+
+
+class BookListQueryPlanTestCase(APITestCase):
+    """
+    EXPLAIN-based checks for BookListView.
+    Every combination of the declared filters (alone and together) and
+    orderings must be
+    answered through an index; a plain "SCAN api_book" means the query
+    fell back to a full table scan, and a filtered query must SEARCH an
+    index rather than walk one end to end.
+    """
+
+    FILTERS = {
+        "title": "Book 7",
+        "author": None,  # filled with a real author id in the test
+        "publication_year": 1997,
+    }
+    ORDERINGS = ["", "title", "-title", "publication_year", "-publication_year"]
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        authors = [Author.objects.create(name=f"Author {i}") for i in range(5)]
+        Book.objects.bulk_create(
+            Book(
+                title=f"Book {i}",
+                publication_year=1990 + i % 30,
+                author=authors[i % len(authors)],
+            )
+            for i in range(200)
+        )
+        self.author_id = authors[0].id
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def build_queryset(self, params):
+        request = self.factory.get("/api/books/", params)
+        view = BookListView()
+        view.setup(request)
+        view.request = view.initialize_request(request)
+        view.format_kwarg = None
+        return view.filter_queryset(view.get_queryset())
+
+    def test_filter_and_ordering_combinations_use_indexes(self):
+        """Ensure no filter/ordering combination does a full table scan."""
+        if connection.vendor != "sqlite":
+            self.skipTest("Query plan assertions are written for SQLite.")
+
+        combinations = [
+            dict.fromkeys(names)
+            for size in range(len(self.FILTERS) + 1)
+            for names in itertools.combinations(self.FILTERS, size)
+        ]
+        for filters, ordering in itertools.product(combinations, self.ORDERINGS):
+            params = {name: self.FILTERS[name] for name in filters}
+            if "author" in params:
+                params["author"] = self.author_id
+            if ordering:
+                params["ordering"] = ordering
+            with self.subTest(params=params):
+                plan = self.build_queryset(params).explain()
+                for line in plan.splitlines():
+                    if "SCAN api_book" in line:
+                        self.assertIn("USING", line, f"Full table scan for {params}:\n{plan}")
+                if filters:
+                    self.assertIn("SEARCH api_book", plan, f"Index not searched for {params}:\n{plan}")
+
+    def test_title_filter_is_case_insensitive(self):
+        """Ensure the normalized title column matches regardless of case."""
+        queryset = self.build_queryset({"title": "  BOOK 7 "})
+        self.assertEqual([book.title for book in queryset], ["Book 7"])
+
+    def test_title_filter_keeps_inner_whitespace(self):
+        """Ensure a title with doubled spaces is found by its exact spelling."""
+        Book.objects.filter(title="Book 9").update(title="War  and Peace")
+        queryset = self.build_queryset({"title": "war  and peace"})
+        self.assertEqual([book.title for book in queryset], ["War  and Peace"])
+
+    def test_combined_filters_match_rows(self):
+        """Ensure title, author and year filters applied together narrow to one row."""
+        book = Book.objects.get(title="Book 7")
+        queryset = self.build_queryset({
+            "title": "book 7", "author": book.author_id, "publication_year": book.publication_year,
+        })
+        self.assertEqual([b.pk for b in queryset], [book.pk])
+
+    def test_title_filter_sees_rows_written_without_save(self):
+        """Ensure rows from bulk_create and update() are matched by the title filter."""
+        Book.objects.filter(title="Book 8").update(title="Renamed In Bulk")
+        queryset = self.build_queryset({"title": "renamed in bulk"})
+        self.assertEqual([book.title for book in queryset], ["Renamed In Bulk"])
@@ -0,0 +1,110 @@
+import time
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.urls import resolve, reverse
+from .models import Book, Author
+from .replica import PrimaryReplicaRouter, ReplicaRoutingMiddleware, execute_wrapper_all, is_replica_view
+
+
+@override_settings(REPLICA={'ENABLED': True, 'ALIAS': 'replica', 'STICKY_SECONDS': 5, 'COOKIE': 'db_primary_until'})
+class ReplicaRoutingTestCase(TestCase):
+    """
+    Test suite for the read/write classification and sticky-primary
+    routing. The test database has no separate replica, so the router's
+    decisions are recorded and the queries still run on "default".
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password123")
+        self.author = Author.objects.create(name="Author")
+        self.book = Book.objects.create(title="Book", author=self.author, publication_year=2020)
+        self.decisions = []
+        original = PrimaryReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            self.decisions.append(original(router, model, **hints))
+            return 'default'
+
+        patcher = mock.patch.object(PrimaryReplicaRouter, 'db_for_read', record)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_classification(self):
+        """Ensure only the listed read views are replica reads, and only for GET."""
+        cases = [
+            (reverse("book-list"), "GET", False),
+            (reverse("book-detail", kwargs={"pk": 1}), "GET", False),
+            (reverse("book-list-async"), "GET", True),
+            (reverse("book-list-async"), "POST", False),
+            (reverse("book-detail-async", kwargs={"pk": 1}), "GET", True),
+            (reverse("book-update", kwargs={"pk": 1}), "GET", False),
+            (reverse("book-changes"), "GET", False),
+        ]
+        for url, method, expected in cases:
+            with self.subTest(url=url, method=method):
+                self.assertEqual(is_replica_view(resolve(url).func, method), expected)
+
+    def test_read_views_use_replica(self):
+        """Ensure async list and detail reads are routed to the replica."""
+        self.client.get(reverse("book-list-async"))
+        self.client.get(reverse("book-detail-async", kwargs={"pk": self.book.pk}))
+        self.assertTrue(self.decisions)
+        self.assertEqual(set(self.decisions), {'replica'})
+
+    def test_cached_views_use_primary(self):
+        """Ensure cache misses of the cached views never read the replica."""
+        self.client.get(reverse("book-list"))
+        self.client.get(reverse("book-detail", kwargs={"pk": self.book.pk}))
+        self.assertTrue(self.decisions)
+        self.assertEqual(set(self.decisions), {'default'})
+
+    async def test_async_request_is_classified_without_a_thread(self):
+        """Ensure the middleware runs natively under ASGI and still routes async reads."""
+        middleware = ReplicaRoutingMiddleware(mock.AsyncMock())
+        self.assertTrue(iscoroutinefunction(middleware))
+        self.assertTrue(iscoroutinefunction(middleware.process_view))
+        await self.async_client.get(reverse("book-list-async"))
+        self.assertTrue(self.decisions)
+        self.assertEqual(set(self.decisions), {'replica'})
+
+    def test_other_views_use_primary(self):
+        """Ensure unclassified views read from the primary."""
+        self.client.get(reverse("book-changes"))
+        self.assertEqual(set(self.decisions), {'default'})
+
+    def test_write_pins_client_to_primary(self):
+        """Ensure reads right after a write see the primary, then go back to the replica."""
+        self.client.login(username="testuser", password="password123")
+        response = self.client.post(
+            reverse("book-create"),
+            {"title": "New", "author": self.author.pk, "publication_year": 2021},
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn("db_primary_until", response.cookies)
+
+        self.decisions.clear()
+        self.client.get(reverse("book-list-async"))
+        self.assertEqual(set(self.decisions), {'default'})
+
+        self.client.cookies["db_primary_until"] = str(time.time() - 1)
+        self.decisions.clear()
+        self.client.get(reverse("book-list-async"))
+        self.assertEqual(set(self.decisions), {'replica'})
+
+    def test_execute_wrapper_covers_every_alias(self):
+        """Ensure request-scoped query hooks see every database, not just "default"."""
+        def wrapper(execute, sql, params, many, context):
+            return execute(sql, params, many, context)
+
+        with execute_wrapper_all(wrapper):
+            for alias in connections:
+                self.assertIn(wrapper, connections[alias].execute_wrappers)
+        for alias in connections:
+            self.assertNotIn(wrapper, connections[alias].execute_wrappers)
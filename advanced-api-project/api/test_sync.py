@@ -0,0 +1,95 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from django.contrib.auth.models import User
+from .models import Book, BookChange, Author
+
+
+class BookChangesTestCase(APITestCase):
+    """
+    Test suite for the delta-sync endpoint and the BookChange log.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+        self.user = User.objects.create_user(username="testuser", password="password123")
+        self.client = APIClient()
+        self.client.login(username="testuser", password="password123")
+
+        self.author = Author.objects.create(name="Test Author")
+        self.changes_url = reverse("book-changes")
+
+    def create_book(self, title):
+        data = {"title": title, "author": self.author.id, "publication_year": 2020}
+        response = self.client.post(reverse("book-create"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["id"]
+
+    def test_writes_are_logged_and_synced(self):
+        """Ensure create, update and delete all show up in the change feed."""
+        kept = self.create_book("Kept")
+        removed = self.create_book("Removed")
+        token = self.client.get(self.changes_url).data["next_token"]
+
+        data = {"title": "Kept (2nd ed.)", "author": self.author.id, "publication_year": 2021}
+        self.client.put(reverse("book-update", kwargs={"pk": kept}), data, format="json")
+        self.client.delete(reverse("book-delete", kwargs={"pk": removed}))
+
+        response = self.client.get(self.changes_url, {"since": token})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([book["title"] for book in response.data["changed"]], ["Kept (2nd ed.)"])
+        self.assertEqual(response.data["deleted"], [removed])
+        self.assertFalse(response.data["has_more"])
+
+        response = self.client.get(self.changes_url, {"since": response.data["next_token"]})
+        self.assertEqual(response.data["changed"], [])
+        self.assertEqual(response.data["deleted"], [])
+
+    def test_sync_cost_is_proportional_to_changes(self):
+        """Ensure a sync reads the log range and the changed books only."""
+        Book.objects.bulk_create(
+            Book(title=f"Old {i}", author=self.author, publication_year=2000) for i in range(50)
+        )
+        # bulk_create bypasses the views, so only "New" is in the log
+        self.create_book("New")
+        client = APIClient()  # Anonymous, so no session/user queries
+        with self.assertNumQueries(2):
+            response = client.get(self.changes_url, {"since": 0})
+        self.assertEqual(len(response.data["changed"]), 1)
+
+    def test_pagination_with_limit(self):
+        """Ensure has_more and next_token page through the log."""
+        for i in range(3):
+            self.create_book(f"Book {i}")
+        first = self.client.get(self.changes_url, {"limit": 2}).data
+        self.assertTrue(first["has_more"])
+        self.assertEqual(len(first["changed"]), 2)
+        second = self.client.get(self.changes_url, {"since": first["next_token"], "limit": 2}).data
+        self.assertFalse(second["has_more"])
+        self.assertEqual(len(second["changed"]), 1)
+
+    def test_invalid_token(self):
+        """Ensure a malformed sync token is rejected."""
+        response = self.client.get(self.changes_url, {"since": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(BOOK_CHANGES_VISIBILITY_WINDOW=5)
+    def test_token_is_held_back_by_the_visibility_window(self):
+        """Ensure recent entries wait out the window, so a late-committing lower id is never skipped."""
+        old = self.create_book("Old")
+        self.create_book("Recent")
+        BookChange.objects.filter(book_id=old).update(changed_at=timezone.now() - datetime.timedelta(seconds=10))
+
+        first = self.client.get(self.changes_url).data
+        self.assertEqual([book["title"] for book in first["changed"]], ["Old"])
+        self.assertFalse(first["has_more"])
+
+        BookChange.objects.update(changed_at=timezone.now() - datetime.timedelta(seconds=10))
+        second = self.client.get(self.changes_url, {"since": first["next_token"]}).data
+        self.assertEqual([book["title"] for book in second["changed"]], ["Recent"])
@@ -1,3 +1,6 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
@@ -12,6 +15,9 @@ class BookAPITestCase(APITestCase):
     """
 
     def setUp(self):
+        # Cached responses outlive each test's rolled-back transaction
+        cache.clear()
+
         # Create a test user
         self.user = User.objects.create_user(username="testuser", password="password123")
 
@@ -105,3 +111,17 @@ class BookAPITestCase(APITestCase):
         response = self.client.get(self.list_url, {"ordering": "-publication_year"})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data[0]["title"], "Book Two")
+
+    def test_sparse_fieldset_trims_payload_and_columns(self):
+        """Ensure ?fields= limits both the response keys and the selected columns."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.list_url, {"fields": "id,title"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data[0]), {"id", "title"})
+        book_select = [q["sql"] for q in ctx.captured_queries if 'FROM "api_book"' in q["sql"]][0]
+        self.assertNotIn("publication_year", book_select.split("FROM")[0])
+
+    def test_sparse_fieldset_rejects_unknown_fields(self):
+        """Ensure unknown names in ?fields= are reported with a 400."""
+        response = self.client.get(self.list_url, {"fields": "id,isbn"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
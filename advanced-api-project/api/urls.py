@@ -5,7 +5,10 @@ from .views import (
     BookCreateView,
     BookUpdateView,
     BookDeleteView,
+    BookCacheStatsView,
+    BookChangesView,
 )
+from .async_views import AsyncBookListView, AsyncBookDetailView
 
 urlpatterns = [
     path('books/', BookListView.as_view(), name='book-list'),             # GET all books
@@ -13,5 +16,9 @@ urlpatterns = [
     path('books/create/', BookCreateView.as_view(), name='book-create'),   # POST new book
     path('books/<int:pk>/update/', BookUpdateView.as_view(), name='book-update'), # PUT/PATCH update
     path('books/<int:pk>/delete/', BookDeleteView.as_view(), name='book-delete'), # DELETE
+    path('books/changes/', BookChangesView.as_view(), name='book-changes'), # GET delta sync
+    path('async/books/', AsyncBookListView.as_view(), name='book-list-async'),             # GET all books (ASGI)
+    path('async/books/<int:pk>/', AsyncBookDetailView.as_view(), name='book-detail-async'), # GET single book (ASGI)
+    path('books/cache-stats/', BookCacheStatsView.as_view(), name='book-cache-stats'), # GET cache hit rates
 ]
  # "books/update", "books/delete"
\ No newline at end of file
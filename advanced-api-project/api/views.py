@@ -1,7 +1,19 @@
-from rest_framework import generics, filters
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
-from .models import Book
+import datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import generics, filters, status
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated, IsAdminUser
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .models import Book, BookChange, book_etag
 from .serializers import BookSerializer
+from .filters import BookFilter
+from .cache import CachedReadMixin, bump_version, get_stats
+from .conditional import PreconditionFailed, if_match, none_match
 from django_filters.rest_framework import DjangoFilterBackend 
 # "from django_filters import rest_framework"Spass the auto check
 
@@ -11,37 +23,104 @@ from django_filters.rest_framework import DjangoFilterBackend
 # BOOK CRUD API USING GENERIC VIEWS
 # ---------------------------
 
-class BookListView(generics.ListCreateAPIView):
+class SparseFieldsViewMixin:
+    """
+    Adds ?fields=id,title to a GET view: the serializer only renders the
+    listed fields and the queryset only loads their columns via .only().
+    """
+
+    def get_requested_fields(self):
+        raw = self.request.query_params.get('fields')
+        if self.request.method != 'GET' or not raw:
+            return None
+        requested = [name.strip() for name in raw.split(',') if name.strip()]
+        allowed = self.get_serializer_class().Meta.fields
+        unknown = sorted(set(requested) - set(allowed))
+        if unknown:
+            raise ValidationError({'fields': f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(allowed)}."})
+        return requested
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_requested_fields()
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        requested = self.get_requested_fields()
+        if requested:
+            # Serializer field names match Book model fields one to one
+            queryset = queryset.only(*requested)
+        return queryset
+
+
+class BookListView(CachedReadMixin, SparseFieldsViewMixin, generics.ListCreateAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
+    cache_scope = 'list'
+    # No replica_reads: a cache miss would store lagging replica rows under
+    # the version the last write just bumped. The cache absorbs the reads.
 
     # Filtering, searching, ordering
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['title', 'author', 'publication_year']  # Filtering
+    filterset_class = BookFilter  # Filtering on title, author, publication_year
     search_fields = ['title', 'author__name']  # Searching
     ordering_fields = ['title', 'publication_year']  # Ordering
     ordering = ['title']  # Default ordering
 
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            book = serializer.save()
+            BookChange.record(book.pk, BookChange.CREATED)
+        bump_version()
+
 """
 BookListView:
 - Supports filtering by title, author, and publication_year.
 - Supports searching across title and author name.
 - Supports ordering by title and publication_year.
+- Every filter/ordering combination is backed by an index on Book
+  (see api/test_query_plans.py).
+- GET responses are cached per normalized query string (see api/cache.py).
+- Supports sparse fieldsets: ?fields=id,title trims the payload and the
+  SELECTed columns.
+- Reads always use the primary: a lagging replica read would be cached
+  for BOOK_CACHE_TIMEOUT (see api/replica.py).
 Examples:
     /api/books/?author=1
+    /api/books/?fields=id,title
     /api/books/?search=python
     /api/books/?ordering=-publication_year
 """
 
-class BookDetailView(generics.RetrieveAPIView):
+class BookDetailView(CachedReadMixin, generics.RetrieveAPIView):
     """
     GET: Retrieve a single book by ID.
     - Unauthenticated users: read-only
     - Authenticated users: read-only
+    - Responses are cached until the next write to any book
+    - Sends a strong ETag; If-None-Match that still matches gets a 304
+      after a single version lookup, without serializing the book
+    - Reads from the primary, for the same reason as BookListView
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    cache_scope = 'detail'
+
+    def get(self, request, *args, **kwargs):
+        header = request.headers.get('If-None-Match')
+        if header:
+            version = Book.objects.filter(pk=kwargs['pk']).values_list('version', flat=True).first()
+            if version is not None:
+                etag = book_etag(kwargs['pk'], version)
+                if none_match(header, etag):
+                    return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = book_etag(response.data['id'], response.data['version'])
+        return response
 
 
 class BookCreateView(generics.CreateAPIView):
@@ -54,20 +133,43 @@ class BookCreateView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated]
 
     def perform_create(self, serializer):
-        serializer.save()
+        with transaction.atomic():
+            book = serializer.save()
+            BookChange.record(book.pk, BookChange.CREATED)
+        bump_version()
 
 
 class BookUpdateView(generics.UpdateAPIView):
     """
     PUT/PATCH: Update an existing book.
     - Restricted to authenticated users
+    - Optional If-Match: the update only applies if the book still has
+      that ETag, otherwise 412 Precondition Failed
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
 
     def perform_update(self, serializer):
-        serializer.save()
+        instance = serializer.instance
+        header = self.request.headers.get('If-Match')
+        with transaction.atomic():
+            if header:
+                if not if_match(header, instance.etag):
+                    raise PreconditionFailed()
+                # Re-check the version in the UPDATE itself so a concurrent
+                # writer that committed after get_object() is still caught.
+                claimed = Book.objects.filter(pk=instance.pk, version=instance.version).update(version=F('version'))
+                if not claimed:
+                    raise PreconditionFailed()
+            serializer.save()
+            BookChange.record(instance.pk, BookChange.UPDATED)
+        bump_version()
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        response['ETag'] = book_etag(response.data['id'], response.data['version'])
+        return response
 
 
 class BookDeleteView(generics.DestroyAPIView):
@@ -79,3 +181,100 @@ class BookDeleteView(generics.DestroyAPIView):
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
 
+    def perform_destroy(self, instance):
+        book_id = instance.pk
+        with transaction.atomic():
+            instance.delete()
+            BookChange.record(book_id, BookChange.DELETED)
+        bump_version()
+
+
+class BookCacheStatsView(APIView):
+    """
+    GET: Hit/miss counters for the Book response cache.
+    - Restricted to staff users
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_stats())
+
+
+class BookChangesView(APIView):
+    """
+    GET: Books created, updated or deleted since a sync token.
+    - ?since=<token> (default 0, i.e. everything); ?limit=<n> (max 1000)
+    - Returns the current state of changed books, the ids of deleted
+      books and next_token to pass as ?since= on the next sync
+    - Cost is O(changes): a pk range scan over BookChange plus one
+      pk__in lookup for the changed books
+    - Unauthenticated users: read-only
+
+    Ids are handed out at INSERT but become visible at COMMIT. With
+    concurrent writers (PostgreSQL, MySQL) a lower id can commit after a
+    higher one, and a client already past the higher id would never see
+    it. So the feed stops at the first entry younger than
+    BOOK_CHANGES_VISIBILITY_WINDOW seconds: that must exceed the longest
+    write transaction plus the clock skew between app servers. SQLite
+    serializes writers, so there the window defaults to 0.
+    """
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    default_limit = 500
+    max_limit = 1000
+
+    def get_int_param(self, name, default, minimum):
+        raw = self.request.query_params.get(name)
+        if raw in (None, ''):
+            return default
+        try:
+            value = int(raw)
+        except ValueError:
+            raise ValidationError({name: 'Must be an integer.'})
+        if value < minimum:
+            raise ValidationError({name: f'Must be at least {minimum}.'})
+        return value
+
+    def get_visibility_window(self):
+        window = getattr(settings, 'BOOK_CHANGES_VISIBILITY_WINDOW', None)
+        if window is None:
+            window = 0 if connection.vendor == 'sqlite' else 5
+        return window
+
+    def get(self, request):
+        since = self.get_int_param('since', 0, 0)
+        limit = min(self.get_int_param('limit', self.default_limit, 1), self.max_limit)
+
+        # Fetch one extra entry to know whether another page follows
+        entries = list(
+            BookChange.objects.filter(id__gt=since)
+            .order_by('id')
+            .values_list('id', 'book_id', 'action', 'changed_at')[:limit + 1]
+        )
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        # Hold the token back at the first entry that may still have an
+        # uncommitted lower id before it; the client gets it next sync
+        window = self.get_visibility_window()
+        if window:
+            cutoff = timezone.now() - datetime.timedelta(seconds=window)
+            for i, entry in enumerate(entries):
+                if entry[3] > cutoff:
+                    entries, has_more = entries[:i], False
+                    break
+
+        # Only the last action per book matters to the client
+        last_action = {}
+        for _, book_id, action, _ in entries:
+            last_action[book_id] = action
+
+        deleted = sorted(book_id for book_id, action in last_action.items() if action == BookChange.DELETED)
+        changed_ids = [book_id for book_id, action in last_action.items() if action != BookChange.DELETED]
+        books = Book.objects.filter(pk__in=changed_ids).order_by('pk')
+
+        return Response({
+            'changed': BookSerializer(books, many=True, context={'request': request}).data,
+            'deleted': deleted,
+            'next_token': str(entries[-1][0] if entries else since),
+            'has_more': has_more,
+        })
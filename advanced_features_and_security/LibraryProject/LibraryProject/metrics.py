@@ -0,0 +1,332 @@
+"""
+Prometheus-style metrics: request latency histograms per URL name, DB
+query counts and time, and cache hits and misses.
+
+Each process aggregates into an in-memory registry and periodically
+writes a snapshot to METRICS['DIR']/<uuid>.json, named by a per-process
+UUID so a reused pid never overwrites another worker's totals (write to
+a temp file, then rename, so readers never see a partial file). The
+metrics view sums every process's snapshot and renders the text
+exposition format, so any worker can answer a scrape for the whole
+fleet on that host.
+
+Counters are never reset. On each scrape, the snapshots of exited
+workers are added to retired.json and removed, so totals stay monotonic
+while the directory stays one file per live worker. Remove the
+directory on deploy to start from zero.
+
+The view requires METRICS['TOKEN'] as a bearer token, or a staff
+session; with no token configured only staff can read it.
+
+DB counts come from an execute_wrapper on every database alias and are
+only collected for sync views; async views are timed but their queries
+run on other threads.
+"""
+import fcntl
+import hmac
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .replica import execute_wrapper_all
+
+# Upper bounds in seconds, as in the Prometheus client defaults
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS = {
+    'http_requests_total': ('counter', 'Requests by URL name, method and status.'),
+    'http_request_duration_seconds': ('histogram', 'Request latency by URL name.'),
+    'db_queries_total': ('counter', 'Database queries by URL name.'),
+    'db_query_duration_seconds_total': ('counter', 'Time spent in database queries by URL name.'),
+    'cache_requests_total': ('counter', 'Cache lookups by cache and result (hit or miss).'),
+}
+
+
+def get_config():
+    config = {
+        'DIR': Path(tempfile.gettempdir()) / 'django-metrics',
+        'FLUSH_INTERVAL': 5,
+        'TOKEN': None,
+    }
+    config.update(getattr(settings, 'METRICS', {}))
+    return config
+
+
+class Registry:
+    """
+    In-process metric values. Keys are (metric name, sorted label items);
+    counters hold a number, histograms [bucket counts..., sum, count].
+    """
+
+    def __init__(self):
+        self.values = defaultdict(float)
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.last_flush = 0.0
+        self.pid = None
+        self.name = None
+
+    def inc(self, name, labels, amount=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] += amount
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * len(BUCKETS) + [0.0, 0]
+            for i, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    histogram[i] += 1
+                    break
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'pid': os.getpid(),
+                'counters': [[name, labels, value] for (name, labels), value in self.values.items()],
+                'histograms': [[name, labels, list(h)] for (name, labels), h in self.histograms.items()],
+            }
+
+    def clear(self):
+        with self.lock:
+            self.values.clear()
+            self.histograms.clear()
+
+    def flush(self, directory, force=False, interval=0):
+        """Write this process's snapshot, at most once per interval."""
+        now = time.monotonic()
+        if not force and now - self.last_flush < interval:
+            return
+        self.last_flush = now
+        if self.pid != os.getpid():
+            # First flush, or a forked child: never share the parent's file
+            self.pid, self.name = os.getpid(), f'{uuid.uuid4().hex}.json'
+        write_snapshot(Path(directory) / self.name, self.snapshot())
+
+
+registry = Registry()
+
+
+def record_cache(cache_name, hit):
+    registry.inc('cache_requests_total', {'cache': cache_name, 'result': 'hit' if hit else 'miss'})
+
+
+def write_snapshot(path, snapshot):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(snapshot, f)
+    os.replace(tmp, path)
+
+
+def read_snapshot(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None  # a worker is mid-write or the file was removed
+
+
+def merge(counters, histograms, snapshot):
+    for name, labels, value in snapshot['counters']:
+        counters[(name, tuple(map(tuple, labels)))] += value
+    for name, labels, values in snapshot['histograms']:
+        key = (name, tuple(map(tuple, labels)))
+        if key in histograms:
+            histograms[key] = [a + b for a, b in zip(histograms[key], values)]
+        else:
+            histograms[key] = values
+
+
+def is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # alive, owned by another user
+    return True
+
+
+@contextmanager
+def locked(directory, operation):
+    """flock retired.lock, so collect() never sees a half-done retire()."""
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / 'retired.lock', 'a') as lock:
+        fcntl.flock(lock, operation)
+        yield
+
+
+def retire(directory):
+    """
+    Fold the snapshots of exited workers into retired.json and delete
+    them. A file stays listed in retired.json until a later call has
+    deleted it, so a crash between the write and the delete never counts
+    it twice. A pid reused by another process only delays retiring the
+    old file.
+    """
+    directory = Path(directory)
+    with locked(directory, fcntl.LOCK_EX):
+        retired = read_snapshot(directory / 'retired.json') or {'counters': [], 'histograms': [], 'files': []}
+        for name in retired['files']:
+            (directory / name).unlink(missing_ok=True)
+        counters, histograms = defaultdict(float), {}
+        merge(counters, histograms, retired)
+        exited = []
+        for path in directory.glob('*.json'):
+            if path.name == 'retired.json':
+                continue
+            snapshot = read_snapshot(path)
+            # Files written before snapshots carried a pid are retired too
+            if snapshot is None or (snapshot.get('pid') and is_running(snapshot['pid'])):
+                continue
+            merge(counters, histograms, snapshot)
+            exited.append(path.name)
+        if exited or retired['files']:
+            write_snapshot(directory / 'retired.json', {
+                'counters': [[name, labels, value] for (name, labels), value in counters.items()],
+                'histograms': [[name, labels, values] for (name, labels), values in histograms.items()],
+                'files': exited,
+            })
+        for name in exited:
+            (directory / name).unlink()
+
+
+def collect(directory):
+    """Sum the snapshots of every process in directory."""
+    directory = Path(directory)
+    counters = defaultdict(float)
+    histograms = {}
+    with locked(directory, fcntl.LOCK_SH):
+        retired = read_snapshot(directory / 'retired.json')
+        skip = set(retired['files']) if retired else set()
+        for path in directory.glob('*.json'):
+            if path.name in skip:
+                continue  # already counted in retired.json
+            snapshot = read_snapshot(path)
+            if snapshot is not None:
+                merge(counters, histograms, snapshot)
+    return counters, histograms
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels, **extra):
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in items) + '}'
+
+
+def render(counters, histograms):
+    """Text exposition format, version 0.0.4."""
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{format_labels(labels)} {value:g}')
+        else:
+            for (metric, labels), values in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(BUCKETS, values):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{format_labels(labels, le=f"{bound:g}")} {cumulative}')
+                lines.append(f'{name}_bucket{format_labels(labels, le="+Inf")} {values[-1]}')
+                lines.append(f'{name}_sum{format_labels(labels)} {values[-2]:g}')
+                lines.append(f'{name}_count{format_labels(labels)} {values[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """
+    Record every request's latency and DB usage under its URL name.
+    Unmatched paths are grouped under "unmatched" to bound the label set.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = get_config()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        queries = QueryCounter()
+        start = time.perf_counter()
+        with execute_wrapper_all(queries):
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - start, queries)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - start, None)
+        return response
+
+    def record(self, request, response, seconds, queries):
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        registry.inc('http_requests_total', {'view': view, 'method': request.method, 'status': str(response.status_code)})
+        registry.observe('http_request_duration_seconds', {'view': view}, seconds)
+        if queries is not None:
+            registry.inc('db_queries_total', {'view': view}, queries.count)
+            registry.inc('db_query_duration_seconds_total', {'view': view}, queries.seconds)
+        registry.flush(self.config['DIR'], interval=self.config['FLUSH_INTERVAL'])
+
+
+def metrics_view(request):
+    """
+    Metrics for every process on this host, in Prometheus text format.
+    Scrapers send METRICS['TOKEN'] as a bearer token; staff sessions are
+    let in without it.
+    """
+    config = get_config()
+    supplied = request.headers.get('Authorization', '').encode()
+    has_token = bool(config['TOKEN']) and hmac.compare_digest(supplied, f"Bearer {config['TOKEN']}".encode())
+    user = getattr(request, 'user', None)
+    if not (has_token or (user is not None and user.is_active and user.is_staff)):
+        return HttpResponseForbidden()
+    registry.flush(config['DIR'], force=True)
+    retire(config['DIR'])
+    counters, histograms = collect(config['DIR'])
+    return HttpResponse(render(counters, histograms), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,122 @@
+"""
+Query-count regression harness for view tests.
+
+- query_budget: context manager / decorator failing when a block runs
+  more queries than allowed (catches N+1 regressions)
+- assert_constant_queries: fails when a view's query count grows
+  across data scales (catches queries issued per row)
+- SCALES: row counts to seed; override with PERF_SCALES=10,1000,100000
+- time_call: wall-clock percentiles for a callable
+- assert_growth: fails when latency grows faster than rows ** k across
+  data scales (catches superlinear regressions)
+
+Query counts are deterministic and always asserted. Wall-clock timings
+in a shared test run are not, so the timing tests only run with
+PERF_TIMING=1, seeding TIMING_SCALES rows (PERF_TIMING_SCALES, default
+10,1000,100000).
+"""
+import math
+import os
+import time
+from contextlib import ContextDecorator
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+SCALES = tuple(int(n) for n in os.environ.get('PERF_SCALES', '10,1000').split(','))
+TIMING = os.environ.get('PERF_TIMING') == '1'
+TIMING_SCALES = tuple(int(n) for n in os.environ.get('PERF_TIMING_SCALES', '10,1000,100000').split(','))
+
+
+class query_budget(ContextDecorator):
+    """
+    Fail if the wrapped block runs more than max_queries queries.
+
+        with query_budget(2):
+            client.get(url)
+
+        @query_budget(1)
+        def test_detail(self): ...
+    """
+
+    def __init__(self, max_queries, using=DEFAULT_DB_ALIAS, label=None):
+        self.max_queries = max_queries
+        self.using = using
+        self.label = label
+
+    def __enter__(self):
+        self.context = CaptureQueriesContext(connections[self.using])
+        self.context.__enter__()
+        return self.context
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.context.__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return False
+        executed = len(self.context)
+        if executed > self.max_queries:
+            queries = '\n'.join(
+                f'{i}. {query["sql"]}' for i, query in enumerate(self.context.captured_queries, start=1)
+            )
+            raise AssertionError(
+                f'{self.label or "Block"} ran {executed} queries, budget is {self.max_queries}:\n{queries}'
+            )
+        return False
+
+
+def time_call(func, runs=5, warmup=1):
+    """
+    Call func warmup + runs times; return p50/p95/max wall-clock in ms.
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'p50': samples[len(samples) // 2],
+        'p95': samples[min(len(samples) - 1, math.ceil(len(samples) * 0.95) - 1)],
+        'max': samples[-1],
+    }
+
+
+def assert_constant_queries(counts, label='View'):
+    """
+    counts maps rows -> queries executed. Fail if the count grows between
+    any two consecutive scales; a drop (a cache warmed by the first
+    request) is fine.
+    """
+    scales = sorted(counts)
+    for small, large in zip(scales, scales[1:]):
+        if counts[large] > counts[small]:
+            raise AssertionError(
+                f'{label} ran {counts[small]} queries at {small} rows but {counts[large]} at {large} rows'
+            )
+
+
+def growth_exponent(small_rows, small_ms, large_rows, large_ms):
+    """
+    Slope of latency against rows on a log-log scale: ~0 for constant-time
+    views, ~1 for linear ones, >1 for superlinear ones.
+    """
+    return math.log(max(large_ms, 1e-6) / max(small_ms, 1e-6)) / math.log(large_rows / small_rows)
+
+
+def assert_growth(timings, max_exponent, label='View'):
+    """
+    timings maps rows -> time_call() result. Fail if p50 latency between
+    any two consecutive scales grows faster than rows ** max_exponent.
+    """
+    scales = sorted(timings)
+    for small, large in zip(scales, scales[1:]):
+        exponent = growth_exponent(small, timings[small]['p50'], large, timings[large]['p50'])
+        if exponent > max_exponent:
+            raise AssertionError(
+                f'{label} latency grows as rows^{exponent:.2f} from {small} to {large} rows '
+                f'(p50 {timings[small]["p50"]:.1f} ms -> {timings[large]["p50"]:.1f} ms, '
+                f'p95 {timings[small]["p95"]:.1f} ms -> {timings[large]["p95"]:.1f} ms), '
+                f'allowed rows^{max_exponent}'
+            )
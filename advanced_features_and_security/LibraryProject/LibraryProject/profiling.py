@@ -0,0 +1,194 @@
+"""
+Sampling request profiler.
+
+For a fraction of requests (PROFILING['SAMPLE_RATE']) ProfilingMiddleware
+records the total time, the SQL query count and time, the template render
+time and the most repeated queries. Profiles go to a bounded in-memory
+store, per process, which staff read at profiling_report.
+
+    MIDDLEWARE = ['LibraryProject.profiling.ProfilingMiddleware', ...]
+    TEMPLATES = [{'BACKEND': 'LibraryProject.profiling.ProfiledDjangoTemplates', ...}]
+
+SQL is timed with an execute_wrapper on every database alias, so only
+sampled requests pay for it. Template time comes from the template backend above; with the
+stock backend template_ms stays 0.
+"""
+import contextvars
+import random
+import threading
+import time
+from collections import Counter, defaultdict, deque
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.template.backends.django import DjangoTemplates, Template
+
+from .replica import execute_wrapper_all
+
+# The profile of the request being handled, if it was sampled
+current_profile = contextvars.ContextVar('current_profile', default=None)
+
+
+def get_config():
+    config = {'SAMPLE_RATE': 0.01, 'STORE_SIZE': 500, 'TOP_DUPLICATES': 5}
+    config.update(getattr(settings, 'PROFILING', {}))
+    return config
+
+
+class Profile:
+    """Measurements for one request."""
+
+    def __init__(self):
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.queries = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook: time every query of the request
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_ms += (time.perf_counter() - start) * 1000
+            # Parameters are not part of the SQL text, so an N+1 loop
+            # shows up as one statement with a high count
+            self.queries[sql] += 1
+
+
+class ProfileStore:
+    """Thread-safe ring buffer of the most recent request profiles."""
+
+    def __init__(self, size):
+        self.records = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def add(self, record):
+        with self.lock:
+            self.records.append(record)
+
+    def all(self):
+        with self.lock:
+            return list(self.records)
+
+    def clear(self):
+        with self.lock:
+            self.records.clear()
+
+    def summary(self, top=5):
+        """Aggregate the stored profiles per view, slowest first."""
+        by_view = defaultdict(list)
+        for record in self.all():
+            by_view[record['view']].append(record)
+
+        views = []
+        for view, records in by_view.items():
+            totals = sorted(r['total_ms'] for r in records)
+            duplicates = Counter()
+            for r in records:
+                for d in r['duplicates']:
+                    duplicates[d['sql']] = max(duplicates[d['sql']], d['count'])
+            views.append({
+                'view': view,
+                'samples': len(records),
+                'avg_total_ms': round(sum(totals) / len(totals), 2),
+                'p95_total_ms': round(totals[min(len(totals) - 1, int(len(totals) * 0.95))], 2),
+                'avg_sql_count': round(sum(r['sql_count'] for r in records) / len(records), 1),
+                'avg_sql_ms': round(sum(r['sql_ms'] for r in records) / len(records), 2),
+                'avg_template_ms': round(sum(r['template_ms'] for r in records) / len(records), 2),
+                'top_duplicates': [{'sql': sql, 'count': count} for sql, count in duplicates.most_common(top)],
+            })
+        return sorted(views, key=lambda v: v['avg_total_ms'], reverse=True)
+
+
+store = ProfileStore(get_config()['STORE_SIZE'])
+
+
+class ProfilingMiddleware:
+    """
+    Profile a random sample of requests into `store`. Unsampled requests
+    only pay for one random() call.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = get_config()
+        self.sample_rate = config['SAMPLE_RATE']
+        self.top_duplicates = config['TOP_DUPLICATES']
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        profile = Profile()
+        token = current_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            with execute_wrapper_all(profile):
+                response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        match = request.resolver_match
+        store.add({
+            'timestamp': time.time(),
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else request.path,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'sql_count': sum(profile.queries.values()),
+            'sql_ms': round(profile.sql_ms, 2),
+            'template_ms': round(profile.template_ms, 2),
+            'duplicates': [
+                {'sql': sql, 'count': count}
+                for sql, count in profile.queries.most_common(self.top_duplicates) if count > 1
+            ],
+        })
+        return response
+
+
+class ProfiledTemplate(Template):
+    def render(self, context=None, request=None):
+        profile = current_profile.get()
+        if profile is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            profile.template_ms += (time.perf_counter() - start) * 1000
+
+
+class ProfiledDjangoTemplates(DjangoTemplates):
+    """
+    DjangoTemplates backend whose templates report their render time to
+    the current profile. Included templates render inside their parent,
+    so each page's time is counted once.
+    """
+
+    def from_string(self, template_code):
+        return ProfiledTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return ProfiledTemplate(template.template, self)
+
+
+@staff_member_required
+def profiling_report(request):
+    """
+    Staff-only JSON report of the sampled profiles: per-view aggregates
+    and, with ?recent=N, the last N raw profiles.
+    """
+    config = get_config()
+    data = {
+        'sample_rate': config['SAMPLE_RATE'],
+        'stored': len(store.records),
+        'views': store.summary(top=config['TOP_DUPLICATES']),
+    }
+    recent = request.GET.get('recent', '')
+    if recent.isdigit() and int(recent):
+        data['recent'] = store.all()[-int(recent):]
+    return JsonResponse(data)
@@ -0,0 +1,123 @@
+"""
+Always-on detector for repeated queries, slow queries and per-view query
+budgets.
+
+QueryWatchMiddleware wraps every request's SQL, on every database alias,
+with an execute_wrapper that fingerprints each statement (literals, IN
+lists and whitespace normalized) and counts fingerprints. When the request finishes it logs,
+under the view name:
+
+- each fingerprint run DUPLICATE_THRESHOLD times or more (N+1 loops)
+- each statement slower than SLOW_QUERY_MS
+- the total when it exceeds the view's budget (BUDGETS, or DEFAULT_BUDGET)
+
+With RAISE on (useful in tests and local development) a blown budget
+raises QueryBudgetExceeded instead of logging.
+
+Per query the overhead is two perf_counter() calls, a cached fingerprint
+lookup and a Counter increment.
+"""
+import functools
+import logging
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+
+from .replica import execute_wrapper_all
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'DUPLICATE_THRESHOLD': 5,
+    'SLOW_QUERY_MS': 200,
+    'DEFAULT_BUDGET': None,
+    'BUDGETS': {},
+    'RAISE': False,
+}
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN \((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'QUERY_WATCH', {}))
+    return config
+
+
+@functools.lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """
+    Normalize a statement so queries differing only in literal values or
+    IN-list length compare equal. Cached: most requests repeat the same
+    SQL text, so this is a dict lookup after the first call.
+    """
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+class QueryWatcher:
+    """execute_wrapper hook that collects one request's statements."""
+
+    def __init__(self, slow_query_ms):
+        self.slow_query_ms = slow_query_ms
+        self.counts = Counter()
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.counts[fingerprint(sql)] += 1
+            if elapsed_ms >= self.slow_query_ms:
+                self.slow.append((elapsed_ms, sql))
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+
+class QueryWatchMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = get_config()
+
+    def get_budget(self, view_name):
+        return self.config['BUDGETS'].get(view_name, self.config['DEFAULT_BUDGET'])
+
+    def __call__(self, request):
+        watcher = QueryWatcher(self.config['SLOW_QUERY_MS'])
+        with execute_wrapper_all(watcher):
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        view_name = match.view_name if match else request.path
+        self.report(view_name, watcher)
+        return response
+
+    def report(self, view_name, watcher):
+        for sql, count in watcher.counts.items():
+            if count >= self.config['DUPLICATE_THRESHOLD']:
+                logger.warning('Repeated query in %s: %d x %s', view_name, count, sql)
+        for elapsed_ms, sql in watcher.slow:
+            logger.warning('Slow query in %s: %.1f ms %s', view_name, elapsed_ms, sql)
+
+        budget = self.get_budget(view_name)
+        if budget is not None and watcher.total > budget:
+            message = f'{view_name} ran {watcher.total} queries, budget is {budget}'
+            if self.config['RAISE']:
+                raise QueryBudgetExceeded(message)
+            logger.error(message)
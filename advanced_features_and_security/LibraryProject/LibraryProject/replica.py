@@ -0,0 +1,112 @@
+"""
+Read-replica routing.
+
+With REPLICA['ENABLED'] and a "replica" entry in DATABASES,
+PrimaryReplicaRouter sends every write to "default". Reads go to the
+replica only while ReplicaRoutingMiddleware has classified the current
+request as a replica read: a GET/HEAD of a view decorated with
+@replica_reads, from a client outside its sticky window.
+Any other request (POST, PUT, PATCH, DELETE) pins its client to the
+primary for REPLICA['STICKY_SECONDS'] with a cookie. The client then
+reads its own writes even while the replica lags.
+
+There is no replication here: DJANGO_READ_REPLICA=1 points "replica" at
+the primary's own SQLite file, which exercises the routing locally. In
+production, point DATABASES['replica'] at a real replica. Tests mirror
+"default" (TEST['MIRROR']).
+"""
+import contextvars
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+# True while the current request may read from the replica
+replica_allowed = contextvars.ContextVar('replica_allowed', default=False)
+
+
+def get_config():
+    config = {
+        'ENABLED': False,
+        'ALIAS': 'replica',
+        'STICKY_SECONDS': 5,
+        'COOKIE': 'db_primary_until',
+    }
+    config.update(getattr(settings, 'REPLICA', {}))
+    return config
+
+
+def replica_reads(view):
+    """Mark a function view as safe to serve from the replica."""
+    view.replica_reads = True
+    return view
+
+
+def is_replica_view(view_func, method):
+    """Read/write classification for a resolved view."""
+    return method in SAFE_METHODS and getattr(view_func, 'replica_reads', False)
+
+
+@contextmanager
+def execute_wrapper_all(wrapper):
+    """
+    connection.execute_wrapper(wrapper) on every alias in DATABASES, so
+    statements routed to the replica are seen as well as the primary's.
+    """
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(wrapper))
+        yield
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        config = get_config()
+        if replica_allowed.get() and config['ENABLED']:
+            return config['ALIAS']
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = replica_allowed.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_allowed.reset(token)
+        if request.method not in SAFE_METHODS:
+            config = get_config()
+            response.set_cookie(
+                config['COOKIE'],
+                str(time.time() + config['STICKY_SECONDS']),
+                max_age=config['STICKY_SECONDS'],
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def is_pinned(self, request):
+        try:
+            return float(request.COOKIES.get(get_config()['COOKIE'], 0)) > time.time()
+        except ValueError:
+            return False
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if is_replica_view(view_func, request.method) and not self.is_pinned(request):
+            replica_allowed.set(True)
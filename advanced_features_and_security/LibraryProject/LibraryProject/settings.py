@@ -1,3 +1,5 @@
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project
@@ -24,6 +26,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'LibraryProject.metrics.MetricsMiddleware',  # first, so latency covers the whole stack
+    'LibraryProject.profiling.ProfilingMiddleware',  # early, so it times the whole stack
+    'LibraryProject.querywatch.QueryWatchMiddleware',
+    'LibraryProject.replica.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -37,7 +43,8 @@ ROOT_URLCONF = 'LibraryProject.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to the request profiler
+        'BACKEND': 'LibraryProject.profiling.ProfiledDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],  # global templates folder
         'APP_DIRS': True,
         'OPTIONS': {
@@ -61,6 +68,17 @@ DATABASES = {
     }
 }
 
+# Read replica routing, see LibraryProject/replica.py
+REPLICA = {
+    'ENABLED': os.environ.get('DJANGO_READ_REPLICA') == '1',
+    'ALIAS': 'replica',
+    'STICKY_SECONDS': 5,
+}
+if REPLICA['ENABLED']:
+    DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['LibraryProject.replica.PrimaryReplicaRouter']
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -78,6 +96,42 @@ LOGOUT_REDIRECT_URL = '/login/'
 SESSION_COOKIE_AGE = 3600  # 1 hour
 SESSION_SAVE_EVERY_REQUEST = True
 
+# Request profiling (LibraryProject/profiling.py): fraction of requests
+# profiled, profiles kept per process, duplicate queries listed per profile
+PROFILING = {
+    'SAMPLE_RATE': 0.01,
+    'STORE_SIZE': 500,
+    'TOP_DUPLICATES': 5,
+}
+
+# Prometheus metrics (LibraryProject/metrics.py), served at /metrics.
+# Every worker on a host writes its snapshot into DIR; a scrape of any
+# worker returns the sum. Scrapers send "Authorization: Bearer <TOKEN>";
+# staff sessions need no token, and with TOKEN None only staff get in.
+METRICS = {
+    'DIR': Path(tempfile.gettempdir()) / 'library_project_metrics',
+    'FLUSH_INTERVAL': 5,  # seconds between snapshot writes per worker
+    'TOKEN': os.environ.get('DJANGO_METRICS_TOKEN'),
+}
+
+# Repeated/slow query detection and per-view query budgets
+# (LibraryProject/querywatch.py). Budgets are keyed by URL name and
+# include the session and user lookups every logged-in request makes.
+QUERY_WATCH = {
+    'DUPLICATE_THRESHOLD': 5,
+    'SLOW_QUERY_MS': 200,
+    'DEFAULT_BUDGET': 50,
+    'BUDGETS': {
+        'relationship_app:list_books': 10,
+        'relationship_app:library_detail': 12,
+        'relationship_app:book_detail': 10,
+        'admin:relationship_app_author_changelist': 20,
+        'admin:relationship_app_userprofile_changelist': 20,
+        'admin:auth_user_changelist': 20,
+    },
+    'RAISE': False,  # True turns a blown budget into an exception (tests, local runs)
+}
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -88,6 +142,77 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+# bookshelf.Book deletion (bookshelf/deletion.py). With SOFT_DELETE, deletes
+# only tombstone rows; `manage.py purge_deleted_books` removes them later
+# in PURGE_CHUNK_SIZE chunks, pausing PURGE_PAUSE seconds between chunks.
+BOOK_DELETION = {
+    'SOFT_DELETE': False,
+    'MAX_BATCH': 500,  # ids per batch delete request
+    'PURGE_CHUNK_SIZE': 500,
+    'PURGE_PAUSE': 0.05,
+}
+
+# ExampleForm submissions (bookshelf/contact_queue.py): the view queues
+# them; `manage.py process_contact_queue` forwards BATCH_SIZE at a time over
+# WORKERS threads to RECIPIENTS (None: MANAGERS) via HANDLER. With no
+# recipients at all, messages stay pending and the worker logs an error.
+CONTACT_QUEUE = {
+    'BATCH_SIZE': 100,
+    'WORKERS': 4,
+    'LEASE_SECONDS': 300,  # a crashed worker's batch is retried after this
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 60,  # seconds before a failed message is tried again
+    'RECIPIENTS': None,
+    'HANDLER': 'bookshelf.contact_queue.send_emails',
+}
+
+# Role checks (relationship_app/roles.py): 'profile' reads UserProfile on
+# every request; 'bitmask' caches each user's role as a small integer for
+# CACHE_TTL seconds. Only switch to 'bitmask' once CACHES points at a shared
+# backend: with this per-process LocMemCache a revoked role outlives the save.
+ROLES = {
+    'STORAGE': 'profile',
+    'CACHE_TTL': 300,
+}
+
+# Admin changelists on big tables (LibraryProject/changelist.py): filter
+# sidebars show the FACET_LIMIT most common values, cached FACET_TTL seconds;
+# lists are counted up to COUNT_CAP rows, cached COUNT_TTL seconds;
+# ESTIMATE_UNFILTERED shows the planner's estimate past the cap
+ADMIN_CHANGELIST = {
+    'FACET_TTL': 300,
+    'FACET_LIMIT': 100,
+    'COUNT_TTL': 60,
+    'COUNT_CAP': 10000,
+    'ESTIMATE_UNFILTERED': False,
+}
+
+# Admin bulk actions (LibraryProject/bulkupdate.py): "select all" over more
+# than BACKGROUND_THRESHOLD rows is queued as a BulkUpdateJob, which
+# `manage.py process_bulk_updates` applies CHUNK_SIZE rows at a time
+BULK_UPDATE = {
+    'BACKGROUND_THRESHOLD': 10000,
+    'CHUNK_SIZE': 5000,
+    'PAUSE': 0.01,
+    'LEASE_SECONDS': 300,  # a crashed worker's job is resumed after this
+}
+
+# Uploaded files
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Profile photo thumbnails (bookshelf/photos.py): square SIZES in every
+# format, rendered by WORKERS background threads after the upload commits
+PROFILE_PHOTOS = {
+    'SIZES': (64, 256),
+    'FORMATS': ('webp', 'jpeg'),
+    'QUALITY': 80,
+    'WORKERS': 2,
+    'CHUNK_SIZE': 64 * 1024,  # upload copy/hash chunk, bytes
+    'ATTEMPTS': 3,  # renders per upload when the error is not a decode error
+    'RETRY_DELAY': 2,  # seconds between those attempts
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -0,0 +1,13 @@
+"""
+Signals shared between apps, so a sender and its receivers never have to
+import each other.
+
+users_bulk_created(sender=<user model>, users=[...]) is sent after users
+are inserted with bulk_create(), which sends no post_save. It is a
+ModelSignal, so receivers can name the sender lazily:
+
+    @receiver(users_bulk_created, sender=settings.AUTH_USER_MODEL)
+"""
+from django.db.models.signals import ModelSignal
+
+users_bulk_created = ModelSignal(use_caching=True)
@@ -16,9 +16,13 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include  # Added missing include import
+from .metrics import metrics_view
+from .profiling import profiling_report
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('__profile__/', profiling_report, name='profiling_report'),  # staff-only sampled request profiles
+    path('metrics', metrics_view, name='metrics'),  # Prometheus scrape endpoint
     path("", include("bookshelf.urls")),  # ✅ Make sure bookshelf app URLs are included
     path('', include('relationship_app.urls')),  # Added missing comma
     path('', include('rbac.urls')),
@@ -0,0 +1,12 @@
+"""
+Benchmarks for LibraryProject.
+
+- catalogue: bulk-generates a synthetic catalogue (authors, books,
+  libraries, holdings, librarians, users with profiles)
+- scenarios: the measured operations (list, detail, search, admin
+  changelist, permission reconciliation)
+- runner: runs scenarios and reads/writes/compares JSON results
+
+Entry points are the generate_catalogue and run_benchmarks management
+commands in relationship_app.
+"""
@@ -0,0 +1,153 @@
+"""
+Synthetic catalogue generator.
+
+Rows are built in Python and written with bulk_create in batches, one
+transaction per batch, so millions of rows take minutes rather than
+hours. Signals do not fire for bulk_create, so user profiles are created
+explicitly. Distributions are seeded and therefore reproducible:
+
+- author productivity follows a Zipf-like curve (a few prolific authors,
+  a long tail with one or two books)
+- publication years skew towards recent decades
+- each book is held by one library plus a geometric number of others
+- roles are roughly 90% Member, 8% Librarian, 2% Admin
+"""
+import datetime
+import itertools
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from relationship_app.models import Author, Book, Librarian, Library, UserProfile
+
+User = UserProfile._meta.get_field('user').related_model
+
+# Preset sizes by number of books; other tables are derived from it
+SCALES = {
+    'tiny': 100,
+    'small': 10_000,
+    'medium': 100_000,
+    'large': 1_000_000,
+    'xlarge': 5_000_000,
+}
+
+# Password for every generated user; hashed once, not per user
+PASSWORD = 'benchmark-password'
+
+WORDS = (
+    'shadow river night garden silent empire lost secret winter city house '
+    'stone light dark last first little great golden broken hidden ocean '
+    'star fire iron glass queen king war peace song story dream road '
+    'forest mountain island storm moon sun heart memory time journey'
+).split()
+FIRST_NAMES = 'Ada Ben Cleo Dev Eli Farah Gus Hana Ivan Jun Kira Leo Mona Nils Omar Pia Quinn Rosa Sam Tara'.split()
+LAST_NAMES = 'Adams Brown Chen Diaz Evans Fischer Garcia Hill Ito Jones Khan Lopez Moore Novak Okafor Patel'.split()
+LANGUAGES = (('English', 70), ('Spanish', 10), ('French', 8), ('German', 6), ('Japanese', 4), ('Arabic', 2))
+ROLES = (('Member', 90), ('Librarian', 8), ('Admin', 2))
+CITIES = 'Springfield Riverside Fairview Franklin Greenville Clinton Salem Madison Georgetown Arlington'.split()
+
+
+def get_counts(books):
+    """Row counts for a catalogue of `books` books."""
+    return {
+        'authors': max(10, books // 25),
+        'books': books,
+        'libraries': max(3, books // 5_000),
+        'users': max(10, books // 10),
+    }
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def weighted(rng, pairs, k):
+    values, weights = zip(*pairs)
+    return rng.choices(values, weights=weights, k=k)
+
+
+def generate(books, seed=0, batch_size=5_000, log=None):
+    """
+    Append a catalogue of `books` books (and the derived authors,
+    libraries, librarians and users) to the database. Returns the number
+    of rows written per table.
+    """
+    rng = random.Random(seed)
+    counts = get_counts(books)
+    log = log or (lambda message: None)
+    written = {}
+
+    def write(model, rows):
+        created = []
+        for batch in batched(rows, batch_size):
+            with transaction.atomic():
+                created.extend(obj.pk for obj in model.objects.bulk_create(batch, batch_size=batch_size))
+        written[model._meta.label] = written.get(model._meta.label, 0) + len(created)
+        log(f'{model._meta.label}: {len(created)} rows')
+        return created
+
+    # Offsets keep unique values unique when appending to an existing catalogue
+    book_offset = Book.objects.count()
+    user_offset = User.objects.count()
+
+    author_ids = write(Author, (
+        Author(name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}') for i in range(counts['authors'])
+    ))
+    # Zipf-like productivity: the author at rank r gets weight 1 / r^1.1
+    cum_weights = list(itertools.accumulate(1 / (rank ** 1.1) for rank in range(1, len(author_ids) + 1)))
+    this_year = datetime.date.today().year
+
+    def make_book(i):
+        year = max(1800, this_year - int(rng.expovariate(1 / 25)))
+        return Book(
+            title=' '.join(rng.choices(WORDS, k=rng.randint(1, 5))).title(),
+            author_id=rng.choices(author_ids, cum_weights=cum_weights)[0],
+            publication_date=datetime.date(year, rng.randint(1, 12), rng.randint(1, 28)),
+            isbn=f'978{book_offset + i:010d}',
+            pages=min(1500, max(40, int(rng.gauss(320, 90)))),
+            cover='paperback' if rng.random() < 0.6 else 'hardcover',
+            language=weighted(rng, LANGUAGES, 1)[0],
+        )
+
+    book_ids = write(Book, (make_book(i) for i in range(books)))
+
+    library_ids = write(Library, (
+        Library(name=f'{rng.choice(CITIES)} Library {i}', location=f'{rng.randint(1, 999)} Main St, {rng.choice(CITIES)}')
+        for i in range(counts['libraries'])
+    ))
+    write(Librarian, (
+        Librarian(name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}', library_id=library_id)
+        for library_id in library_ids
+    ))
+
+    def holdings():
+        for book_id in book_ids:
+            copies = 1
+            while copies < len(library_ids) and rng.random() < 0.5:
+                copies += 1
+            for library_id in rng.sample(library_ids, copies):
+                yield Library.books.through(library_id=library_id, book_id=book_id)
+
+    write(Library.books.through, holdings())
+
+    password = make_password(PASSWORD)
+    start = datetime.datetime.now(datetime.timezone.utc)
+    user_ids = write(User, (
+        User(
+            username=f'reader{user_offset + i}',
+            email=f'reader{user_offset + i}@example.com',
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=rng.choice(LAST_NAMES),
+            password=password,
+            date_joined=start - datetime.timedelta(days=rng.randint(0, 5 * 365)),
+        )
+        for i in range(counts['users'])
+    ))
+    write(UserProfile, (
+        UserProfile(user_id=user_id, role=role)
+        for user_id, role in zip(user_ids, weighted(rng, ROLES, len(user_ids)))
+    ))
+    return written
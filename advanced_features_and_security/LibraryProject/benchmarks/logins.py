@@ -0,0 +1,69 @@
+"""
+Logins-per-second benchmark.
+
+Creates `logins` accounts with bookshelf.provisioning.bulk_create_users
+(profiles included) inside a transaction that is rolled back, then logs
+each one in twice with django.test.Client:
+
+- "password": Client.login(), i.e. authenticate() with the password
+  hasher plus login(), as the login form does;
+- "session": Client.force_login(), login() alone, which isolates the
+  database work (session row, last_login UPDATE and post_save
+  receivers) from the deliberately slow hashing.
+
+Users are hashed with the default hasher unless told otherwise; with a
+different one check_password() would re-hash and save on every login.
+"""
+import datetime
+import platform
+import time
+
+import django
+from django.db import connection, transaction
+from django.test import Client
+
+from bookshelf.provisioning import bulk_create_users
+from relationship_app.models import UserProfile
+from .runner import count_queries, git_commit
+
+User = UserProfile._meta.get_field('user').related_model
+
+
+def measure(users, log_in):
+    with count_queries() as queries:
+        start = time.perf_counter()
+        for user in users:
+            log_in(Client(SERVER_NAME='localhost'), user)
+        elapsed = time.perf_counter() - start
+    return {
+        'seconds': round(elapsed, 3),
+        'logins_per_second': round(len(users) / elapsed, 1),
+        'queries_per_login': round(len(queries) / len(users), 1),
+    }
+
+
+def run(logins=20, hasher='default', log=None):
+    log = log or (lambda message: None)
+    rows = [{'username': f'login_bench_{i}', 'email': f'login{i}@example.com', 'password': f'secret-{i}'} for i in range(logins)]
+    results = {}
+    with transaction.atomic():
+        users = bulk_create_users(User._default_manager, rows, hasher=hasher, processes=1)
+        passwords = {row['username']: row['password'] for row in rows}
+        results['password'] = measure(
+            users, lambda client, user: client.login(username=user.username, password=passwords[user.username]),
+        )
+        results['session'] = measure(users, lambda client, user: client.force_login(user))
+        transaction.set_rollback(True)
+    for mode, result in results.items():
+        log(f"{mode:<10} {result['logins_per_second']:>10.1f} logins/s  {result['queries_per_login']:>5} queries per login")
+
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'logins': logins,
+        'hasher': hasher,
+        'results': results,
+    }
@@ -0,0 +1,57 @@
+"""
+Users-per-second benchmark for bulk provisioning.
+
+For each process count, creates `users` accounts with
+bookshelf.provisioning.bulk_create_users inside a transaction that is
+rolled back, so the database is left as it was. Hashing dominates, so
+throughput should scale with cores up to the machine's core count.
+"""
+import datetime
+import os
+import platform
+import time
+
+import django
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+
+from bookshelf.provisioning import bulk_create_users
+from .runner import git_commit
+
+
+def default_process_counts():
+    counts, n = [], 1
+    while n < (os.cpu_count() or 1):
+        counts.append(n)
+        n *= 2
+    return counts + [os.cpu_count() or 1]
+
+
+def run(users=1000, process_counts=None, hasher='default', log=None):
+    log = log or (lambda message: None)
+    manager = get_user_model()._default_manager
+    results = []
+    for processes in process_counts or default_process_counts():
+        rows = [
+            {'username': f'provision_{processes}_{i}', 'email': f'provision{i}@example.com', 'password': f'secret-{i}'}
+            for i in range(users)
+        ]
+        with transaction.atomic():
+            start = time.perf_counter()
+            bulk_create_users(manager, rows, hasher=hasher, processes=processes)
+            elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+        results.append({'processes': processes, 'seconds': round(elapsed, 3), 'users_per_second': round(users / elapsed, 1)})
+        log(f'{processes:>3} processes  {users / elapsed:>10.1f} users/s  ({elapsed:.2f}s for {users})')
+
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'cpu_count': os.cpu_count(),
+        'users': users,
+        'hasher': hasher,
+        'provisioning': results,
+    }
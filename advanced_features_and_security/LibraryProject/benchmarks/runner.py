@@ -0,0 +1,119 @@
+"""
+Run scenarios and record results as JSON.
+
+A result file holds the environment (commit, versions, database), the
+catalogue row counts and, per scenario, latency percentiles and the
+number of queries one call runs. Two files from different commits can be
+compared with compare().
+"""
+import datetime
+import json
+import platform
+import subprocess
+from contextlib import contextmanager
+
+import django
+from django.db import connection
+
+from LibraryProject.perf import time_call
+from relationship_app.models import Author, Book, Librarian, Library, UserProfile
+from .scenarios import SCENARIOS, BenchContext
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextmanager
+def count_queries():
+    """
+    Collect the SQL run inside the block. Unlike CaptureQueriesContext
+    this is not capped at 9000 entries and does not need DEBUG.
+    """
+    executed = []
+
+    def wrapper(execute, sql, params, many, context):
+        executed.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield executed
+
+
+def catalogue_counts():
+    return {
+        'authors': Author.objects.count(),
+        'books': Book.objects.count(),
+        'libraries': Library.objects.count(),
+        'holdings': Library.books.through.objects.count(),
+        'librarians': Librarian.objects.count(),
+        'users': UserProfile.objects.count(),
+    }
+
+
+def run(names=None, runs=None, seed=0, log=None):
+    """
+    Run the named scenarios (default: all). runs overrides each
+    scenario's own run count. Returns the result document.
+    """
+    log = log or (lambda message: None)
+    ctx = BenchContext(seed=seed)
+    results = {}
+    for name in names or SCENARIOS:
+        func, default_runs, description = SCENARIOS[name]
+        call = func(ctx)
+        with count_queries() as queries:
+            call()
+        query_count = len(queries)
+        timing = time_call(call, runs=runs or default_runs, warmup=0)
+        results[name] = {
+            'description': description,
+            'runs': runs or default_runs,
+            'queries': query_count,
+            'p50_ms': round(timing['p50'], 2),
+            'p95_ms': round(timing['p95'], 2),
+            'max_ms': round(timing['max'], 2),
+        }
+        log(f"{name:<26} p50 {timing['p50']:>10.1f} ms  p95 {timing['p95']:>10.1f} ms  {query_count:>6} queries")
+
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'catalogue': catalogue_counts(),
+        'scenarios': results,
+    }
+
+
+def save(result, path):
+    with open(path, 'w') as f:
+        json.dump(result, f, indent=2)
+        f.write('\n')
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, current):
+    """
+    Per-scenario change between two result documents, as rows of
+    (name, baseline p50, current p50, percent change, query delta).
+    Scenarios missing from either side are skipped.
+    """
+    rows = []
+    for name, now in current['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if before is None:
+            continue
+        change = (now['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100 if before['p50_ms'] else 0.0
+        rows.append((name, before['p50_ms'], now['p50_ms'], round(change, 1), now['queries'] - before['queries']))
+    return rows
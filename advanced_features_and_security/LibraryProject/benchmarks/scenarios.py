@@ -0,0 +1,102 @@
+"""
+Benchmark scenarios.
+
+Each scenario is a function taking a BenchContext and returning the
+zero-argument callable to time. Requests go through the full middleware
+stack with django.test.Client, logged in as a staff superuser.
+"""
+import io
+import random
+
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+
+from relationship_app.models import Book, UserProfile
+
+User = UserProfile._meta.get_field('user').related_model
+
+BENCH_USERNAME = 'bench_admin'
+
+
+class BenchContext:
+    """Shared state for scenarios: a logged-in client and sample rows."""
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        user = User.objects.filter(username=BENCH_USERNAME).first()
+        if user is None:
+            user = User.objects.create_superuser(username=BENCH_USERNAME, email='', password=None)
+        # ALLOWED_HOSTS rejects the test client's default 'testserver'
+        self.client = Client(SERVER_NAME='localhost')
+        self.client.force_login(user)
+        # A fixed sample of ids so every run hits the same rows
+        last_id = Book.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        self.book_ids = list(
+            Book.objects.filter(pk__gte=self.rng.randint(0, last_id)).values_list('pk', flat=True)[:50]
+        ) or list(Book.objects.values_list('pk', flat=True)[:50])
+        self.search_terms = ['shadow', 'golden river', '978000000', 'queen']
+
+    def get(self, url, data=None):
+        # secure=True: SECURE_SSL_REDIRECT would answer plain HTTP with a 301
+        response = self.client.get(url, data, secure=True)
+        if response.status_code != 200:
+            raise RuntimeError(f'GET {url} returned {response.status_code}')
+        return response
+
+
+def book_list(ctx):
+    url = reverse('relationship_app:list_books')
+    return lambda: ctx.get(url)
+
+
+def book_detail(ctx):
+    ids = iter(ctx.book_ids * 1000)
+    return lambda: ctx.get(reverse('relationship_app:book_detail', kwargs={'book_id': next(ids)}))
+
+
+def book_search(ctx):
+    url = reverse('admin:relationship_app_book_changelist')
+    terms = iter(ctx.search_terms * 1000)
+    return lambda: ctx.get(url, {'q': next(terms)})
+
+
+def admin_book_changelist(ctx):
+    url = reverse('admin:relationship_app_book_changelist')
+    return lambda: ctx.get(url)
+
+
+def admin_profile_changelist(ctx):
+    url = reverse('admin:relationship_app_userprofile_changelist')
+    return lambda: ctx.get(url)
+
+
+def role_check(ctx):
+    # member_dashboard does nothing but the role check and a render
+    url = reverse('relationship_app:member_dashboard')
+    return lambda: ctx.get(url)
+
+
+def login(ctx):
+    # The login's own writes (last_login and the post_save receivers);
+    # password hashing is left out so the database work stays visible
+    user = User.objects.get(username=BENCH_USERNAME)
+    client = Client(SERVER_NAME='localhost')
+    return lambda: client.force_login(user)
+
+
+def permission_reconciliation(ctx):
+    return lambda: call_command('assign_permissions', stdout=io.StringIO())
+
+
+# name -> (function, runs, description). Slow whole-table scenarios run once.
+SCENARIOS = {
+    'list': (book_list, 3, 'relationship_app list_books page'),
+    'detail': (book_detail, 20, 'relationship_app book_detail page'),
+    'search': (book_search, 10, 'admin Book changelist with ?q='),
+    'admin_changelist': (admin_book_changelist, 10, 'admin Book changelist'),
+    'admin_profile_changelist': (admin_profile_changelist, 10, 'admin UserProfile changelist'),
+    'role_check': (role_check, 20, 'relationship_app member_dashboard (role check)'),
+    'login': (login, 20, 'login() without password hashing'),
+    'permissions': (permission_reconciliation, 1, 'assign_permissions over every profile'),
+}
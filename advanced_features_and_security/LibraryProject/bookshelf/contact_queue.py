@@ -0,0 +1,203 @@
+"""
+Durable queue for ExampleForm submissions, stored in the ContactMessage
+table.
+
+The view only INSERTs a pending row. `manage.py process_contact_queue`
+then loops:
+
+1. claim up to BATCH_SIZE pending rows (and rows whose lease expired)
+   with one UPDATE that stamps a claim id, so several workers never
+   take the same row;
+2. split the batch over a pool of WORKERS threads, each forwarding its
+   share through HANDLER over a single mail connection;
+3. record the outcome with one UPDATE per result: done, retry after
+   RETRY_DELAY seconds, or failed after MAX_ATTEMPTS.
+
+HANDLER(messages) returns {message id: exception} for the messages it
+could not send (or None when all went out), so a chunk that partly
+failed only retries the failed ones. Raising fails the whole chunk;
+raising Deferred puts it back as pending without spending an attempt,
+e.g. while no recipients are configured.
+
+Only the worker's main thread touches the database; the pool does the
+slow I/O. A worker that dies mid-batch leaves its rows leased, and they
+are picked up again once LEASE_SECONDS have passed; that reclaim counts
+as an attempt, so a message that keeps killing workers is eventually
+failed. The outcome UPDATEs only touch rows that still carry the
+batch's claim id, so a worker that overran its lease cannot overwrite
+rows another worker has reclaimed since.
+"""
+import datetime
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core import mail
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import ContactMessage
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BATCH_SIZE': 100,
+    'WORKERS': 4,
+    'LEASE_SECONDS': 300,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 60,
+    'RECIPIENTS': None,  # None: settings.MANAGERS
+    'HANDLER': 'bookshelf.contact_queue.send_emails',
+}
+
+
+class Deferred(Exception):
+    """Raised by a HANDLER when a chunk cannot be sent yet; no attempt is spent."""
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'CONTACT_QUEUE', {}))
+    return config
+
+
+def enqueue(name, email, message):
+    return ContactMessage.objects.create(name=name, email=email, message=message)
+
+
+def send_emails(messages):
+    """
+    Default HANDLER: forward a chunk of messages over one connection,
+    one send per message so a failure only affects that message.
+    With no recipients configured the chunk is deferred, not dropped.
+    """
+    config = get_config()
+    recipients = config['RECIPIENTS']
+    if recipients is None:
+        recipients = [address for _, address in settings.MANAGERS]
+    if not recipients:
+        logger.error('Contact messages are not forwarded: set CONTACT_QUEUE["RECIPIENTS"] or MANAGERS')
+        raise Deferred('No recipients for contact messages')
+    failed = {}
+    with mail.get_connection() as connection:
+        for m in messages:
+            email = mail.EmailMessage(
+                subject=f'{settings.EMAIL_SUBJECT_PREFIX}Contact form: {m.name}',
+                body=m.message,
+                to=recipients,
+                reply_to=[m.email],
+                connection=connection,
+            )
+            try:
+                email.send()
+            except Exception as exc:
+                failed[m.id] = exc
+    return failed
+
+
+def claim_batch(size, lease_seconds, max_attempts=None):
+    """Lease up to `size` messages to this worker and return them."""
+    if max_attempts is None:
+        max_attempts = get_config()['MAX_ATTEMPTS']
+    now = timezone.now()
+    claim = uuid.uuid4()
+    expired = Q(status=ContactMessage.PROCESSING, locked_until__lt=now)
+    # A lease that ran out means the worker died on the row: that was an attempt
+    ContactMessage.objects.filter(expired, attempts__gte=max_attempts - 1).update(
+        status=ContactMessage.FAILED, attempts=F('attempts') + 1, last_error='Lease expired',
+        claim=None, locked_until=None,
+    )
+    # Pending rows not waiting out a retry delay, and expired leases
+    available = Q(status__in=[ContactMessage.PENDING, ContactMessage.PROCESSING]) & (
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+    )
+    ids = ContactMessage.objects.filter(available).order_by('id').values('id')[:size]
+    claimed = ContactMessage.objects.filter(available, id__in=ids).update(
+        status=ContactMessage.PROCESSING,
+        attempts=F('attempts') + Case(When(expired, then=Value(1)), default=Value(0)),
+        claim=claim,
+        locked_until=now + datetime.timedelta(seconds=lease_seconds),
+    )
+    if not claimed:
+        return []
+    return list(ContactMessage.objects.filter(claim=claim).order_by('id'))
+
+
+def split(items, parts):
+    size = -(-len(items) // parts)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def process_batch(messages, pool, workers, handler, max_attempts, retry_delay):
+    """Forward messages in parallel chunks; returns (done, failed) counts."""
+    claim = messages[0].claim
+    chunks = split(messages, workers)
+    futures = [(chunk, pool.submit(handler, chunk)) for chunk in chunks]
+    done, retry, deferred = [], {}, {}
+    for chunk, future in futures:
+        try:
+            errors = future.result() or {}
+        except Deferred as exc:
+            deferred.setdefault(repr(exc), []).extend(m.id for m in chunk)
+            continue
+        except Exception as exc:
+            errors = {m.id: exc for m in chunk}
+        if errors:
+            logger.warning('Forwarding %d of %d contact messages failed', len(errors), len(chunk))
+        for m in chunk:
+            if m.id in errors:
+                retry.setdefault(repr(errors[m.id]), []).append(m.id)
+            else:
+                done.append(m.id)
+
+    forwarded = 0
+    if done:
+        forwarded = ContactMessage.objects.filter(id__in=done, claim=claim).update(
+            status=ContactMessage.DONE, processed_at=timezone.now(), claim=None, locked_until=None,
+        )
+    failed = 0
+    for error, ids in retry.items():
+        queryset = ContactMessage.objects.filter(id__in=ids, claim=claim)
+        failed += queryset.filter(attempts__gte=max_attempts - 1).update(
+            status=ContactMessage.FAILED, attempts=F('attempts') + 1, last_error=error, claim=None, locked_until=None,
+        )
+        queryset.filter(attempts__lt=max_attempts - 1).update(
+            status=ContactMessage.PENDING, attempts=F('attempts') + 1, last_error=error, claim=None,
+            locked_until=timezone.now() + datetime.timedelta(seconds=retry_delay),
+        )
+    for error, ids in deferred.items():
+        ContactMessage.objects.filter(id__in=ids, claim=claim).update(
+            status=ContactMessage.PENDING, last_error=error, claim=None,
+            locked_until=timezone.now() + datetime.timedelta(seconds=retry_delay),
+        )
+    return forwarded, failed
+
+
+def run_worker(batch_size=None, workers=None, once=False, idle_sleep=1.0, log=None):
+    """
+    Drain the queue batch by batch. With once, return when it is empty;
+    otherwise poll every idle_sleep seconds. Returns (done, failed).
+    """
+    config = get_config()
+    batch_size = batch_size or config['BATCH_SIZE']
+    workers = workers or config['WORKERS']
+    handler = import_string(config['HANDLER'])
+    totals = [0, 0]
+    with ThreadPoolExecutor(workers, thread_name_prefix='contact-queue') as pool:
+        while True:
+            messages = claim_batch(batch_size, config['LEASE_SECONDS'], config['MAX_ATTEMPTS'])
+            if not messages:
+                if once:
+                    return tuple(totals)
+                time.sleep(idle_sleep)
+                continue
+            done, failed = process_batch(
+                messages, pool, workers, handler, config['MAX_ATTEMPTS'], config['RETRY_DELAY'],
+            )
+            totals[0] += done
+            totals[1] += failed
+            if log:
+                log(f'Forwarded {done} of {len(messages)} messages ({failed} given up)')
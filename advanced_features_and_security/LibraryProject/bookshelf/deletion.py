@@ -0,0 +1,69 @@
+"""
+Book deletion: batch deletes, optional soft-delete and the chunked purge.
+
+With BOOK_DELETION['SOFT_DELETE'] on, deleting a book only stamps its
+deleted_at (one UPDATE, no cascade collection); Book.objects hides it
+from then on. purge_tombstones() later removes stamped rows
+PURGE_CHUNK_SIZE at a time, each chunk in its own short transaction, so
+SQLite's write lock is never held for long and other writers get a turn
+between chunks (PURGE_PAUSE seconds).
+"""
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Book
+
+DEFAULTS = {
+    'SOFT_DELETE': False,
+    'MAX_BATCH': 500,
+    'PURGE_CHUNK_SIZE': 500,
+    'PURGE_PAUSE': 0.05,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'BOOK_DELETION', {}))
+    return config
+
+
+def delete_books(ids):
+    """
+    Delete (or tombstone) the books in ids with a single statement.
+    Returns the number of books removed from view.
+    """
+    books = Book.objects.filter(pk__in=ids)
+    if get_config()['SOFT_DELETE']:
+        return books.update(deleted_at=timezone.now())
+    return books.delete()[0]
+
+
+def purge_tombstones(chunk_size=None, pause=None, older_than=None, log=None):
+    """
+    Hard-delete soft-deleted books in bounded chunks. older_than (a
+    timedelta) keeps recent tombstones around, e.g. for an undo window.
+    Returns the number of rows purged.
+    """
+    config = get_config()
+    chunk_size = chunk_size or config['PURGE_CHUNK_SIZE']
+    pause = config['PURGE_PAUSE'] if pause is None else pause
+    tombstones = Book.all_objects.tombstoned()
+    if older_than is not None:
+        tombstones = tombstones.filter(deleted_at__lte=timezone.now() - older_than)
+
+    purged = 0
+    while True:
+        # Served by the partial index on tombstoned rows
+        ids = list(tombstones.order_by('pk').values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            return purged
+        with transaction.atomic():
+            purged += Book.all_objects.filter(pk__in=ids).delete()[0]
+        if log:
+            log(f'Purged {purged} books')
+        if len(ids) < chunk_size:
+            return purged
+        time.sleep(pause)
@@ -12,7 +12,7 @@ class CustomUserCreationForm(UserCreationForm):
 class CustomUserChangeForm(UserChangeForm):
     class Meta:
         model = CustomUser
-        fields = UserChangeForm.Meta.fields + ("email", "date_of_birth", "profile_photo")
+        fields = ("username", "email", "first_name", "last_name", "date_of_birth", "profile_photo")
 
 
 class BookForm(forms.ModelForm):
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from LibraryProject.bulkupdate import run_worker
+
+
+class Command(BaseCommand):
+    help = 'Apply queued "select all" admin updates in chunks, resuming interrupted jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when no job is left instead of polling')
+        parser.add_argument('--idle-sleep', type=float, default=1.0, help='Seconds between polls when no job is queued')
+
+    def handle(self, *args, **options):
+        done, failed = run_worker(
+            once=options['once'],
+            idle_sleep=options['idle_sleep'],
+            log=self.stdout.write if options['verbosity'] > 1 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Finished {done} jobs, {failed} failed'))
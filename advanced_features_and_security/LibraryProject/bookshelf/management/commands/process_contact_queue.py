@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from bookshelf.contact_queue import run_worker
+
+
+class Command(BaseCommand):
+    help = 'Forward queued ExampleForm submissions in batches over a thread pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Messages claimed per batch (default CONTACT_QUEUE['BATCH_SIZE'])")
+        parser.add_argument('--workers', type=int, help="Forwarding threads (default CONTACT_QUEUE['WORKERS'])")
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty instead of polling')
+        parser.add_argument('--idle-sleep', type=float, default=1.0, help='Seconds between polls of an empty queue')
+
+    def handle(self, *args, **options):
+        done, failed = run_worker(
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            once=options['once'],
+            idle_sleep=options['idle_sleep'],
+            log=self.stdout.write if options['verbosity'] > 1 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Forwarded {done} messages, gave up on {failed}'))
@@ -0,0 +1,24 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from bookshelf.deletion import purge_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Hard-delete soft-deleted books in small chunks (run from cron or a scheduler)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, help="Rows per DELETE transaction (default BOOK_DELETION['PURGE_CHUNK_SIZE'])")
+        parser.add_argument('--pause', type=float, help="Seconds to sleep between chunks (default BOOK_DELETION['PURGE_PAUSE'])")
+        parser.add_argument('--older-than', type=int, default=0, help='Only purge books deleted at least this many minutes ago')
+
+    def handle(self, *args, **options):
+        older_than = datetime.timedelta(minutes=options['older_than']) if options['older_than'] else None
+        purged = purge_tombstones(
+            chunk_size=options['chunk_size'],
+            pause=options['pause'],
+            older_than=older_than,
+            log=self.stdout.write if options['verbosity'] > 1 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} books'))
@@ -1,5 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.urls import reverse
+
+from .photos import content_hash, get_config as get_photo_config, get_profile_photo_storage, thumbnail_name
+from .provisioning import bulk_create_users
 
 
 class CustomUserManager(BaseUserManager):
@@ -26,10 +30,25 @@ class CustomUserManager(BaseUserManager):
 
         return self.create_user(username, email, password, **extra_fields)
 
+    def create_users(self, rows, hasher="default", processes=None, batch_size=1000):
+        """
+        Bulk create_user(): rows are dicts with username, email, password
+        and any other fields. Passwords are hashed in a process pool and
+        the users inserted with bulk_create (bookshelf/provisioning.py).
+        """
+        rows = list(rows)
+        for row in rows:
+            if not row.get("email"):
+                raise ValueError("The Email field is required")
+        return bulk_create_users(self, rows, hasher=hasher, processes=processes, batch_size=batch_size)
+
 
 class CustomUser(AbstractUser):
     date_of_birth = models.DateField(null=True, blank=True)
-    profile_photo = models.ImageField(upload_to="profile_photos/", null=True, blank=True)
+    # Content-hashed and thumbnailed in the background (bookshelf/photos.py)
+    profile_photo = models.ImageField(
+        upload_to="profile_photos/", storage=get_profile_photo_storage, null=True, blank=True
+    )
 
     objects = CustomUserManager()
 
@@ -42,18 +61,121 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return self.username
 
+    def profile_photo_url(self, size=64, fmt="webp"):
+        """
+        URL of the size x size thumbnail, or of the original for photos
+        uploaded before the pipeline existed. None without a photo.
+        """
+        if not self.profile_photo:
+            return None
+        digest = content_hash(self.profile_photo.name)
+        if digest is None or size not in get_photo_config()["SIZES"]:
+            return self.profile_photo.url
+        return reverse("profile_photo_thumbnail", args=[thumbnail_name(digest, size, fmt)])
+
+
+class BookQuerySet(models.QuerySet):
+    def tombstoned(self):
+        return self.filter(deleted_at__isnull=False)
+
+
+class LiveBookManager(models.Manager.from_queryset(BookQuerySet)):
+    """Books that have not been soft-deleted (bookshelf/deletion.py)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
 
 class Book(models.Model):
     title = models.CharField(max_length=200)
     author = models.CharField(max_length=100)
     publication_year = models.PositiveIntegerField()
+    is_classic = models.BooleanField(default=False)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveBookManager()
+    all_objects = BookQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.title} by {self.author} ({self.publication_year})"
 
     class Meta:
         ordering = ["publication_year"]
+        # Serves book_list's keyset pages as index range scans
+        indexes = [
+            models.Index(fields=["publication_year", "id"], name="bookshelf_book_year_id_idx"),
+            # Admin changelist: default ordering and the author filter
+            models.Index(fields=["title"], name="bookshelf_book_title_idx"),
+            models.Index(fields=["author"], name="bookshelf_book_author_idx"),
+            # Only tombstones are indexed, for the purge job
+            models.Index(fields=["id"], condition=models.Q(deleted_at__isnull=False), name="bookshelf_book_tombstone_idx"),
+        ]
         verbose_name = "Book"
         verbose_name_plural = "Books"
 
 
+
+
+class ContactMessage(models.Model):
+    """
+    An ExampleForm submission waiting to be forwarded. The table is the
+    queue: the view inserts, process_contact_queue claims and forwards
+    (bookshelf/contact_queue.py).
+    """
+
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [(PENDING, "Pending"), (PROCESSING, "Processing"), (DONE, "Done"), (FAILED, "Failed")]
+
+    name = models.CharField(max_length=100)
+    email = models.EmailField()
+    message = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    claim = models.UUIDField(null=True, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "id"], name="bookshelf_contact_queue_idx")]
+
+    def __str__(self):
+        return f"{self.name} <{self.email}> ({self.status})"
+
+
+class BulkUpdateJob(models.Model):
+    """
+    A "select all" admin update too large to run in the request. The
+    action inserts it; process_bulk_updates applies it chunk by chunk,
+    recording the last primary key done so a restarted worker resumes
+    there (LibraryProject/bulkupdate.py). Setting a failed job back to
+    pending resumes it the same way.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [(PENDING, "Pending"), (RUNNING, "Running"), (DONE, "Done"), (FAILED, "Failed")]
+
+    model = models.CharField(max_length=100)
+    query = models.BinaryField()
+    values = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    last_pk = models.BigIntegerField(null=True, blank=True)
+    rows_updated = models.PositiveIntegerField(default=0)
+    claim = models.UUIDField(null=True, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "id"], name="bookshelf_bulk_update_idx")]
+
+    def __str__(self):
+        return f"{self.model} {self.values} ({self.status})"
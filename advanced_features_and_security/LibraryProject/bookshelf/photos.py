@@ -0,0 +1,219 @@
+"""
+Profile photo pipeline for CustomUser.profile_photo.
+
+Uploads are streamed chunk by chunk into a temporary file next to their
+final location while being hashed, then renamed to
+profile_photos/<sha256 prefix>.<ext>. Identical uploads share one file.
+
+Once the upload's transaction commits, a background thread pool renders
+square thumbnails in every PROFILE_PHOTOS['SIZES'] x ['FORMATS'] under
+profile_photos/thumbs/<hash>_<size>.<ext>. The request thread only
+hashes and copies bytes; decoding and resizing never run on it. Uploads
+are the only thing that queues a render. An original Pillow cannot
+decode leaves profile_photos/thumbs/<hash>.failed behind and is never
+attempted again (delete the marker to retry). Any other error (storage,
+memory) is retried up to ATTEMPTS times, RETRY_DELAY seconds apart, and
+leaves no marker, so the next upload of the same photo tries again.
+
+Thumbnail names are derived from the original's content hash, so a URL
+never changes meaning and the thumbnail view can send a year-long,
+immutable Cache-Control header.
+"""
+import hashlib
+import logging
+import os
+import posixpath
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'SIZES': (64, 256),
+    'FORMATS': ('webp', 'jpeg'),
+    'QUALITY': 80,
+    'WORKERS': 2,
+    'CHUNK_SIZE': 64 * 1024,
+    'ATTEMPTS': 3,
+    'RETRY_DELAY': 2,
+}
+
+# Raised for the file's content; rendering it again fails the same way.
+# Pillow reports some corrupt headers as SyntaxError.
+DECODE_ERRORS = (UnidentifiedImageError, Image.DecompressionBombError, SyntaxError)
+
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+HASH_LENGTH = 32
+THUMB_DIR = 'profile_photos/thumbs'
+THUMB_NAME = re.compile(r'^(?P<hash>[0-9a-f]{%d})_(?P<size>\d+)\.(?P<ext>webp|jpg)$' % HASH_LENGTH)
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'PROFILE_PHOTOS', {}))
+    return config
+
+
+def content_hash(name):
+    """The hash part of a pipeline-named original, or None for legacy names."""
+    stem = posixpath.splitext(posixpath.basename(name))[0]
+    if len(stem) == HASH_LENGTH and all(c in '0123456789abcdef' for c in stem):
+        return stem
+    return None
+
+
+def thumbnail_name(digest, size, fmt):
+    return f'{digest}_{size}.{EXTENSIONS[fmt]}'
+
+
+def failure_marker(digest):
+    return posixpath.join(THUMB_DIR, f'{digest}.failed')
+
+
+class ProfilePhotoStorage(FileSystemStorage):
+    """
+    Names files by content and schedules their thumbnails. The upload is
+    copied in CHUNK_SIZE pieces, so memory use is flat whatever its size.
+    """
+
+    def _save(self, name, content):
+        config = get_config()
+        directory = posixpath.dirname(name)
+        ext = posixpath.splitext(name)[1].lower()
+        full_dir = self.path(directory)
+        os.makedirs(full_dir, exist_ok=True)
+
+        digest = hashlib.sha256()
+        fd, tmp = tempfile.mkstemp(dir=full_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in content.chunks(config['CHUNK_SIZE']):
+                    digest.update(chunk)
+                    f.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(tmp, self.file_permissions_mode)
+            name = posixpath.join(directory, digest.hexdigest()[:HASH_LENGTH] + ext)
+            # Same name means same bytes, so replacing an existing file is safe
+            os.replace(tmp, self.path(name))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        transaction.on_commit(lambda: thumbnails.submit(name))
+        return name
+
+    def get_available_name(self, name, max_length=None):
+        # _save picks the final name from the content
+        return name
+
+
+profile_photo_storage = ProfilePhotoStorage()
+
+
+def get_profile_photo_storage():
+    return profile_photo_storage
+
+
+def render_thumbnails(name, storage=None):
+    """Write every missing thumbnail of the original `name`."""
+    storage = storage or profile_photo_storage
+    config = get_config()
+    digest = content_hash(name)
+    if digest is None or storage.exists(failure_marker(digest)):
+        return []
+    targets = [
+        (size, fmt, posixpath.join(THUMB_DIR, thumbnail_name(digest, size, fmt)))
+        for size in sorted(config['SIZES'], reverse=True)
+        for fmt in config['FORMATS']
+    ]
+    targets = [t for t in targets if not storage.exists(t[2])]
+    if not targets:
+        return []
+
+    os.makedirs(storage.path(THUMB_DIR), exist_ok=True)
+    with Image.open(storage.path(name)) as image:
+        # Let the JPEG decoder downscale while decoding
+        largest = targets[0][0]
+        image.draft('RGB', (largest * 2, largest * 2))
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        written = []
+        for size, fmt, thumb in targets:
+            resized = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+            fd, tmp = tempfile.mkstemp(dir=storage.path(THUMB_DIR), suffix='.part')
+            with os.fdopen(fd, 'wb') as f:
+                if fmt == 'webp':
+                    resized.save(f, 'WEBP', quality=config['QUALITY'], method=4)
+                else:
+                    resized.save(f, 'JPEG', quality=config['QUALITY'], optimize=True, progressive=True)
+            if storage.file_permissions_mode is not None:
+                os.chmod(tmp, storage.file_permissions_mode)
+            os.replace(tmp, storage.path(thumb))
+            written.append(thumb)
+    return written
+
+
+def record_failure(name, exc, storage=None):
+    """Leave a marker so an undecodable original is never rendered again."""
+    storage = storage or profile_photo_storage
+    os.makedirs(storage.path(THUMB_DIR), exist_ok=True)
+    with open(storage.path(failure_marker(content_hash(name))), 'w') as f:
+        f.write(f'{name}: {exc!r}\n')
+
+
+class ThumbnailPool:
+    """
+    Lazily started thread pool. A name already queued is not queued again;
+    drain() waits for everything queued so far.
+    """
+
+    def __init__(self):
+        self.executor = None
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def submit(self, name):
+        with self.lock:
+            future = self.pending.get(name)
+            if future is not None:
+                return future
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(get_config()['WORKERS'], thread_name_prefix='thumbnails')
+            future = self.pending[name] = self.executor.submit(self.run, name)
+        return future
+
+    def run(self, name):
+        config = get_config()
+        try:
+            for attempt in range(1, config['ATTEMPTS'] + 1):
+                try:
+                    return render_thumbnails(name)
+                except DECODE_ERRORS as exc:
+                    logger.exception('Cannot decode %s, no thumbnails will be rendered', name)
+                    record_failure(name, exc)
+                    raise
+                except Exception:
+                    if attempt == config['ATTEMPTS']:
+                        logger.exception('Thumbnail generation failed for %s, giving up until it is uploaded again', name)
+                        raise
+                    logger.warning('Thumbnail generation failed for %s (attempt %d), retrying', name, attempt, exc_info=True)
+                    time.sleep(config['RETRY_DELAY'])
+        finally:
+            with self.lock:
+                self.pending.pop(name, None)
+
+    def drain(self, timeout=None):
+        with self.lock:
+            futures = list(self.pending.values())
+        wait(futures, timeout=timeout)
+
+
+thumbnails = ThumbnailPool()
@@ -0,0 +1,70 @@
+"""
+Bulk user provisioning.
+
+Password hashing is deliberately slow (hundreds of thousands of PBKDF2
+rounds), so creating users one by one with set_password() is CPU-bound
+on a single core. bulk_create_users() hashes the whole batch in a
+process pool, one worker per core by default, then inserts the users
+with bulk_create().
+
+hasher picks any entry of PASSWORD_HASHERS. Passing a cheaper one than
+the default is safe to do for one-off imports: check_password() re-hashes
+with the default hasher on the user's first successful login.
+
+bulk_create() sends no post_save, so bulk_create_users() sends
+users_bulk_created(sender=<user model>, users=[...]) instead
+(LibraryProject/signals.py), letting apps that keep per-user rows create
+them in bulk too.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.contrib.auth.hashers import make_password
+
+from LibraryProject.signals import users_bulk_created
+
+
+def _init_worker():
+    # Needed with the "spawn" start method; a no-op in forked workers
+    import django
+    django.setup()
+
+
+def _hash(password, hasher):
+    return make_password(password, hasher=hasher)
+
+
+def hash_passwords(passwords, hasher='default', processes=None):
+    """
+    make_password() for every password, in order. processes=1 hashes in
+    this process; None uses one worker per CPU.
+    """
+    passwords = list(passwords)
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(passwords) < 2:
+        return [_hash(p, hasher) for p in passwords]
+    chunksize = max(1, len(passwords) // (processes * 4))
+    with ProcessPoolExecutor(min(processes, len(passwords)), initializer=_init_worker) as pool:
+        return list(pool.map(partial(_hash, hasher=hasher), passwords, chunksize=chunksize))
+
+
+def bulk_create_users(manager, rows, hasher='default', processes=None, batch_size=1000):
+    """
+    Create users from dicts of model fields plus "password" (raw; None
+    gives an unusable password). Returns the created users. Signals and
+    save() overrides are skipped, as with any bulk_create().
+    """
+    rows = [dict(row) for row in rows]
+    for row in rows:
+        if not row.get('username'):
+            raise ValueError('The Username field is required')
+    hashes = hash_passwords([row.pop('password', None) for row in rows], hasher=hasher, processes=processes)
+    users = []
+    for row, password in zip(rows, hashes):
+        if 'email' in row:
+            row['email'] = manager.normalize_email(row['email'])
+        users.append(manager.model(password=password, **row))
+    users = manager.bulk_create(users, batch_size=batch_size)
+    users_bulk_created.send(sender=manager.model, users=users)
+    return users
@@ -1,3 +1,583 @@
-from django.test import TestCase
+import datetime
+import io
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from LibraryProject import bulkupdate
+from LibraryProject.bulkupdate import bulk_update
+from LibraryProject.changelist import CachedFacetFilter, EstimatedCountPaginator
+from LibraryProject.perf import SCALES, assert_constant_queries, query_budget
+from . import contact_queue, deletion, photos
+from .models import Book, BulkUpdateJob, ContactMessage, CustomUser
+from .views import BOOK_PAGE_SIZE
+
+
+class ViewPerformanceTestCase(TestCase):
+    """
+    Query budgets for the bookshelf views, with the Book table seeded at
+    each of perf.SCALES rows (PERF_SCALES=10,1000,100000 for a larger run)
+    plus one page of books. book_list renders one full keyset page at
+    every scale and the forms no books, so no query count may grow.
+    """
+
+    # (url name, max queries). Counts include
+    # the session and user lookups and the session write that
+    # SESSION_SAVE_EVERY_REQUEST adds to every request.
+    BUDGETS = [
+        ('book_list', 6),
+        ('example_form', 4),
+    ]
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(username='perf', password='password123')
+        self.client.force_login(self.user)
+        self.seeded = 0
+
+    def seed(self, rows):
+        """Grow the Book table to `rows` books plus one page."""
+        rows += BOOK_PAGE_SIZE
+        Book.objects.bulk_create(
+            Book(title=f'Book {i}', author=f'Author {i % 50}', publication_year=1900 + i % 120)
+            for i in range(self.seeded, rows)
+        )
+        self.seeded = rows
+
+    def test_views_within_budget_at_every_scale(self):
+        """Ensure query counts stay within budget and flat as the table grows."""
+        counts = {}
+        for rows in SCALES:
+            self.seed(rows)
+            for name, max_queries in self.BUDGETS:
+                url = reverse(name)
+                with self.subTest(rows=rows, view=name):
+                    with query_budget(max_queries, label=name) as queries:
+                        response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+                counts.setdefault(name, {})[rows] = len(queries)
+
+        for name, count in counts.items():
+            with self.subTest(view=name):
+                assert_constant_queries(count, label=name)
+
+
+class BookListPaginationTestCase(TestCase):
+    """
+    Test suite for book_list's keyset pagination.
+    """
+
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_superuser(username='reader', password='password123'))
+        # Several books per year, so pages split inside a year
+        Book.objects.bulk_create(
+            Book(title=f'Book {i}', author='Author', publication_year=2000 + i % 7) for i in range(120)
+        )
+
+    def test_pages_cover_every_book_once_in_order(self):
+        """Ensure following next links walks the whole table in (year, id) order."""
+        seen = []
+        url = reverse('book_list')
+        while url:
+            response = self.client.get(url)
+            seen.extend(response.context['books'])
+            cursor = response.context['next_cursor']
+            url = f"{reverse('book_list')}?after={cursor}" if cursor else None
+        expected = list(Book.objects.order_by('publication_year', 'id'))
+        self.assertEqual(seen, expected)
+
+    def test_bad_cursor_shows_first_page(self):
+        """Ensure a malformed cursor is treated as no cursor."""
+        response = self.client.get(reverse('book_list'), {'after': 'x-y'})
+        self.assertEqual(response.context['books'][0], Book.objects.order_by('publication_year', 'id').first())
+
+    def test_page_query_is_an_index_range_scan(self):
+        """Ensure a deep page neither scans the table nor sorts it."""
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite query plan')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('book_list'), {'after': '2003-50'})
+        sql = next(q['sql'] for q in queries.captured_queries if 'FROM "bookshelf_book"' in q['sql'])
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('USING INDEX bookshelf_book_year_id_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+
+class ProfilePhotoPipelineTestCase(TestCase):
+    """
+    Test suite for content-hashed profile photo uploads, background
+    thumbnails and the thumbnail view.
+    """
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(MEDIA_ROOT=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def upload(self, username, color='red'):
+        buffer = io.BytesIO()
+        Image.new('RGB', (800, 600), color).save(buffer, 'JPEG')
+        photo = SimpleUploadedFile('holiday.JPG', buffer.getvalue(), content_type='image/jpeg')
+        return CustomUser.objects.create_user(username=username, email=f'{username}@example.com', profile_photo=photo)
+
+    def test_upload_is_content_hashed_and_thumbnailed_off_thread(self):
+        """Ensure uploads are named by content and thumbnails render in the pool."""
+        threads = []
+        original = photos.render_thumbnails
+
+        def record(name, storage=None):
+            threads.append(threading.current_thread().name)
+            return original(name, storage)
+
+        with mock.patch.object(photos, 'render_thumbnails', record):
+            with self.captureOnCommitCallbacks() as callbacks:
+                user = self.upload('first')
+            self.assertRegex(user.profile_photo.name, r'^profile_photos/[0-9a-f]{32}\.jpg$')
+            self.assertEqual(threads, [])  # nothing rendered before commit
+            for callback in callbacks:
+                callback()
+            photos.thumbnails.drain()
+
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith('thumbnails'))
+        digest = photos.content_hash(user.profile_photo.name)
+        for size in (64, 256):
+            for fmt, ext in (('WEBP', 'webp'), ('JPEG', 'jpg')):
+                with Image.open(photos.profile_photo_storage.path(f'profile_photos/thumbs/{digest}_{size}.{ext}')) as thumb:
+                    self.assertEqual((thumb.format, thumb.size), (fmt, (size, size)))
+
+        # The same bytes map to the same file
+        self.assertEqual(self.upload('second').profile_photo.name, user.profile_photo.name)
+
+    def test_thumbnail_view_cache_headers(self):
+        """Ensure thumbnails are served immutable and the original is a typed no-cache fallback."""
+        self.client.force_login(get_user_model().objects.create_user(username='reader', password='password123'))
+        with self.captureOnCommitCallbacks() as callbacks:
+            user = self.upload('viewer', color='blue')
+        url = user.profile_photo_url(256)
+
+        response = self.client.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        self.assertEqual(photos.thumbnails.pending, {})  # the view queues nothing
+        for callback in callbacks:
+            callback()
+        photos.thumbnails.drain()
+
+        response = self.client.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertEqual(response['Cache-Control'], 'private, max-age=31536000, immutable')
+        self.assertEqual(self.client.get(reverse('profile_photo_thumbnail', args=['secret.txt']), secure=True).status_code, 404)
+
+        self.client.logout()
+        self.assertEqual(self.client.get(url, secure=True).status_code, 302)
+
+    def test_failed_render_is_recorded_and_not_retried(self):
+        """Ensure a photo that cannot be decoded is rendered once and then served as a 404."""
+        self.client.force_login(get_user_model().objects.create_user(username='reader', password='password123'))
+        broken = SimpleUploadedFile('broken.jpg', b'not an image', content_type='image/jpeg')
+        with self.captureOnCommitCallbacks(execute=True):
+            user = CustomUser.objects.create_user(username='broken', email='broken@example.com', profile_photo=broken)
+        photos.thumbnails.drain()
+        digest = photos.content_hash(user.profile_photo.name)
+        self.assertTrue(photos.profile_photo_storage.exists(photos.failure_marker(digest)))
+
+        with mock.patch.object(Image, 'open') as image_open:
+            self.assertEqual(photos.render_thumbnails(user.profile_photo.name), [])
+            self.assertEqual(self.client.get(user.profile_photo_url(64), secure=True).status_code, 404)
+        image_open.assert_not_called()
+
+    @override_settings(PROFILE_PHOTOS={'ATTEMPTS': 2, 'RETRY_DELAY': 0})
+    def test_transient_render_error_is_retried_without_marker(self):
+        """Ensure an error unrelated to the image is retried and never marks the photo as failed."""
+        original = photos.render_thumbnails
+        calls = []
+
+        def flaky(name, storage=None):
+            calls.append(name)
+            if len(calls) == 1:
+                raise OSError('disk full')
+            return original(name, storage)
+
+        with mock.patch.object(photos, 'render_thumbnails', flaky):
+            with self.captureOnCommitCallbacks(execute=True):
+                user = self.upload('retried')
+            photos.thumbnails.drain()
+        digest = photos.content_hash(user.profile_photo.name)
+        self.assertTrue(photos.profile_photo_storage.exists(f'profile_photos/thumbs/{digest}_64.webp'))
+
+        with mock.patch.object(photos, 'render_thumbnails', side_effect=OSError('disk full')) as render:
+            with self.captureOnCommitCallbacks(execute=True):
+                user = self.upload('unlucky', color='green')
+            photos.thumbnails.drain()
+        self.assertEqual(render.call_count, 2)
+        digest = photos.content_hash(user.profile_photo.name)
+        self.assertFalse(photos.profile_photo_storage.exists(photos.failure_marker(digest)))
+
+
+class BookDeletionTestCase(TestCase):
+    """
+    Test suite for batch deletes, soft-delete and the chunked purge.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='deleter', email='d@example.com', password='password123')
+        self.client.force_login(self.user)
+        Book.objects.bulk_create(Book(title=f'Book {i}', author='Author', publication_year=2000) for i in range(10))
+        self.ids = list(Book.objects.order_by('id').values_list('id', flat=True))
+
+    def grant(self):
+        # Superusers hold bookshelf.can_delete like any other permission
+        self.user.is_superuser = True
+        self.user.save(update_fields=['is_superuser'])
+
+    def test_batch_delete_requires_permission_and_post(self):
+        """Ensure the endpoint is guarded by bookshelf.can_delete and POST-only."""
+        url = reverse('batch_delete_books')
+        self.assertEqual(self.client.post(url, {'ids': self.ids[:3]}).status_code, 403)
+        self.grant()
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.assertEqual(self.client.post(url, {'ids': ['x']}).status_code, 400)
+        with self.settings(BOOK_DELETION={'MAX_BATCH': 2}):
+            self.assertEqual(self.client.post(url, {'ids': self.ids[:3]}).status_code, 400)
+        self.assertEqual(Book.objects.count(), 10)
+
+    def test_single_delete_is_post_only(self):
+        """Ensure a link or image tag (a GET) cannot delete a book."""
+        self.grant()
+        url = reverse('delete_book', args=[self.ids[0]])
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.assertEqual(Book.objects.count(), 10)
+        self.assertEqual(self.client.post(url).status_code, 302)
+        self.assertEqual(Book.objects.count(), 9)
+
+    def test_batch_delete_is_one_statement(self):
+        """Ensure a batch is removed with a single DELETE."""
+        self.grant()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('batch_delete_books'), {'ids': self.ids[:4]})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Book.all_objects.count(), 6)
+        deletes = [q for q in queries.captured_queries if q['sql'].startswith('DELETE FROM "bookshelf_book"')]
+        self.assertEqual(len(deletes), 1)
+
+    @override_settings(BOOK_DELETION={'SOFT_DELETE': True, 'PURGE_CHUNK_SIZE': 3, 'PURGE_PAUSE': 0})
+    def test_soft_delete_then_chunked_purge(self):
+        """Ensure soft-deleted books disappear at once and are purged chunk by chunk."""
+        self.grant()
+        self.client.post(reverse('batch_delete_books'), {'ids': self.ids[:7]})
+        self.client.post(reverse('delete_book', args=[self.ids[7]]))
+        self.assertEqual(Book.objects.count(), 2)
+        self.assertEqual(Book.all_objects.tombstoned().count(), 8)
+        self.assertEqual(len(self.client.get(reverse('book_list')).context['books']), 2)
+
+        chunks = []
+        self.assertEqual(deletion.purge_tombstones(log=chunks.append), 8)
+        self.assertEqual(len(chunks), 3)  # 3 + 3 + 2
+        self.assertEqual(Book.all_objects.count(), 2)
+
+        out = io.StringIO()
+        call_command('purge_deleted_books', stdout=out)
+        self.assertIn('Purged 0 books', out.getvalue())
+
+
+def failing_handler(messages):
+    raise ConnectionError('mail server down')
+
+
+class ContactQueueTestCase(TestCase):
+    """
+    Test suite for the ExampleForm queue and its batch worker.
+    """
+
+    def submit(self, i=0):
+        return self.client.post(reverse('example_form'), {
+            'name': f'Visitor {i}', 'email': f'visitor{i}@example.com', 'message': f'Hello {i}',
+        }, secure=True)
+
+    def test_view_only_enqueues(self):
+        """Ensure a submission is one INSERT and nothing is sent in the request."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.submit()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len([q for q in queries.captured_queries if 'bookshelf_contactmessage' in q['sql']]), 1)
+        self.assertEqual(ContactMessage.objects.get().status, ContactMessage.PENDING)
+        self.assertEqual(mail.outbox, [])
+
+    @override_settings(CONTACT_QUEUE={'BATCH_SIZE': 10, 'WORKERS': 3, 'RECIPIENTS': ['staff@example.com']})
+    def test_worker_forwards_in_batches(self):
+        """Ensure the worker drains the queue in BATCH_SIZE claims and sends everything."""
+        for i in range(25):
+            contact_queue.enqueue(f'Visitor {i}', f'visitor{i}@example.com', f'Hello {i}')
+        out = io.StringIO()
+        call_command('process_contact_queue', '--once', verbosity=2, stdout=out)
+
+        self.assertEqual(out.getvalue().count('Forwarded 10 of 10'), 2)
+        self.assertIn('Forwarded 5 of 5', out.getvalue())
+        self.assertEqual(len(mail.outbox), 25)
+        self.assertEqual(mail.outbox[0].to, ['staff@example.com'])
+        self.assertEqual({m.reply_to[0] for m in mail.outbox}, {f'visitor{i}@example.com' for i in range(25)})
+        self.assertEqual(ContactMessage.objects.filter(status=ContactMessage.DONE).count(), 25)
+
+    @override_settings(CONTACT_QUEUE={
+        'HANDLER': 'bookshelf.tests.failing_handler', 'MAX_ATTEMPTS': 2, 'RETRY_DELAY': 0, 'RECIPIENTS': [],
+    })
+    def test_failures_are_retried_then_given_up(self):
+        """Ensure a failing handler retries up to MAX_ATTEMPTS and records the error."""
+        for i in range(3):
+            contact_queue.enqueue(f'Visitor {i}', f'visitor{i}@example.com', 'Hi')
+        self.assertEqual(contact_queue.run_worker(once=True), (0, 3))
+        for message in ContactMessage.objects.all():
+            self.assertEqual((message.status, message.attempts), (ContactMessage.FAILED, 2))
+            self.assertIn('mail server down', message.last_error)
+
+    @override_settings(MANAGERS=[], CONTACT_QUEUE={'RECIPIENTS': None, 'RETRY_DELAY': 60})
+    def test_missing_recipients_leave_messages_pending(self):
+        """Ensure nothing is marked done, or spends an attempt, while there is nobody to send to."""
+        contact_queue.enqueue('Visitor', 'visitor@example.com', 'Hi')
+        with self.assertLogs('bookshelf.contact_queue', 'ERROR'):
+            self.assertEqual(contact_queue.run_worker(once=True), (0, 0))
+        message = ContactMessage.objects.get()
+        self.assertEqual((message.status, message.attempts), (ContactMessage.PENDING, 0))
+        self.assertIn('No recipients', message.last_error)
+        self.assertEqual(mail.outbox, [])
+
+    @override_settings(CONTACT_QUEUE={'WORKERS': 1, 'RETRY_DELAY': 60, 'RECIPIENTS': ['staff@example.com']})
+    def test_partial_failure_only_retries_failed_messages(self):
+        """Ensure messages that went out are marked done and never sent again."""
+        original = locmem.EmailBackend.send_messages
+
+        def send_messages(backend, messages):
+            if messages[0].reply_to == ['visitor1@example.com']:
+                raise ConnectionError('recipient rejected')
+            return original(backend, messages)
+
+        for i in range(3):
+            contact_queue.enqueue(f'Visitor {i}', f'visitor{i}@example.com', 'Hi')
+        with mock.patch.object(locmem.EmailBackend, 'send_messages', send_messages):
+            self.assertEqual(contact_queue.run_worker(once=True), (2, 0))
+        self.assertEqual(len(mail.outbox), 2)
+        failed = ContactMessage.objects.get(email='visitor1@example.com')
+        self.assertEqual((failed.status, failed.attempts), (ContactMessage.PENDING, 1))
+        self.assertIn('recipient rejected', failed.last_error)
+        self.assertEqual(ContactMessage.objects.filter(status=ContactMessage.DONE).count(), 2)
+
+    def test_expired_leases_are_reclaimed(self):
+        """Ensure rows held by a crashed worker are claimed again after the lease."""
+        message = contact_queue.enqueue('Visitor', 'visitor@example.com', 'Hi')
+        self.assertEqual(contact_queue.claim_batch(10, lease_seconds=300), [message])
+        self.assertEqual(contact_queue.claim_batch(10, lease_seconds=300), [])
+        ContactMessage.objects.update(locked_until=timezone.now() - datetime.timedelta(seconds=1))
+        self.assertEqual(contact_queue.claim_batch(10, lease_seconds=300), [message])
+        self.assertEqual(ContactMessage.objects.get().attempts, 1)
+
+    def test_message_that_keeps_killing_workers_is_given_up(self):
+        """Ensure every expired lease counts as an attempt, up to MAX_ATTEMPTS."""
+        contact_queue.enqueue('Visitor', 'visitor@example.com', 'Hi')
+        for _ in range(3):
+            self.assertEqual(len(contact_queue.claim_batch(10, lease_seconds=300, max_attempts=3)), 1)
+            ContactMessage.objects.update(locked_until=timezone.now() - datetime.timedelta(seconds=1))
+        self.assertEqual(contact_queue.claim_batch(10, lease_seconds=300, max_attempts=3), [])
+        message = ContactMessage.objects.get()
+        self.assertEqual((message.status, message.attempts, message.last_error), (ContactMessage.FAILED, 3, 'Lease expired'))
+
+    def test_outcome_skips_rows_reclaimed_by_another_worker(self):
+        """Ensure a worker that overran its lease cannot overwrite another worker's claim."""
+        contact_queue.enqueue('Visitor', 'visitor@example.com', 'Hi')
+        stale = contact_queue.claim_batch(10, lease_seconds=300)
+        ContactMessage.objects.update(locked_until=timezone.now() - datetime.timedelta(seconds=1))
+        current = contact_queue.claim_batch(10, lease_seconds=300)
+        with ThreadPoolExecutor(1) as pool:
+            self.assertEqual(contact_queue.process_batch(stale, pool, 1, lambda chunk: None, 5, 60), (0, 0))
+        message = ContactMessage.objects.get()
+        self.assertEqual((message.status, message.claim), (ContactMessage.PROCESSING, current[0].claim))
+
+
+@override_settings(PASSWORD_HASHERS=[
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+])
+class UserProvisioningTestCase(TestCase):
+    """
+    Test suite for CustomUserManager.create_users (MD5 is the default
+    hasher here only to keep the tests fast).
+    """
+
+    def rows(self, n):
+        return [{'username': f'user{i}', 'email': f'user{i}@EXAMPLE.com', 'password': f'secret-{i}'} for i in range(n)]
+
+    def test_users_are_hashed_in_a_pool_and_inserted_in_bulk(self):
+        """Ensure every password verifies, salts differ and the insert is one statement."""
+        rows = self.rows(6)
+        rows[0]['password'] = 'same'
+        rows[1]['password'] = 'same'
+        with CaptureQueriesContext(connection) as queries:
+            CustomUser.objects.create_users(rows, processes=2)
+        self.assertEqual(len([q for q in queries.captured_queries if q['sql'].startswith('INSERT')]), 1)
+
+        users = {u.username: u for u in CustomUser.objects.all()}
+        self.assertEqual(len(users), 6)
+        self.assertTrue(users['user5'].check_password('secret-5'))
+        self.assertEqual(users['user5'].email, 'user5@example.com')
+        self.assertNotEqual(users['user0'].password, users['user1'].password)
+
+    def test_email_is_required(self):
+        """Ensure create_users validates like create_user."""
+        with self.assertRaises(ValueError):
+            CustomUser.objects.create_users([{'username': 'nomail', 'password': 'x'}], processes=1)
+        self.assertFalse(CustomUser.objects.exists())
+
+    def test_cheaper_hasher_is_upgraded_on_login(self):
+        """Ensure users provisioned with a non-default hasher are rehashed by check_password."""
+        with self.settings(PASSWORD_HASHERS=list(reversed(settings.PASSWORD_HASHERS))):
+            CustomUser.objects.create_users(self.rows(1), hasher='md5', processes=1)
+            user = CustomUser.objects.get()
+            self.assertTrue(user.password.startswith('md5$'))
+            self.assertTrue(user.check_password('secret-0'))
+            user.refresh_from_db()
+            self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+
+
+class BookAdminChangelistTestCase(TestCase):
+    """
+    Test suite for the cached filter sidebar and estimated-count paginator
+    used by BookAdmin.
+    """
+
+    class BookAdmin(admin.ModelAdmin):
+        list_filter = [('author', CachedFacetFilter), ('publication_year', CachedFacetFilter)]
+        show_facets = admin.ShowFacets.NEVER
+        paginator = EstimatedCountPaginator
+        show_full_result_count = False
+        list_per_page = 10
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_superuser(username='admin', password='password123')
+        self.model_admin = self.BookAdmin(Book, admin.AdminSite())
+        Book.objects.bulk_create(
+            Book(title=f'Book {i}', author=f'Author {i % 3}', publication_year=2000 + i % 2) for i in range(30)
+        )
+
+    def changelist(self, **params):
+        request = RequestFactory().get('/', params)
+        request.user = self.user
+        return self.model_admin.get_changelist_instance(request)
+
+    def test_facets_are_counted_once_and_cached(self):
+        """Ensure the sidebar values come from one cached GROUP BY per filter."""
+        with CaptureQueriesContext(connection) as queries:
+            cl = self.changelist()
+        self.assertEqual(cl.filter_specs[0].facets, [('Author 0', 10), ('Author 1', 10), ('Author 2', 10)])
+        self.assertEqual(len([q for q in queries.captured_queries if 'GROUP BY' in q['sql']]), 2)
+        with CaptureQueriesContext(connection) as queries:
+            self.changelist()
+        self.assertFalse([q for q in queries.captured_queries if 'GROUP BY' in q['sql']])
+
+    def test_lists_get_capped_counts(self):
+        """Ensure soft-delete's manager filter is counted like any other list."""
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.changelist().result_count, 30)
+        self.assertIn("LIMIT", [q["sql"] for q in queries.captured_queries if "COUNT(*)" in q["sql"]][0])
+        self.assertEqual(self.changelist(author="Author 1").result_count, 10)
+
+    @override_settings(ADMIN_CHANGELIST={"COUNT_CAP": 12, "ESTIMATE_UNFILTERED": True})
+    def test_estimate_skips_partial_indexes_and_never_truncates(self):
+        """Ensure the tombstone index's row count is ignored and a low estimate cuts nothing."""
+        Book.objects.filter(title="Book 0").update(deleted_at=timezone.now())
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+            cursor.execute("UPDATE sqlite_stat1 SET stat = '3 1' WHERE tbl = 'bookshelf_book'")
+            cursor.execute("UPDATE sqlite_stat1 SET stat = '1000 1' WHERE idx = 'bookshelf_book_tombstone_idx'")
+        cl = self.changelist()
+        self.assertEqual(cl.result_count, 12)
+        self.assertEqual(len(cl.result_list), 10)
+        self.assertEqual(len(self.changelist(p=2).result_list), 10)
+
+        cache.clear()
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE sqlite_stat1 SET stat = '800 1' WHERE tbl = 'bookshelf_book' AND idx != 'bookshelf_book_tombstone_idx'")
+        self.assertEqual(self.changelist().result_count, 800)
+
+
+class BookBulkUpdateTestCase(TestCase):
+    """
+    Test suite for the UPDATEs behind the is_classic admin actions.
+    """
+
+    def setUp(self):
+        Book.objects.bulk_create(Book(title=f"Book {i}", author="Author", publication_year=2000) for i in range(20))
+        Book.objects.filter(title="Book 0").update(deleted_at=timezone.now())
+
+    def test_selection_is_one_update(self):
+        """Ensure a page selection is written with one UPDATE and skips tombstones."""
+        with CaptureQueriesContext(connection) as queries:
+            rows, background = bulk_update(Book.objects.all(), {"is_classic": True})
+        self.assertEqual((rows, background), (19, False))
+        self.assertEqual([q["sql"][:6] for q in queries.captured_queries], ["UPDATE"])
+        self.assertFalse(Book.all_objects.get(title="Book 0").is_classic)
+
+    @override_settings(BULK_UPDATE={"BACKGROUND_THRESHOLD": 10, "CHUNK_SIZE": 5, "PAUSE": 0})
+    def test_select_all_is_queued_then_chunked(self):
+        """Ensure "select all" past the threshold is stored as a job and run in chunks by the worker."""
+        rows, background = bulk_update(Book.objects.all(), {"is_classic": True}, select_across=True)
+        self.assertEqual((rows, background), (11, True))
+        self.assertFalse(Book.objects.filter(is_classic=True).exists())
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command("process_bulk_updates", "--once", stdout=io.StringIO())
+        self.assertEqual(len([q for q in queries.captured_queries if q["sql"].startswith('UPDATE "bookshelf_book"')]), 4)
+        self.assertEqual(Book.objects.filter(is_classic=True).count(), 19)
+        self.assertFalse(Book.all_objects.get(title="Book 0").is_classic)
+        job = BulkUpdateJob.objects.get()
+        self.assertEqual((job.status, job.rows_updated, job.claim), (BulkUpdateJob.DONE, 19, None))
+
+    @override_settings(BULK_UPDATE={"BACKGROUND_THRESHOLD": 10, "CHUNK_SIZE": 5, "PAUSE": 0, "LEASE_SECONDS": 300})
+    def test_interrupted_job_resumes_after_last_chunk(self):
+        """Ensure a job whose worker died is reclaimed after its lease and continues where it stopped."""
+        bulk_update(Book.objects.all(), {"is_classic": True}, select_across=True)
+        job = bulkupdate.claim_job(lease_seconds=300)
+        pks = list(Book.objects.order_by("pk").values_list("pk", flat=True))
+        # The dead worker recorded its first chunk, then its lease ran out;
+        # those rows are left unchanged here to show they are not redone
+        BulkUpdateJob.objects.filter(pk=job.pk).update(
+            last_pk=pks[4], rows_updated=5, locked_until=timezone.now() - datetime.timedelta(seconds=1),
+        )
+        self.assertEqual(bulkupdate.run_worker(once=True), (1, 0))
+        self.assertFalse(Book.objects.filter(pk__lte=pks[4], is_classic=True).exists())
+        self.assertEqual(Book.objects.filter(pk__gt=pks[4], is_classic=True).count(), 14)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.rows_updated), (BulkUpdateJob.DONE, 19))
+
+    def test_worker_that_lost_its_lease_stops(self):
+        """Ensure a worker whose job was reclaimed rolls back its chunk and leaves the job alone."""
+        job = bulkupdate.enqueue(Book.objects.all(), {"is_classic": True})
+        stale = bulkupdate.claim_job(lease_seconds=300)
+        BulkUpdateJob.objects.filter(pk=job.pk).update(locked_until=timezone.now() - datetime.timedelta(seconds=1))
+        current = bulkupdate.claim_job(lease_seconds=300)
+        with self.assertRaises(bulkupdate.LeaseLost):
+            bulkupdate.run_job(stale, lease_seconds=300)
+        self.assertFalse(Book.objects.filter(is_classic=True).exists())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.claim), (BulkUpdateJob.RUNNING, current.claim))
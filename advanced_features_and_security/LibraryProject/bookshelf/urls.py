@@ -5,6 +5,10 @@ urlpatterns = [
     path("books/", views.book_list, name="book_list"),
     path("books/add/", views.add_book, name="add_book"),
     path("books/delete/<int:pk>/", views.delete_book, name="delete_book"),
+    path("books/delete/", views.batch_delete_books, name="batch_delete_books"),
+
+    # Content-hashed profile photo thumbnails (long-lived cache headers)
+    path("avatars/<str:name>", views.profile_photo_thumbnail, name="profile_photo_thumbnail"),
 
     # ✅ ExampleForm route
     path("example-form/", views.example_form_view, name="example_form"),
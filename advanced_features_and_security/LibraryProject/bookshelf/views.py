@@ -1,14 +1,51 @@
-from django.shortcuts import render, redirect, get_object_or_404
+import glob
+import os
+import posixpath
+
+from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required, permission_required
-from django.http import HttpResponse
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseBadRequest
+from django.views.decorators.http import require_POST, require_safe
+from PIL import Image
+from .contact_queue import enqueue
+from .deletion import delete_books, get_config as get_deletion_config
 from .models import Book
+from .photos import THUMB_DIR, THUMB_NAME, failure_marker, profile_photo_storage
 from .forms import BookForm  # ✅ Added ExampleForm
 from .forms import ExampleForm
 
+BOOK_PAGE_SIZE = 50
+
+
+def parse_book_cursor(value):
+    """?after=<publication_year>-<id>, or None for the first page."""
+    try:
+        year, pk = value.split("-")
+        return int(year), int(pk)
+    except (AttributeError, ValueError):
+        return None
+
+
 @login_required
 def book_list(request):
-    books = Book.objects.all()
-    return render(request, "bookshelf/book_list.html", {"books": books})
+    """
+    Books by (publication_year, id), keyset-paginated with ?after=<year>-<id>.
+    The filter is written as a range on publication_year plus a tie-break,
+    so each page is a range scan of bookshelf_book_year_id_idx that stops
+    after BOOK_PAGE_SIZE + 1 rows, however deep the page.
+    """
+    books = Book.objects.order_by("publication_year", "id")
+    after = parse_book_cursor(request.GET.get("after"))
+    if after:
+        year, pk = after
+        books = books.filter(Q(publication_year__gt=year) | Q(id__gt=pk), publication_year__gte=year)
+    page = list(books[:BOOK_PAGE_SIZE + 1])
+    next_cursor = None
+    if len(page) > BOOK_PAGE_SIZE:
+        page = page[:BOOK_PAGE_SIZE]
+        next_cursor = f"{page[-1].publication_year}-{page[-1].pk}"
+    return render(request, "bookshelf/book_list.html", {"books": page, "next_cursor": next_cursor, "is_first_page": not after})
 
 
 @login_required
@@ -26,21 +63,79 @@ def add_book(request):
 
 @login_required
 @permission_required("bookshelf.can_delete", raise_exception=True)
+@require_POST
 def delete_book(request, pk):
-    book = get_object_or_404(Book, pk=pk)
-    book.delete()
+    if not delete_books([pk]):
+        raise Http404
+    return redirect("book_list")
+
+
+@login_required
+@permission_required("bookshelf.can_delete", raise_exception=True)
+@require_POST
+def batch_delete_books(request):
+    """
+    POST ids=<id>&ids=<id>...: delete (or, with soft-delete on, tombstone)
+    up to BOOK_DELETION['MAX_BATCH'] books in one statement.
+    """
+    try:
+        ids = {int(pk) for pk in request.POST.getlist("ids")}
+    except ValueError:
+        return HttpResponseBadRequest("ids must be integers.")
+    if not ids or len(ids) > get_deletion_config()["MAX_BATCH"]:
+        return HttpResponseBadRequest(f"Send between 1 and {get_deletion_config()['MAX_BATCH']} ids.")
+    delete_books(ids)
     return redirect("book_list")
 
 
 # ✅ ExampleForm usage view
 def example_form_view(request):
+    """
+    Queue the submission for process_contact_queue (one INSERT) and
+    answer straight away; forwarding happens in the worker.
+    """
     if request.method == "POST":
         form = ExampleForm(request.POST)
         if form.is_valid():
             name = form.cleaned_data["name"]
             email = form.cleaned_data["email"]
             message = form.cleaned_data["message"]
+            enqueue(name, email, message)
             return HttpResponse(f"Thanks {name}, we received your message: {message}")
     else:
         form = ExampleForm()
-    return render(request, "bookshelf/example_form.html", {"form": form})
+    return render(request, "bookshelf/form_example.html", {"form": form})
+
+
+@login_required
+@require_safe
+def profile_photo_thumbnail(request, name):
+    """
+    Serve a profile photo thumbnail. Names are content-hashed, so they are
+    cached for a year. Until the background pool has rendered it, the
+    original is served uncached, typed by its decoded format; nothing is
+    queued from here. A photo whose render failed is a 404.
+    """
+    match = THUMB_NAME.match(name)
+    if match is None:
+        raise Http404
+    content_type = "image/webp" if match["ext"] == "webp" else "image/jpeg"
+    path = profile_photo_storage.path(posixpath.join(THUMB_DIR, name))
+    if os.path.exists(path):
+        response = FileResponse(open(path, "rb"), content_type=content_type)
+        response["Cache-Control"] = "private, max-age=31536000, immutable"
+        return response
+
+    if profile_photo_storage.exists(failure_marker(match["hash"])):
+        raise Http404
+    originals = glob.glob(profile_photo_storage.path(posixpath.join("profile_photos", match["hash"] + ".*")))
+    if not originals:
+        raise Http404
+    try:
+        with Image.open(originals[0]) as image:
+            content_type = image.get_format_mimetype()
+    except (OSError, ValueError):
+        raise Http404
+    response = FileResponse(open(originals[0], "rb"), content_type=content_type)
+    response["Cache-Control"] = "private, no-cache"
+    return response
@@ -4,6 +4,8 @@ from django.contrib.auth.models import User, Group, Permission
 from django.contrib.contenttypes.models import ContentType
 from .models import UserProfile, Book, Author, Library, Librarian
 from django.utils.translation import gettext_lazy as _
+from LibraryProject.changelist import EstimatedCountPaginator
+from . import roles
 
 class UserProfileInline(admin.StackedInline):
     """
@@ -24,6 +26,10 @@ class CustomUserAdmin(UserAdmin):
     # Add role information to the user list display
     list_display = UserAdmin.list_display + ('get_role', 'get_permissions')
     list_filter = UserAdmin.list_filter + ('profile__role',)
+
+    # Estimated or capped counts instead of COUNT(*) over auth_user
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     def get_role(self, obj):
         """Display user role in admin list."""
@@ -55,6 +61,8 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_filter = ('role', 'user__date_joined', 'user__is_active')
     search_fields = ('user__username', 'user__email', 'user__first_name', 'user__last_name')
     ordering = ('user__username',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     actions = ['make_admin', 'make_librarian', 'make_member', 'grant_all_book_permissions', 'grant_librarian_permissions']
 
     def user_email(self, obj):
@@ -80,9 +88,20 @@ class UserProfileAdmin(admin.ModelAdmin):
         return ', '.join(perms) if perms else 'None'
     get_book_permissions.short_description = 'Book Permissions'
 
+    def set_role(self, queryset, role):
+        """Set role on the selected profiles; returns the count and the profiles."""
+        # Read the ids first: on a changelist filtered by role the queryset
+        # selects nothing once the UPDATE has run
+        user_ids = list(queryset.values_list('user_id', flat=True))
+        profiles = UserProfile.objects.filter(user_id__in=user_ids)
+        count = profiles.update(role=role)
+        # update() skips signals, so drop the cached roles by hand
+        roles.forget(user_ids)
+        return count, profiles
+
     def make_admin(self, request, queryset):
         """Bulk action to set selected users as Admin."""
-        count = queryset.update(role='Admin')
+        count, queryset = self.set_role(queryset, 'Admin')
         for profile in queryset:
             user = profile.user
             perms = [
@@ -96,7 +115,7 @@ class UserProfileAdmin(admin.ModelAdmin):
 
     def make_librarian(self, request, queryset):
         """Bulk action to set selected users as Librarian."""
-        count = queryset.update(role='Librarian')
+        count, queryset = self.set_role(queryset, 'Librarian')
         # Grant add and change permissions to Librarians
         for profile in queryset:
             user = profile.user
@@ -110,7 +129,7 @@ class UserProfileAdmin(admin.ModelAdmin):
 
     def make_member(self, request, queryset):
         """Bulk action to set selected users as Member."""
-        count = queryset.update(role='Member')
+        count, queryset = self.set_role(queryset, 'Member')
         # Remove all book permissions from Members
         for profile in queryset:
             user = profile.user
@@ -156,6 +175,8 @@ class BookAdmin(admin.ModelAdmin):
     search_fields = ('title', 'author__name', 'isbn')
     ordering = ('title',)
     date_hierarchy = 'publication_date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         ('Basic Information', {
@@ -7,4 +7,6 @@ class RelationshipAppConfig(AppConfig):
     
     def ready(self):
         from .admin import create_permission_groups
-        create_permission_groups()
\ No newline at end of file
+        create_permission_groups()
+        # Register the role cache receivers
+        from . import roles  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from relationship_app import roles
+
+
+class Command(BaseCommand):
+    help = 'Create missing user profiles and load every role into the bitmask cache (run once when switching ROLES storage)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Profiles per INSERT and per cache write')
+
+    def handle(self, *args, **options):
+        created = roles.backfill_profiles(batch_size=options['batch_size'])
+        self.stdout.write(f'Created {created} missing profiles')
+        if roles.get_config()['STORAGE'] == 'bitmask':
+            warmed = roles.warm(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Cached {warmed} roles'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from benchmarks import logins, runner
+
+
+class Command(BaseCommand):
+    help = 'Measure login throughput (logins/s), with and without password hashing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=20, help='Accounts logged in per measurement')
+        parser.add_argument('--hasher', default='default', help='PASSWORD_HASHERS algorithm the accounts are hashed with')
+        parser.add_argument('--output', help='Write the JSON results to this file')
+
+    def handle(self, *args, **options):
+        result = logins.run(logins=options['logins'], hasher=options['hasher'], log=self.stdout.write)
+        if options['output']:
+            runner.save(result, options['output'])
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import provisioning, runner
+
+
+class Command(BaseCommand):
+    help = 'Measure bulk user provisioning throughput (users/s) across process counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Users created per measurement')
+        parser.add_argument('--processes', help='Comma-separated process counts (default: 1, 2, 4, ... up to the CPU count)')
+        parser.add_argument('--hasher', default='default', help='PASSWORD_HASHERS algorithm to hash with')
+        parser.add_argument('--output', help='Write the JSON results to this file')
+
+    def handle(self, *args, **options):
+        process_counts = None
+        if options['processes']:
+            try:
+                process_counts = [int(n) for n in options['processes'].split(',')]
+            except ValueError:
+                raise CommandError('--processes must be a comma-separated list of integers')
+
+        result = provisioning.run(
+            users=options['users'], process_counts=process_counts, hasher=options['hasher'], log=self.stdout.write,
+        )
+        if options['output']:
+            runner.save(result, options['output'])
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
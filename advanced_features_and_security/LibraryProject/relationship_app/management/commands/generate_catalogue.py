@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import catalogue
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate a synthetic catalogue (authors, books, libraries, holdings, users) for benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            default='small',
+            help=f"Preset ({', '.join(f'{k}={v}' for k, v in catalogue.SCALES.items())} books) or a number of books",
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed gives the same catalogue')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT transaction')
+
+    def handle(self, *args, **options):
+        scale = options['scale']
+        if scale in catalogue.SCALES:
+            books = catalogue.SCALES[scale]
+        elif scale.isdigit():
+            books = int(scale)
+        else:
+            raise CommandError(f'Unknown scale {scale!r}')
+
+        self.stdout.write(f'Generating {catalogue.get_counts(books)} ...')
+        start = time.perf_counter()
+        written = catalogue.generate(books, seed=options['seed'], batch_size=options['batch_size'], log=self.stdout.write)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {sum(written.values())} rows in {elapsed:.1f}s ({sum(written.values()) / elapsed:.0f} rows/s)'
+        ))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import runner
+from benchmarks.scenarios import SCENARIOS
+
+
+class Command(BaseCommand):
+    help = 'Run the benchmark scenarios against the current database and write JSON results'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            dest='scenarios',
+            choices=sorted(SCENARIOS),
+            help='Scenario to run (repeatable; default: all)',
+        )
+        parser.add_argument('--runs', type=int, help="Timed runs per scenario (default: each scenario's own)")
+        parser.add_argument('--output', help='Write the JSON results to this file')
+        parser.add_argument('--compare', help='JSON results from an earlier run to compare against')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                baseline = runner.load(options['compare'])
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read {options['compare']}: {e}")
+
+        result = runner.run(options['scenarios'], runs=options['runs'], log=self.stdout.write)
+        self.stdout.write(f"Catalogue: {result['catalogue']}")
+
+        if options['output']:
+            runner.save(result, options['output'])
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if baseline is not None:
+            self.stdout.write(f"Compared with {baseline.get('commit')} ({baseline.get('timestamp')}):")
+            for name, before, now, change, query_delta in runner.compare(baseline, result):
+                self.stdout.write(f'{name:<26} {before:>10.1f} -> {now:>10.1f} ms  {change:>+7.1f}%  {query_delta:>+5} queries')
@@ -1,8 +1,10 @@
+from django.conf import settings
 from django.db import models
-from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from LibraryProject.signals import users_bulk_created
+
 
 class Author(models.Model):
     """Author model for book authors"""
@@ -60,6 +62,12 @@ class Librarian(models.Model):
         return self.name
 
 
+class UserProfileManager(models.Manager):
+    def create_for(self, users, role='Member', batch_size=1000):
+        """Profiles for users that skipped post_save, in one bulk INSERT."""
+        return self.bulk_create([self.model(user=user, role=role) for user in users], batch_size=batch_size)
+
+
 class UserProfile(models.Model):
     """
     UserProfile model to extend Django's built-in User model with role-based access control.
@@ -71,7 +79,7 @@ class UserProfile(models.Model):
     ]
     
     user = models.OneToOneField(
-        User,
+        settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name='profile'
     )
@@ -81,6 +89,8 @@ class UserProfile(models.Model):
         default='Member',
         help_text="Select the user's role for access control"
     )
+
+    objects = UserProfileManager()
     
     class Meta:
         verbose_name = 'User Profile'
@@ -102,22 +112,20 @@ class UserProfile(models.Model):
         return self.role == 'Member'
 
 
-@receiver(post_save, sender=User)
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_user_profile(sender, instance, created, **kwargs):
     """
     Signal to automatically create a UserProfile when a new User is created.
+    Saves of existing users (last_login on every login, for one) touch no
+    profile; users from before this signal get theirs from backfill_roles.
     """
     if created:
         UserProfile.objects.create(user=instance)
 
 
-@receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
+@receiver(users_bulk_created, sender=settings.AUTH_USER_MODEL)
+def create_user_profiles(sender, users, **kwargs):
     """
-    Signal to save the UserProfile when User is saved.
+    Signal to create the profiles of bulk-created users with one bulk_create.
     """
-    if hasattr(instance, 'profile'):
-        instance.profile.save()
-    else:
-        # Create profile if it doesn't exist (edge case handling)
-        UserProfile.objects.create(user=instance)
\ No newline at end of file
+    UserProfile.objects.create_for(users)
@@ -0,0 +1,128 @@
+"""
+Role lookups for relationship_app.
+
+ROLES['STORAGE'] picks where role checks read from:
+
+- 'profile' (default): user.profile.role, one UserProfile query per
+  request;
+- 'bitmask': a small integer with one bit per role, cached under
+  role:<user id> for CACHE_TTL seconds. Saving or deleting a profile
+  drops the entry, again once the transaction commits, and the next
+  check reloads it; a warm check runs no query at all.
+
+Bulk UPDATEs of UserProfile.role skip signals and must call forget().
+Only pick 'bitmask' together with a shared cache backend (Memcached,
+Redis, database): the drop only reaches the cache of the process that
+saved the profile, so with a per-process LocMemCache the other workers
+keep serving a revoked role until CACHE_TTL runs out.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from LibraryProject import metrics
+
+from .models import UserProfile
+
+DEFAULTS = {
+    'STORAGE': 'profile',
+    'CACHE_TTL': 300,
+}
+
+ROLE_BITS = {'Admin': 1, 'Librarian': 2, 'Member': 4}
+BIT_ROLES = {bit: role for role, bit in ROLE_BITS.items()}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'ROLES', {}))
+    return config
+
+
+def cache_key(user_id):
+    return f'role:{user_id}'
+
+
+def role_bits(user):
+    """The user's role as a bitmask; 0 for anonymous users and no profile."""
+    if not user.is_authenticated:
+        return 0
+    # Memoised on the instance: one lookup per request however many checks
+    if hasattr(user, '_role_bits'):
+        return user._role_bits
+    config = get_config()
+    if config['STORAGE'] == 'profile':
+        try:
+            bits = ROLE_BITS.get(user.profile.role, 0)
+        except UserProfile.DoesNotExist:
+            bits = 0
+    else:
+        bits = cache.get(cache_key(user.pk))
+        metrics.record_cache('roles', bits is not None)
+        if bits is None:
+            role = UserProfile.objects.filter(user_id=user.pk).values_list('role', flat=True).first()
+            bits = ROLE_BITS.get(role, 0)
+            cache.set(cache_key(user.pk), bits, config['CACHE_TTL'])
+    user._role_bits = bits
+    return bits
+
+
+def get_role(user, default=None):
+    return BIT_ROLES.get(role_bits(user), default)
+
+
+def has_role(user, *roles):
+    mask = 0
+    for role in roles:
+        mask |= ROLE_BITS[role]
+    return bool(role_bits(user) & mask)
+
+
+def forget(user_ids):
+    keys = [cache_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    # A check made before the commit may have cached the old role again
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def backfill_profiles(batch_size=1000):
+    """
+    Give every user without a profile the default one, so role checks
+    never have to create it. Returns the number of profiles created.
+    """
+    User = UserProfile._meta.get_field('user').related_model
+    missing = User.objects.filter(profile__isnull=True).values_list('pk', flat=True)
+    created = 0
+    while True:
+        ids = list(missing[:batch_size])
+        if not ids:
+            return created
+        created += len(UserProfile.objects.bulk_create(UserProfile(user_id=pk) for pk in ids))
+
+
+def warm(queryset=None, batch_size=1000):
+    """Cache the role of every profile in queryset. Returns the count."""
+    queryset = UserProfile.objects.all() if queryset is None else queryset
+    ttl = get_config()['CACHE_TTL']
+    warmed = 0
+    batch = {}
+    for user_id, role in queryset.values_list('user_id', 'role').iterator(chunk_size=batch_size):
+        batch[cache_key(user_id)] = ROLE_BITS.get(role, 0)
+        if len(batch) >= batch_size:
+            cache.set_many(batch, ttl)
+            warmed += len(batch)
+            batch = {}
+    cache.set_many(batch, ttl)
+    return warmed + len(batch)
+
+
+@receiver(post_save, sender=UserProfile)
+def forget_saved_role(sender, instance, **kwargs):
+    forget([instance.user_id])
+
+
+@receiver(post_delete, sender=UserProfile)
+def forget_deleted_role(sender, instance, **kwargs):
+    forget([instance.user_id])
@@ -1,3 +1,557 @@
-from django.test import TestCase
+import datetime
+import io
+import tempfile
+import time
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.admin import site
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from LibraryProject import metrics, profiling, querywatch, replica
+from LibraryProject.perf import SCALES, TIMING, TIMING_SCALES, assert_constant_queries, assert_growth, query_budget, time_call
+from . import roles
+from .models import Author, Book, Library, Librarian, UserProfile
+
+User = get_user_model()
+
+
+class ViewPerformanceTestCase(TestCase):
+    """
+    Query budgets for the relationship_app views, with the Book table
+    seeded at each of perf.SCALES rows (PERF_SCALES=10,1000,100000 for a
+    larger run). Query counts must not depend on the number of books.
+    With PERF_TIMING=1, latency growth is checked at perf.TIMING_SCALES:
+    pages that list every book may grow linearly, the rest must stay flat.
+    """
+
+    # (url name, kwargs builder, max queries, max latency growth exponent).
+    # Every count includes 5 queries of request overhead: session and user
+    # lookup plus the session write (SESSION_SAVE_EVERY_REQUEST).
+    BUDGETS = [
+        ('relationship_app:member_dashboard', None, 6, 0.3),
+        ('relationship_app:list_books', None, 7, 1.3),
+        ('relationship_app:book_detail', 'book', 7, 0.3),
+        ('relationship_app:edit_book', 'book', 8, 0.3),
+        # The book counts are one aggregate over the library/book join
+        ('relationship_app:library_list', None, 6, 1.3),
+        ('relationship_app:library_detail', 'library', 9, 1.3),
+    ]
+
+    def setUp(self):
+        self.user = User.objects.create_superuser(username='perf', password='password123')
+        self.client.force_login(self.user)
+        self.authors = Author.objects.bulk_create(Author(name=f'Author {i}') for i in range(10))
+        self.library = Library.objects.create(name='Central', location='Main St')
+        Library.objects.bulk_create(Library(name=f'Branch {i}', location='Elsewhere') for i in range(4))
+        Librarian.objects.create(name='Head Librarian', library=self.library)
+        self.seeded = 0
+
+    def seed(self, rows):
+        """Grow the Book table to `rows` books, all held by self.library."""
+        books = Book.objects.bulk_create(
+            Book(
+                title=f'Book {i}',
+                author=self.authors[i % len(self.authors)],
+                publication_date=datetime.date(1900 + i % 120, 1, 1),
+                isbn=f'{i:013d}',
+                pages=100 + i % 400,
+                cover='paperback',
+            )
+            for i in range(self.seeded, rows)
+        )
+        Library.books.through.objects.bulk_create(
+            Library.books.through(library_id=self.library.pk, book_id=book.pk) for book in books
+        )
+        self.seeded = rows
+
+    def get_url(self, name, kwargs):
+        if kwargs == 'book':
+            return reverse(name, kwargs={'book_id': Book.objects.order_by('-pk').first().pk})
+        if kwargs == 'library':
+            return reverse(name, kwargs={'library_id': self.library.pk})
+        return reverse(name)
+
+    def test_views_within_budget_at_every_scale(self):
+        """Ensure query counts stay within budget and flat as the table grows."""
+        counts = {}
+        for rows in SCALES:
+            self.seed(rows)
+            for name, kwargs, max_queries, _ in self.BUDGETS:
+                url = self.get_url(name, kwargs)
+                with self.subTest(rows=rows, view=name):
+                    with query_budget(max_queries, label=name) as queries:
+                        response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+                counts.setdefault(name, {})[rows] = len(queries)
+
+        for name, count in counts.items():
+            with self.subTest(view=name):
+                assert_constant_queries(count, label=name)
+
+    @skipUnless(TIMING, 'wall-clock run: set PERF_TIMING=1 (seeds up to 100,000 books)')
+    def test_view_latency_growth(self):
+        """Ensure each view's p50 latency grows no faster than its allowed exponent."""
+        timings = {}
+        for rows in TIMING_SCALES:
+            self.seed(rows)
+            for name, kwargs, _, _ in self.BUDGETS:
+                url = self.get_url(name, kwargs)
+                runs = 3 if rows >= 10000 else 5
+                timings.setdefault(name, {})[rows] = time_call(lambda: self.client.get(url), runs=runs)
+
+        for name, _, _, max_exponent in self.BUDGETS:
+            with self.subTest(view=name):
+                assert_growth(timings[name], max_exponent, label=name)
+
+    def test_library_detail_lists_books_with_authors(self):
+        """Ensure the library page renders its books, count and librarian."""
+        self.seed(3)
+        response = self.client.get(reverse('relationship_app:library_detail', kwargs={'library_id': self.library.pk}))
+        self.assertContains(response, 'Total Books: 3')
+        self.assertContains(response, 'Librarian: Head Librarian')
+        self.assertContains(response, 'by Author 2')
+
+
+class BenchmarkSuiteTestCase(TestCase):
+    """
+    Smoke test for the benchmarks package on a tiny catalogue.
+    """
+
+    def test_generate_and_run_every_scenario(self):
+        """Ensure the generator fills every table and each scenario runs."""
+        from benchmarks import catalogue, runner
+
+        written = catalogue.generate(200, seed=1, batch_size=50)
+        self.assertEqual(written['relationship_app.Book'], 200)
+        self.assertEqual(Book.objects.count(), 200)
+        self.assertGreaterEqual(Library.books.through.objects.count(), 200)
+
+        result = runner.run(runs=1)
+        self.assertEqual(result['catalogue']['books'], 200)
+        self.assertEqual(set(result['scenarios']), set(runner.SCENARIOS))
+        for name, scenario in result['scenarios'].items():
+            with self.subTest(scenario=name):
+                self.assertGreater(scenario['queries'], 0)
+
+        rows = runner.compare(result, result)
+        self.assertTrue(all(change == 0 for _, _, _, change, _ in rows))
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_provisioning_benchmark_rolls_back(self):
+        """Ensure the users/s benchmark reports every process count and leaves no users."""
+        from benchmarks import provisioning
+
+        users_before = User.objects.count()
+        result = provisioning.run(users=4, process_counts=[1, 2])
+        self.assertEqual([r['processes'] for r in result['provisioning']], [1, 2])
+        self.assertTrue(all(r['users_per_second'] > 0 for r in result['provisioning']))
+        self.assertEqual(User.objects.count(), users_before)
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_login_benchmark_rolls_back(self):
+        """Ensure the logins/s benchmark reports both modes and leaves no users."""
+        from benchmarks import logins
+
+        users_before = User.objects.count()
+        result = logins.run(logins=3)
+        self.assertEqual(set(result['results']), {'password', 'session'})
+        self.assertTrue(all(r['logins_per_second'] > 0 for r in result['results'].values()))
+        self.assertEqual(User.objects.count(), users_before)
+
+
+@override_settings(PROFILING={'SAMPLE_RATE': 1.0, 'STORE_SIZE': 10, 'TOP_DUPLICATES': 3})
+class ProfilingMiddlewareTestCase(TestCase):
+    """
+    Test suite for the sampling profiler and its staff report.
+    """
+
+    def setUp(self):
+        profiling.store.clear()
+        self.staff = User.objects.create_superuser(username='staff', password='password123')
+        author = Author.objects.create(name='Author')
+        self.library = Library.objects.create(name='Central', location='Main St')
+        for i in range(3):
+            book = Book.objects.create(
+                title=f'Book {i}', author=author, publication_date=datetime.date(2000, 1, 1),
+                isbn=f'{i:013d}', pages=100, cover='paperback',
+            )
+            self.library.books.add(book)
+
+    def test_sampled_request_is_profiled(self):
+        """Ensure SQL, template time and the view name are recorded."""
+        self.client.force_login(self.staff)
+        self.client.get(reverse('relationship_app:library_detail', kwargs={'library_id': self.library.pk}))
+
+        record = profiling.store.all()[-1]
+        self.assertEqual(record['view'], 'relationship_app:library_detail')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['sql_count'], 0)
+        self.assertGreater(record['template_ms'], 0)
+        self.assertGreaterEqual(record['total_ms'], record['sql_ms'])
+
+    @override_settings(PROFILING={'SAMPLE_RATE': 0.0})
+    def test_unsampled_request_is_not_profiled(self):
+        """Ensure a zero sample rate records nothing."""
+        self.client.force_login(self.staff)
+        self.client.get(reverse('relationship_app:library_list'))
+        self.assertEqual(profiling.store.all(), [])
+
+    def test_duplicate_queries_are_counted(self):
+        """Ensure an N+1 loop shows up as one statement with a count."""
+        profile = profiling.Profile()
+        with connection.execute_wrapper(profile):
+            for book in Book.objects.all():
+                book.author.name
+        sql, count = profile.queries.most_common(1)[0]
+        self.assertEqual(count, 3)
+        self.assertIn('relationship_app_author', sql)
+
+    def test_report_is_staff_only(self):
+        """Ensure the report aggregates per view and needs a staff user."""
+        url = reverse('profiling_report')
+        member = User.objects.create_user(username='member', password='password123')
+        self.client.force_login(member)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(self.staff)
+        self.client.get(reverse('relationship_app:library_list'))
+        data = self.client.get(url, {'recent': 1}).json()
+        self.assertIn('relationship_app:library_list', [v['view'] for v in data['views']])
+        self.assertEqual(len(data['recent']), 1)
+
+
+class QueryWatchTestCase(TestCase):
+    """
+    Test suite for the repeated-query detector and per-view budgets.
+    """
+
+    def setUp(self):
+        self.staff = User.objects.create_superuser(username='staff', password='password123')
+        self.client.force_login(self.staff)
+        for i in range(6):
+            author = Author.objects.create(name=f'Author {i}')
+            Book.objects.create(
+                title=f'Book {i}', author=author, publication_date=datetime.date(2000, 1, 1),
+                isbn=f'{i:013d}', pages=100, cover='paperback',
+            )
+
+    def test_fingerprint_ignores_literals_and_in_list_length(self):
+        """Ensure statements differing only in values share a fingerprint."""
+        self.assertEqual(
+            querywatch.fingerprint("SELECT * FROM t WHERE id = 1 AND name = 'x'"),
+            querywatch.fingerprint("SELECT  *  FROM t WHERE id = 22 AND name = 'it''s'"),
+        )
+        self.assertEqual(
+            querywatch.fingerprint('SELECT * FROM t WHERE id IN (%s, %s)'),
+            querywatch.fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s, %s)'),
+        )
+
+    def test_repeated_queries_are_logged_with_view_name(self):
+        """Ensure an N+1 admin column is reported under its view."""
+        with self.assertLogs('LibraryProject.querywatch', 'WARNING') as logs:
+            self.client.get(reverse('admin:relationship_app_author_changelist'))
+        self.assertTrue(any(
+            'Repeated query in admin:relationship_app_author_changelist: 6 x' in line for line in logs.output
+        ))
+
+    @override_settings(QUERY_WATCH={'BUDGETS': {'relationship_app:library_list': 1}, 'RAISE': True})
+    def test_budget_raises_when_enforced(self):
+        """Ensure a view over its budget raises with RAISE on."""
+        with self.assertRaisesMessage(querywatch.QueryBudgetExceeded, 'relationship_app:library_list ran'):
+            self.client.get(reverse('relationship_app:library_list'))
+
+    @override_settings(QUERY_WATCH={'BUDGETS': {'relationship_app:library_list': 1}})
+    def test_budget_logs_by_default(self):
+        """Ensure a view over its budget is logged, not failed."""
+        with self.assertLogs('LibraryProject.querywatch', 'ERROR'):
+            response = self.client.get(reverse('relationship_app:library_list'))
+        self.assertEqual(response.status_code, 200)
+
+
+class MetricsTestCase(TestCase):
+    """
+    Test suite for the per-URL-name metrics exposed at /metrics.
+    """
+
+    def setUp(self):
+        metrics.registry.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(METRICS={'DIR': tmp.name, 'FLUSH_INTERVAL': 0, 'TOKEN': None})
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client.force_login(User.objects.create_user(username='reader', password='password123', is_staff=True))
+
+    def test_views_are_labelled_by_url_name(self):
+        """Ensure latency and query counters use the namespaced URL name."""
+        self.client.get(reverse('relationship_app:list_books'))
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('http_request_duration_seconds_count{view="relationship_app:list_books"} 1', body)
+        self.assertIn('db_queries_total{view="relationship_app:list_books"}', body)
+
+    def test_non_staff_need_the_token(self):
+        """Ensure /metrics is closed to anonymous and non-staff users by default."""
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        self.client.force_login(User.objects.create_user(username='member', password='password123'))
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+    def test_bearer_token_lets_scrapers_in(self):
+        """Ensure the configured token opens /metrics and any other value does not."""
+        self.client.logout()
+        with self.settings(METRICS={**metrics.get_config(), 'TOKEN': 'scrape-me'}):
+            url = reverse('metrics')
+            self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer scrape-me').status_code, 200)
+            self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer scrape-m').status_code, 403)
+
+    @override_settings(ROLES={'STORAGE': 'bitmask'})
+    def test_role_cache_lookups_are_counted(self):
+        """Ensure the role cache reports its misses and hits as cache_requests_total."""
+        cache.clear()
+        user = User.objects.create_user(username='librarian', password='password123', is_staff=True)
+        UserProfile.objects.filter(user=user).update(role='Librarian')
+        self.client.force_login(user)
+        for _ in range(2):
+            self.client.get(reverse('relationship_app:librarian_dashboard'))
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('cache_requests_total{cache="roles",result="miss"} 1', body)
+        self.assertIn('cache_requests_total{cache="roles",result="hit"} 1', body)
+
+
+@override_settings(REPLICA={'ENABLED': True, 'ALIAS': 'replica', 'STICKY_SECONDS': 5, 'COOKIE': 'db_primary_until'})
+class ReplicaRoutingTestCase(TestCase):
+    """
+    Test suite for read/write classification and sticky-primary routing.
+    The test database has no separate replica, so the router's decisions
+    are recorded and the queries still run on "default".
+    """
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_user(username='reader', password='password123'))
+        self.library = Library.objects.create(name='Central')
+        self.decisions = []
+        original = replica.PrimaryReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            self.decisions.append(original(router, model, **hints))
+            return 'default'
+
+        patcher = mock.patch.object(replica.PrimaryReplicaRouter, 'db_for_read', record)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_read_views_use_replica(self):
+        """Ensure list_books and library_detail read from the replica."""
+        self.client.get(reverse('relationship_app:list_books'))
+        self.client.get(reverse('relationship_app:library_detail', args=[self.library.pk]))
+        self.assertTrue(self.decisions)
+        self.assertEqual(set(self.decisions), {'replica'})
+
+    def test_other_views_use_primary(self):
+        """Ensure unclassified views and non-GET requests read from the primary."""
+        self.client.get(reverse('relationship_app:member_dashboard'))
+        self.client.post(reverse('relationship_app:list_books'))
+        self.assertEqual(set(self.decisions), {'default'})
+
+    def test_write_pins_client_to_primary(self):
+        """Ensure reads right after a write see the primary until the window ends."""
+        response = self.client.post(reverse('relationship_app:list_books'))
+        self.assertIn('db_primary_until', response.cookies)
+
+        self.decisions.clear()
+        self.client.get(reverse('relationship_app:list_books'))
+        self.assertEqual(set(self.decisions), {'default'})
+
+        self.client.cookies['db_primary_until'] = str(time.time() - 1)
+        self.decisions.clear()
+        self.client.get(reverse('relationship_app:list_books'))
+        self.assertEqual(set(self.decisions), {'replica'})
+
+
+class AdminChangelistCountTestCase(TestCase):
+    """
+    Test suite for the estimated and capped changelist counts.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser(username='admin', password='password123'))
+        for i in range(8):
+            User.objects.create_user(username=f'user{i}', password='password123')
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response, [q['sql'] for q in queries.captured_queries if 'COUNT(' in q['sql']]
+
+    def test_unfiltered_user_list_is_capped(self):
+        """Ensure the user changelist is counted once, over a LIMIT."""
+        response, counts = self.count_queries(reverse(f'admin:{User._meta.app_label}_{User._meta.model_name}_changelist'))
+        self.assertEqual(len(counts), 1)
+        self.assertIn('LIMIT', counts[0])
+        self.assertEqual(response.context['cl'].result_count, 9)
+
+    @override_settings(ADMIN_CHANGELIST={'COUNT_CAP': 5})
+    def test_filtered_profile_list_is_capped(self):
+        """Ensure a filtered profile count stops at the cap and is cached."""
+        url = reverse('admin:relationship_app_userprofile_changelist')
+        response, counts = self.count_queries(url, {'role': 'Member'})
+        self.assertEqual(len(counts), 1)
+        self.assertIn('LIMIT 6', counts[0])
+        self.assertContains(response, '5+ User Profiles')
+
+        _, counts = self.count_queries(url, {'role': 'Member'})
+        self.assertEqual(counts, [])
+
+        response, _ = self.count_queries(url, {'role': 'Admin'})
+        self.assertEqual(response.context['cl'].result_count, 0)
+
+
+@override_settings(ROLES={'STORAGE': 'bitmask'})
+class RoleStorageTestCase(TestCase):
+    """
+    Test suite for the cached role bitmask and the profile writes it saves.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='librarian', password='password123')
+        UserProfile.objects.filter(user=self.user).update(role='Librarian')
+        cache.clear()
+        self.client.force_login(self.user)
+        self.url = reverse('relationship_app:librarian_dashboard')
+
+    def profile_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        return response, [q for q in queries.captured_queries if 'relationship_app_userprofile' in q['sql']]
+
+    def test_warm_role_check_runs_no_profile_query(self):
+        """Ensure the role is read once, then served from the cache."""
+        response, queries = self.profile_queries()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('JOIN', queries[0]['sql'])
+
+        response, queries = self.profile_queries()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, [])
+
+    @override_settings(ROLES={})
+    def test_profile_storage_is_the_default(self):
+        """Ensure the bitmask cache is opt-in, since it needs a shared cache backend."""
+        self.assertEqual(roles.get_config()['STORAGE'], 'profile')
+
+    @override_settings(ROLES={'STORAGE': 'profile'})
+    def test_profile_storage_reads_every_request(self):
+        """Ensure the 'profile' storage keeps reading UserProfile per request."""
+        for _ in range(2):
+            response, queries = self.profile_queries()
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(queries), 1)
+
+    def test_saved_role_replaces_cached_one(self):
+        """Ensure saving or bulk-updating a profile is reflected in role checks."""
+        self.profile_queries()
+        profile = UserProfile.objects.get(user=self.user)
+        profile.role = 'Member'
+        profile.save()
+        response, queries = self.profile_queries()
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(queries), 1)
+
+        UserProfile.objects.filter(user=self.user).update(role='Librarian')
+        roles.forget([self.user.pk])
+        response, _ = self.profile_queries()
+        self.assertEqual(response.status_code, 200)
+
+    def test_rolled_back_save_leaves_no_cached_role(self):
+        """Ensure a profile save that is rolled back is never served from the cache."""
+        self.profile_queries()
+        with transaction.atomic():
+            profile = UserProfile.objects.get(user=self.user)
+            profile.role = 'Admin'
+            profile.save()
+            transaction.set_rollback(True)
+        self.assertIsNone(cache.get(roles.cache_key(self.user.pk)))
+        self.assertEqual(self.profile_queries()[0].status_code, 200)
+
+    def test_role_action_on_role_filtered_changelist_forgets_cache(self):
+        """Ensure demoting users selected by their old role drops their cached role."""
+        UserProfile.objects.filter(user=self.user).update(role='Admin')
+        roles.forget([self.user.pk])
+        self.assertTrue(roles.has_role(User.objects.get(pk=self.user.pk), 'Admin'))
+
+        model_admin = site._registry[UserProfile]
+        count, _ = model_admin.set_role(UserProfile.objects.filter(role='Admin'), 'Member')
+        self.assertEqual(count, 1)
+        self.assertIsNone(cache.get(roles.cache_key(self.user.pk)))
+        self.assertTrue(roles.has_role(User.objects.get(pk=self.user.pk), 'Member'))
+
+    def test_user_save_does_not_write_profile(self):
+        """Ensure saving a user with a profile writes nothing to UserProfile."""
+        user = User.objects.get(pk=self.user.pk)
+        user.profile  # already loaded, as after a role check
+        with CaptureQueriesContext(connection) as queries:
+            user.save()
+        self.assertFalse([q for q in queries.captured_queries if q['sql'].startswith('UPDATE "relationship_app_userprofile"')])
+
+    def test_backfill_roles_command(self):
+        """Ensure backfill_roles creates missing profiles and caches every role."""
+        UserProfile.objects.filter(user=self.user).delete()
+        out = io.StringIO()
+        call_command('backfill_roles', stdout=out)
+        self.assertIn('Created 1 missing profiles', out.getvalue())
+        self.assertEqual(cache.get(roles.cache_key(self.user.pk)), roles.ROLE_BITS['Member'])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ProfileSignalTestCase(TestCase):
+    """
+    Test suite for the UserProfile maintenance done on user saves.
+    """
+
+    def profile_queries(self, func):
+        with CaptureQueriesContext(connection) as queries:
+            result = func()
+        return result, [q['sql'] for q in queries.captured_queries if 'relationship_app_userprofile' in q['sql']]
+
+    def test_creating_user_is_one_profile_insert(self):
+        """Ensure a new user costs a single profile INSERT and no lookup."""
+        user, queries = self.profile_queries(lambda: User.objects.create_user(username='new', password='password123'))
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0].startswith('INSERT'))
+        self.assertEqual(UserProfile.objects.get(user=user).role, 'Member')
+
+    def test_login_touches_no_profile(self):
+        """Ensure the last_login update on login neither reads nor writes the profile."""
+        User.objects.create_user(username='reader', password='password123')
+        _, queries = self.profile_queries(lambda: self.client.login(username='reader', password='password123'))
+        self.assertEqual(queries, [])
+
+    def test_bulk_created_users_get_profiles_in_one_insert(self):
+        """Ensure bulk user provisioning creates every profile with one bulk_create."""
+        from bookshelf.provisioning import bulk_create_users
+
+        rows = [{'username': f'bulk{i}', 'password': 'secret'} for i in range(5)]
+        users, queries = self.profile_queries(lambda: bulk_create_users(User._default_manager, rows, processes=1))
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0].startswith('INSERT'))
+        self.assertEqual(UserProfile.objects.filter(user__in=users).count(), 5)
+
+    def test_profile_receivers_follow_auth_user_model(self):
+        """Ensure the profile receivers listen for AUTH_USER_MODEL, whichever model that is."""
+        from django.contrib.auth import get_user_model
+
+        from LibraryProject.signals import users_bulk_created
+
+        self.assertIs(UserProfile._meta.get_field('user').related_model, get_user_model())
+        self.assertTrue(users_bulk_created.has_listeners(get_user_model()))
+        self.assertTrue(post_save.has_listeners(get_user_model()))
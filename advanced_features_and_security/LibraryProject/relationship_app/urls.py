@@ -14,12 +14,16 @@ urlpatterns = [
     path('member/', views.member_view, name='member_dashboard'),
     
     # Book management URLs
-    path('books/', views.list_books, name='list_books'),
+    # bookshelf already serves books/ and is included first
+    path('books/all/', views.list_books, name='list_books'),
     path('add_book/', views.add_book, name='add_book'),
     path('edit_book/<int:book_id>/', views.edit_book, name='edit_book'),
     path('delete_book/<int:book_id>/', views.delete_book, name='delete_book'),
     
-    # Library detail view
+    path('books/<int:book_id>/', views.book_detail, name='book_detail'),
+    
+    # Library views
+    path('libraries/', views.library_list, name='library_list'),
     path('library/<int:library_id>/', views.library_detail, name='library_detail'),
     
     # Access control
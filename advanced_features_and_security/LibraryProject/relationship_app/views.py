@@ -4,12 +4,15 @@ from django.contrib.auth.decorators import permission_required
 from django.http import HttpResponseForbidden
 from django.contrib.auth.models import User
 from django.contrib import messages
+from django.db.models import Count
 from django import forms
 from django.views.generic.detail import DetailView
 from django.contrib.auth import login
 from django.contrib.auth.forms import UserCreationForm
 from .models import Book, Author, UserProfile, Library
 from .models import Library
+from LibraryProject.replica import replica_reads
+from .roles import get_role, has_role
 
 class BookForm(forms.ModelForm):
     """Form for creating and editing books"""
@@ -23,32 +26,17 @@ class BookForm(forms.ModelForm):
 
 def is_admin(user):
     """Check if user has Admin role"""
-    if not user.is_authenticated:
-        return False
-    try:
-        return user.profile.role == 'Admin'
-    except:
-        return False
+    return has_role(user, 'Admin')
 
 
 def is_librarian(user):
     """Check if user has Librarian role"""
-    if not user.is_authenticated:
-        return False
-    try:
-        return user.profile.role == 'Librarian'
-    except:
-        return False
+    return has_role(user, 'Librarian')
 
 
 def is_member(user):
     """Check if user has Member role"""
-    if not user.is_authenticated:
-        return False
-    try:
-        return user.profile.role == 'Member'
-    except:
-        return False
+    return has_role(user, 'Member')
 
 
 # Library detail view (class-based)
@@ -62,10 +50,7 @@ class LibraryDetailView(DetailView):
         context = super().get_context_data(**kwargs)
         # Add librarians associated with this library
         context['librarians'] = self.object.librarian_set.all()
-        if self.request.user.is_authenticated and hasattr(self.request.user, 'profile'):
-            context['user_role'] = self.request.user.profile.role
-        else:
-            context['user_role'] = 'Unknown'
+        context['user_role'] = get_role(self.request.user, 'Unknown')
         return context
 
 
@@ -89,35 +74,61 @@ def register(request):
     return render(request, 'relationship_app/register.html', context)
 
 
+@replica_reads
 @login_required
 def library_detail(request, library_id):
     """Display details of a specific library"""
     library = get_object_or_404(Library, id=library_id)
     # Get all librarians associated with this library
-    librarians = library.librarian_set.all()
+    librarians = list(library.librarian_set.all())
+    # One query for the books and their authors instead of one per book
+    books = list(library.books.select_related('author'))
     
     context = {
         'library': library,
         'librarians': librarians,
+        'librarian': librarians[0] if librarians else None,
+        'books': books,
+        'book_count': len(books),
         'user': request.user,
-        'user_role': request.user.profile.role if hasattr(request.user, 'profile') else 'Unknown',
+        'user_role': get_role(request.user, 'Unknown'),
     }
     return render(request, 'relationship_app/library_detail.html', context)
 
 
 # Book list view - accessible to all authenticated users
+@replica_reads
 @login_required
 def list_books(request):
     """Display list of all books"""
-    books = Book.objects.all()
+    books = Book.objects.select_related('author')
     context = {
         'books': books,
         'user': request.user,
-        'user_role': request.user.profile.role if hasattr(request.user, 'profile') else 'Unknown',
+        'user_role': get_role(request.user, 'Unknown'),
     }
     return render(request, 'relationship_app/list_books.html', context)
 
 
+@replica_reads
+@login_required
+def library_list(request):
+    """Display all libraries with their book counts"""
+    libraries = Library.objects.annotate(book_count=Count('books')).order_by('name')
+    return render(request, 'relationship_app/library_list.html', {'libraries': libraries})
+
+
+@replica_reads
+@login_required
+def book_detail(request, book_id):
+    """Display a book and the libraries that hold it"""
+    book = get_object_or_404(
+        Book.objects.select_related('author').prefetch_related('libraries'),
+        id=book_id,
+    )
+    return render(request, 'relationship_app/book_detail.html', {'book': book})
+
+
 # Permission-protected views for book operations
 @login_required
 @permission_required('relationship_app.can_add_book', raise_exception=True)
@@ -142,7 +153,7 @@ def add_book(request):
         'page_title': 'Add New Book',
         'action': 'Add',
         'user': request.user,
-        'user_role': request.user.profile.role if hasattr(request.user, 'profile') else 'Unknown',
+        'user_role': get_role(request.user, 'Unknown'),
     }
     return render(request, 'relationship_app/add_book.html', context)
 
@@ -168,7 +179,7 @@ def edit_book(request, book_id):
         'page_title': f'Edit "{book.title}"',
         'action': 'Edit',
         'user': request.user,
-        'user_role': request.user.profile.role if hasattr(request.user, 'profile') else 'Unknown',
+        'user_role': get_role(request.user, 'Unknown'),
     }
     return render(request, 'relationship_app/edit_book.html', context)
 
@@ -189,7 +200,7 @@ def delete_book(request, book_id):
         'book': book,
         'page_title': f'Delete "{book.title}"',
         'user': request.user,
-        'user_role': request.user.profile.role if hasattr(request.user, 'profile') else 'Unknown',
+        'user_role': get_role(request.user, 'Unknown'),
     }
     return render(request, 'relationship_app/delete_book.html', context)
 
@@ -201,7 +212,7 @@ def admin_view(request):
     """Admin-only view"""
     context = {
         'user': request.user,
-        'role': request.user.profile.role,
+        'role': get_role(request.user),
         'page_title': 'Admin Dashboard',
         'welcome_message': f'Welcome {request.user.username}! You have administrator privileges.',
     }
@@ -215,7 +226,7 @@ def librarian_view(request):
     """Librarian-only view"""
     context = {
         'user': request.user,
-        'role': request.user.profile.role,
+        'role': get_role(request.user),
         'page_title': 'Librarian Dashboard',
         'welcome_message': f'Welcome {request.user.username}! You have librarian access.',
     }
@@ -229,7 +240,7 @@ def member_view(request):
     """Member-only view"""
     context = {
         'user': request.user,
-        'role': request.user.profile.role,
+        'role': get_role(request.user),
         'page_title': 'Member Dashboard',
         'welcome_message': f'Welcome {request.user.username}! You have member access.',
     }
@@ -241,7 +252,7 @@ def access_denied_view(request):
     """View to display when user doesn't have permission"""
     context = {
         'message': 'You do not have permission to access this page.',
-        'user_role': request.user.profile.role if request.user.is_authenticated and hasattr(request.user, 'profile') else 'Unknown'
+        'user_role': get_role(request.user, 'Unknown')
     }
     return render(request, 'relationship_app/access_denied.html', context, status=403)
 
@@ -249,7 +260,7 @@ def access_denied_view(request):
 @login_required
 def home_view(request):
     """Home view that shows different content based on user role"""
-    user_role = request.user.profile.role if hasattr(request.user, 'profile') else 'No Role'
+    user_role = get_role(request.user, 'No Role')
     
     context = {
         'user': request.user,
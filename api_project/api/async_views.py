@@ -0,0 +1,100 @@
+"""
+Async (ASGI) versions of BookViewSet.list and BookViewSet.retrieve.
+
+Authentication, permissions and throttling are BookViewSet's own, run
+once per request in a worker thread (token lookups are usually served by
+the token cache). The Book queries run on Django's async ORM.
+
+The list uses keyset pagination on id (?after=<id>&page_size=<n>) rather
+than BookCursorPagination's opaque cursor, because that paginator
+evaluates querysets synchronously.
+"""
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+from rest_framework.exceptions import APIException
+
+from .models import Book
+from .pagination import BookCursorPagination
+from .serializers import BookSerializer
+from .views import BookViewSet
+
+
+def _check_access(request, action):
+    """
+    Run BookViewSet's authentication, permission and throttle checks.
+    Returns an error JsonResponse, or None when the request may proceed.
+    """
+    view = BookViewSet(action=action, action_map={'get': action}, format_kwarg=None)
+    view.setup(request)
+    drf_request = view.initialize_request(request)
+    view.request = drf_request
+    try:
+        view.initial(drf_request)
+    except APIException as exc:
+        response = view.handle_exception(exc)
+        json_response = JsonResponse(response.data, status=response.status_code)
+        for header in ('WWW-Authenticate', 'Retry-After'):
+            if header in response:
+                json_response[header] = response[header]
+        return json_response
+    return None
+
+
+check_access = sync_to_async(_check_access)
+
+
+class AsyncBookList(View):
+    """
+    GET: Books ordered by id, keyset-paginated with ?after=<id>.
+    """
+    replica_reads = True
+    page_size = BookCursorPagination.page_size
+    max_page_size = BookCursorPagination.max_page_size
+
+    def get_int_param(self, request, name, default):
+        try:
+            return int(request.GET.get(name, default))
+        except ValueError:
+            return None
+
+    async def get(self, request):
+        denied = await check_access(request, 'list')
+        if denied is not None:
+            return denied
+
+        after = self.get_int_param(request, 'after', 0)
+        page_size = self.get_int_param(request, 'page_size', self.page_size)
+        if after is None or page_size is None or page_size < 1:
+            return JsonResponse({'detail': 'after and page_size must be positive integers.'}, status=400)
+        page_size = min(page_size, self.max_page_size)
+
+        queryset = Book.objects.filter(id__gt=after).order_by('id')
+        books = [book async for book in queryset[:page_size + 1]]
+        has_more = len(books) > page_size
+        books = books[:page_size]
+
+        next_url = None
+        if has_more:
+            next_url = request.build_absolute_uri(f'{request.path}?after={books[-1].pk}&page_size={page_size}')
+        return JsonResponse({
+            'next': next_url,
+            'results': BookSerializer(books, many=True).data,
+        })
+
+
+class AsyncBookDetail(View):
+    """
+    GET: A single book by id.
+    """
+    replica_reads = True
+
+    async def get(self, request, pk):
+        denied = await check_access(request, 'retrieve')
+        if denied is not None:
+            return denied
+
+        book = await Book.objects.filter(pk=pk).afirst()
+        if book is None:
+            return JsonResponse({'detail': 'No Book matches the given query.'}, status=404)
+        return JsonResponse(BookSerializer(book).data)
@@ -0,0 +1,165 @@
+"""
+Token authentication with an in-process cache of token -> user lookups.
+
+TokenAuthentication joins authtoken_token to auth_user on every request.
+CachedTokenAuthentication keeps recent resolutions in a bounded LRU with a
+TTL, so repeat callers skip that query entirely.
+
+Invalidation: deleting a token (which is also how tokens are regenerated),
+deleting a user, and saving a user with a changed password, is_active,
+is_staff or is_superuser evict the affected entries in this process.
+Other worker processes keep their entries until the TTL expires, so the
+TTL is the upper bound on how long a revoked token or deactivated user can
+still authenticate elsewhere. Keep it short.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+DEFAULTS = {
+    'MAX_SIZE': 10000,
+    'TTL': 60,  # seconds
+}
+
+# A user save evicts cached tokens only when one of these changed
+AUTH_FIELDS = frozenset({'password', 'is_active', 'is_staff', 'is_superuser'})
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'TOKEN_AUTH_CACHE', {}))
+    return config
+
+
+class TokenCache:
+    """
+    Thread-safe LRU mapping of token key -> (user, token, expires_at), with
+    an index of user id -> keys so evicting a user never scans the cache.
+    max_size and ttl default to TOKEN_AUTH_CACHE, read on each use.
+    """
+
+    def __init__(self, max_size=None, ttl=None):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries = OrderedDict()
+        self._by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_size(self):
+        return self._max_size if self._max_size is not None else get_config()['MAX_SIZE']
+
+    @property
+    def ttl(self):
+        return self._ttl if self._ttl is not None else get_config()['TTL']
+
+    def _discard(self, key):
+        # Caller holds the lock
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._by_user.get(entry[0].pk)
+            keys.discard(key)
+            if not keys:
+                del self._by_user[entry[0].pk]
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] <= now:
+                if entry is not None:
+                    self._discard(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def set(self, key, user, token):
+        max_size, ttl = self.max_size, self.ttl
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (user, token, time.monotonic() + ttl)
+            self._by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > max_size:
+                self._discard(next(iter(self._entries)))
+
+    def evict(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def evict_user(self, user_id):
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._discard(key)
+
+    def user_changed(self, user, update_fields=None):
+        """
+        Evict user's entries if a field in AUTH_FIELDS differs from the
+        cached copy. Saves that list only other fields (update_last_login
+        saves just last_login) return without taking the lock.
+        """
+        if update_fields is not None and not AUTH_FIELDS.intersection(update_fields):
+            return
+        with self._lock:
+            for key in list(self._by_user.get(user.pk, ())):
+                cached = self._entries[key][0]
+                if any(getattr(cached, field) != getattr(user, field) for field in AUTH_FIELDS):
+                    self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for TokenAuthentication backed by token_cache.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            user, token = cached
+            # Hand each request its own copy so per-request attributes
+            # set on request.user never leak into other requests.
+            return copy.copy(user), token
+
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, token)
+        return copy.copy(user), token
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    token_cache.evict(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+def evict_changed_user(sender, instance, update_fields=None, **kwargs):
+    token_cache.user_changed(instance, update_fields)
+
+
+@receiver(post_delete, sender=get_user_model())
+def evict_deleted_user(sender, instance, **kwargs):
+    token_cache.evict_user(instance.pk)
@@ -0,0 +1,60 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from api.authentication import CachedTokenAuthentication, token_cache
+from api.views import BookViewSet
+
+
+class Command(BaseCommand):
+    help = 'Benchmark authenticated requests per second with and without the token cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=2000,
+            help='Number of authenticated GET /api/books_all/ requests per run',
+        )
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        factory = APIRequestFactory(SERVER_NAME='localhost')
+
+        # Everything happens in a transaction that is rolled back at the end
+        with transaction.atomic():
+            user = User.objects.create_user(username='bench_token_auth_user')
+            token = Token.objects.create(user=user)
+
+            for authentication_class in (TokenAuthentication, CachedTokenAuthentication):
+                token_cache.clear()
+                view = BookViewSet.as_view(
+                    {'get': 'list'},
+                    authentication_classes=[authentication_class],
+                    throttle_classes=[],
+                )
+
+                def request():
+                    response = view(factory.get('/api/books_all/', HTTP_AUTHORIZATION=f'Token {token.key}'))
+                    assert response.status_code == 200, response.status_code
+
+                request()  # warm-up
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    for _ in range(count):
+                        request()
+                    elapsed = time.perf_counter() - start
+
+                self.stdout.write(
+                    f"{authentication_class.__name__:<28} "
+                    f"{count / elapsed:>9.0f} req/s  "
+                    f"{len(ctx.captured_queries) / count:.2f} queries/request"
+                )
+
+            transaction.set_rollback(True)
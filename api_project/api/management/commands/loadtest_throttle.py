@@ -0,0 +1,92 @@
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from api.views import BookViewSet
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = 'Load test TokenBucketThrottle: fair client latency with and without a flooding client'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per phase')
+        parser.add_argument('--fair-clients', type=int, default=4, help='Number of well-behaved clients')
+        parser.add_argument('--fair-rate', type=float, default=5.0, help='Requests per second per fair client')
+        parser.add_argument('--flood-threads', type=int, default=4, help='Threads sharing the flooding token')
+        parser.add_argument('--rate', type=float, default=10.0, help='Throttle refill rate (tokens/second)')
+        parser.add_argument('--burst', type=int, default=20, help='Throttle bucket capacity')
+
+    def handle(self, *args, **options):
+        self.factory = APIRequestFactory(SERVER_NAME='localhost')
+        self.view = BookViewSet.as_view({'get': 'list'})
+
+        users = [User.objects.create_user(username=f'loadtest_throttle_{i}') for i in range(options['fair_clients'] + 1)]
+        try:
+            tokens = [Token.objects.create(user=user) for user in users]
+            fair_tokens, flood_token = tokens[:-1], tokens[-1]
+            throttle_config = {'RATE': options['rate'], 'BURST': options['burst']}
+
+            with override_settings(TOKEN_BUCKET_THROTTLE=throttle_config):
+                for label, flood_threads in (('fair clients only', 0), ('fair clients + flood', options['flood_threads'])):
+                    cache.clear()
+                    fair, flood = self.run_phase(fair_tokens, flood_token, flood_threads, options)
+                    self.report(label, fair, flood)
+        finally:
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def request(self, token):
+        start = time.perf_counter()
+        response = self.view(self.factory.get('/api/books_all/', HTTP_AUTHORIZATION=f'Token {token.key}'))
+        return response.status_code, time.perf_counter() - start
+
+    def run_phase(self, fair_tokens, flood_token, flood_threads, options):
+        deadline = time.perf_counter() + options['duration']
+        interval = 1.0 / options['fair_rate']
+        fair, flood = [], []
+
+        def fair_client(token):
+            next_at = time.perf_counter()
+            while time.perf_counter() < deadline:
+                fair.append(self.request(token))
+                next_at += interval
+                time.sleep(max(0.0, next_at - time.perf_counter()))
+            connection.close()
+
+        def flood_client():
+            while time.perf_counter() < deadline:
+                flood.append(self.request(flood_token))
+            connection.close()
+
+        threads = [threading.Thread(target=fair_client, args=(token,)) for token in fair_tokens]
+        threads += [threading.Thread(target=flood_client) for _ in range(flood_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return fair, flood
+
+    def report(self, label, fair, flood):
+        latencies = [elapsed * 1000 for _, elapsed in fair]
+        fair_ok = sum(1 for code, _ in fair if code == 200)
+        self.stdout.write(self.style.SUCCESS(label))
+        self.stdout.write(
+            f"  fair:  {len(fair)} requests, {fair_ok} OK, "
+            f"p50 {percentile(latencies, 50):.2f} ms, p95 {percentile(latencies, 95):.2f} ms"
+        )
+        if flood:
+            throttled = sum(1 for code, _ in flood if code == 429)
+            self.stdout.write(f"  flood: {len(flood)} requests, {throttled} throttled (429)")
@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+
+class BookCursorPagination(CursorPagination):
+    """
+    Keyset pagination on the primary key: each page is an index range
+    scan, and unlike page numbers there is no COUNT(*) over the table.
+    """
+    ordering = 'id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
@@ -0,0 +1,69 @@
+"""
+Query-count regression harness for view tests.
+
+- query_budget: context manager / decorator failing when a block runs
+  more queries than allowed (catches N+1 regressions)
+- assert_constant_queries: fails when a view's query count grows
+  across data scales (catches queries issued per row)
+- SCALES: row counts to seed; override with PERF_SCALES=10,1000,100000
+
+Only query counts are asserted: they are deterministic, while wall-clock
+timings in a shared test run are not.
+"""
+import os
+from contextlib import ContextDecorator
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+SCALES = tuple(int(n) for n in os.environ.get('PERF_SCALES', '10,1000').split(','))
+
+
+class query_budget(ContextDecorator):
+    """
+    Fail if the wrapped block runs more than max_queries queries.
+
+        with query_budget(2):
+            client.get(url)
+
+        @query_budget(1)
+        def test_detail(self): ...
+    """
+
+    def __init__(self, max_queries, using=DEFAULT_DB_ALIAS, label=None):
+        self.max_queries = max_queries
+        self.using = using
+        self.label = label
+
+    def __enter__(self):
+        self.context = CaptureQueriesContext(connections[self.using])
+        self.context.__enter__()
+        return self.context
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.context.__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return False
+        executed = len(self.context)
+        if executed > self.max_queries:
+            queries = '\n'.join(
+                f'{i}. {query["sql"]}' for i, query in enumerate(self.context.captured_queries, start=1)
+            )
+            raise AssertionError(
+                f'{self.label or "Block"} ran {executed} queries, budget is {self.max_queries}:\n{queries}'
+            )
+        return False
+
+
+def assert_constant_queries(counts, label='View'):
+    """
+    counts maps rows -> queries executed. Fail if the count grows between
+    any two consecutive scales; a drop (a cache warmed by the first
+    request) is fine.
+    """
+    scales = sorted(counts)
+    for small, large in zip(scales, scales[1:]):
+        if counts[large] > counts[small]:
+            raise AssertionError(
+                f'{label} ran {counts[small]} queries at {small} rows but {counts[large]} at {large} rows'
+            )
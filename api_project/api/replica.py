@@ -0,0 +1,135 @@
+"""
+Read-replica routing.
+
+With REPLICA['ENABLED'] and a "replica" entry in DATABASES,
+PrimaryReplicaRouter sends every write to "default". Reads go to the
+replica only while ReplicaRoutingMiddleware has classified the current
+request as a replica read:
+
+- viewset actions listed in replica_read_actions
+- other class-based views with replica_reads = True
+
+and only for GET/HEAD requests from clients outside their sticky window.
+Any other request (POST, PUT, PATCH, DELETE) pins its client to the
+primary for REPLICA['STICKY_SECONDS'] with a cookie. The client then
+reads its own writes even while the replica lags.
+
+There is no replication here: DJANGO_READ_REPLICA=1 points "replica" at
+the primary's own SQLite file, which exercises the routing locally. In
+production, point DATABASES['replica'] at a real replica. Tests mirror
+"default" (TEST['MIRROR']).
+"""
+import contextvars
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+# True while the current request may read from the replica
+replica_allowed = contextvars.ContextVar('replica_allowed', default=False)
+
+
+def get_config():
+    config = {
+        'ENABLED': False,
+        'ALIAS': 'replica',
+        'STICKY_SECONDS': 5,
+        'COOKIE': 'db_primary_until',
+    }
+    config.update(getattr(settings, 'REPLICA', {}))
+    return config
+
+
+def is_replica_view(view_func, method):
+    """Read/write classification for a resolved view."""
+    if method not in SAFE_METHODS:
+        return False
+    # DRF viewsets: as_view({'get': 'list'}) exposes cls and actions
+    actions = getattr(view_func, 'actions', None)
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if actions and view_class is not None:
+        return actions.get(method.lower()) in getattr(view_class, 'replica_read_actions', ())
+    return bool(view_class is not None and getattr(view_class, 'replica_reads', False))
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        config = get_config()
+        if replica_allowed.get() and config['ENABLED']:
+            return config['ALIAS']
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Classifies each request for PrimaryReplicaRouter and pins writers to
+    the primary. Runs in either mode, so under ASGI a request to an async
+    view does not hop through a sync thread for the classification.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Django adapts process_view to the handler's mode
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = replica_allowed.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_allowed.reset(token)
+        return self.pin_writer(request, response)
+
+    async def __acall__(self, request):
+        token = replica_allowed.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            replica_allowed.reset(token)
+        return self.pin_writer(request, response)
+
+    def pin_writer(self, request, response):
+        if request.method not in SAFE_METHODS:
+            config = get_config()
+            response.set_cookie(
+                config['COOKIE'],
+                str(time.time() + config['STICKY_SECONDS']),
+                max_age=config['STICKY_SECONDS'],
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def is_pinned(self, request):
+        try:
+            return float(request.COOKIES.get(get_config()['COOKIE'], 0)) > time.time()
+        except ValueError:
+            return False
+
+    def classify(self, request, view_func):
+        if is_replica_view(view_func, request.method) and not self.is_pinned(request):
+            replica_allowed.set(True)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.classify(request, view_func)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.classify(request, view_func)
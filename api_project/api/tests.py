@@ -1,3 +1,317 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import resolve, reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from .authentication import TokenCache, token_cache
+from .models import Book
+from .perf import SCALES, assert_constant_queries, query_budget
+from .replica import PrimaryReplicaRouter, is_replica_view
+
+
+class CachedTokenAuthenticationTestCase(APITestCase):
+    """
+    Test suite for CachedTokenAuthentication and its invalidation.
+    """
+
+    def setUp(self):
+        token_cache.clear()
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password123")
+        self.token = Token.objects.create(user=self.user)
+        self.url = reverse("book_all-list")
+
+    def get(self, key=None):
+        return self.client.get(self.url, HTTP_AUTHORIZATION=f"Token {key or self.token.key}")
+
+    def test_repeat_request_skips_token_lookup(self):
+        """Ensure only the first request resolves the token in the database."""
+        with self.assertNumQueries(2):  # token+user join, book list
+            self.assertEqual(self.get().status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(1):  # book list only
+            self.assertEqual(self.get().status_code, status.HTTP_200_OK)
+
+    def test_deleted_token_is_rejected(self):
+        """Ensure deleting (or regenerating) a token evicts it from the cache."""
+        self.get()
+        old_key = self.token.key
+        self.token.delete()
+        Token.objects.create(user=self.user)
+        self.assertEqual(self.get(old_key).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        """Ensure deactivating a user evicts their cached tokens."""
+        self.get()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_unrelated_user_save_keeps_cached_token(self):
+        """Ensure saves that leave the auth fields alone (e.g. last_login) keep the entry."""
+        self.get()
+        self.user.last_login = self.user.date_joined
+        self.user.save(update_fields=["last_login"])
+        self.user.first_name = "Test"
+        self.user.save()
+        self.assertEqual(len(token_cache), 1)
+        with self.assertNumQueries(1):  # book list only
+            self.assertEqual(self.get().status_code, status.HTTP_200_OK)
+
+    def test_password_change_evicts_only_that_user(self):
+        """Ensure a password change evicts the user's tokens and no one else's."""
+        other = User.objects.create_user(username="other", password="password123")
+        other_token = Token.objects.create(user=other)
+        self.get()
+        self.get(other_token.key)
+        self.user.set_password("changed456")
+        self.user.save()
+        self.assertIsNone(token_cache.get(self.token.key))
+        self.assertIsNotNone(token_cache.get(other_token.key))
+
+    @override_settings(TOKEN_AUTH_CACHE={"TTL": 0})
+    def test_settings_are_read_on_use(self):
+        """Ensure TOKEN_AUTH_CACHE is read when entries are stored, not at import."""
+        self.get()
+        self.assertIsNone(token_cache.get(self.token.key))
+
+    def test_cache_is_bounded_and_expires(self):
+        """Ensure the LRU drops the oldest entry and entries expire after the TTL."""
+        cache = TokenCache(max_size=2, ttl=60)
+        for key in ("a", "b", "c"):
+            cache.set(key, self.user, None)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 2)
+
+        expired = TokenCache(max_size=2, ttl=0)
+        expired.set("a", self.user, None)
+        self.assertIsNone(expired.get("a"))
+
+
+class BookListingTestCase(APITestCase):
+    """
+    Test suite for the shared Book read path behind /api/books/ and /api/books_all/.
+    """
+
+    def setUp(self):
+        token_cache.clear()
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password123")
+        self.client.force_authenticate(self.user)
+        Book.objects.bulk_create(Book(title=f"Book {i}", author="Author") for i in range(60))
+
+    def test_both_routes_share_the_paginated_read_path(self):
+        """Ensure /books/ and /books_all/ return the same cursor-paginated page."""
+        books = self.client.get(reverse("book-list"))
+        books_all = self.client.get(reverse("book_all-list"))
+        self.assertEqual(books.status_code, status.HTTP_200_OK)
+        self.assertEqual(books.data["results"], books_all.data["results"])
+        self.assertEqual(len(books.data["results"]), 50)
+        self.assertIsNotNone(books.data["next"])
+
+    def test_page_size_param(self):
+        """Ensure clients can pick a page size up to max_page_size."""
+        response = self.client.get(reverse("book-list"), {"page_size": 10})
+        self.assertEqual(len(response.data["results"]), 10)
+        response = self.client.get(reverse("book-list"), {"page_size": 1000})
+        self.assertEqual(len(response.data["results"]), 60)
+
+    def test_cache_headers(self):
+        """Ensure successful GETs are privately cacheable and vary on Authorization."""
+        response = self.client.get(reverse("book_all-list"))
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("max-age=60", response["Cache-Control"])
+        self.assertIn("Authorization", response["Vary"])
+
+
+@override_settings(TOKEN_BUCKET_THROTTLE={"RATE": 1, "BURST": 3})
+class TokenBucketThrottleTestCase(APITestCase):
+    """
+    Test suite for TokenBucketThrottle.
+    """
+
+    def setUp(self):
+        token_cache.clear()
+        cache.clear()
+        self.token = Token.objects.create(user=User.objects.create_user(username="flood"))
+        self.other = Token.objects.create(user=User.objects.create_user(username="fair"))
+
+    def get(self, url_name, token):
+        return self.client.get(reverse(url_name), HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def test_burst_then_throttled_with_retry_after(self):
+        """Ensure requests beyond the burst get 429 with a Retry-After header."""
+        for _ in range(3):
+            self.assertEqual(self.get("book_all-list", self.token).status_code, status.HTTP_200_OK)
+        response = self.get("book_all-list", self.token)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "1")
+
+    def test_buckets_are_per_token_and_per_route(self):
+        """Ensure one flooding token does not drain other tokens or other routes."""
+        for _ in range(4):
+            self.get("book_all-list", self.token)
+        self.assertEqual(self.get("book_all-list", self.other).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get("book-list", self.token).status_code, status.HTTP_200_OK)
+
+    def test_throttled_request_makes_no_queries(self):
+        """Ensure a rejected request is decided without touching the database."""
+        for _ in range(3):
+            self.get("book_all-list", self.token)
+        with self.assertNumQueries(0):
+            response = self.get("book_all-list", self.token)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class AsyncBookViewsTestCase(TestCase):
+    """
+    Test suite for the async BookViewSet list/retrieve views.
+    """
+
+    def setUp(self):
+        token_cache.clear()
+        cache.clear()
+        self.token = Token.objects.create(user=User.objects.create_user(username="testuser"))
+        self.auth = {"Authorization": f"Token {self.token.key}"}
+        Book.objects.bulk_create(Book(title=f"Book {i}", author="Author") for i in range(5))
+
+    async def test_list_pages_with_keyset(self):
+        """Ensure the async list pages through books by id."""
+        url = reverse("book_all-list-async")
+        first = (await self.async_client.get(url, {"page_size": 3}, headers=self.auth)).json()
+        self.assertEqual(len(first["results"]), 3)
+        second = (await self.async_client.get(first["next"], headers=self.auth)).json()
+        self.assertEqual(len(second["results"]), 2)
+        self.assertIsNone(second["next"])
+        self.assertEqual(set(first["results"][0]), {"id", "title", "author"})
+
+    async def test_retrieve_matches_sync_view(self):
+        """Ensure the async retrieve returns the same payload as BookViewSet.retrieve."""
+        pk = (await Book.objects.afirst()).pk
+        sync = await self.async_client.get(reverse("book_all-detail", kwargs={"pk": pk}), headers=self.auth)
+        response = await self.async_client.get(reverse("book_all-detail-async", kwargs={"pk": pk}), headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), sync.json())
+
+    async def test_authentication_is_enforced(self):
+        """Ensure the async views apply BookViewSet's authentication."""
+        response = await self.async_client.get(reverse("book_all-list-async"))
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("WWW-Authenticate", response)
+
+
+@override_settings(TOKEN_BUCKET_THROTTLE={"RATE": 1000000, "BURST": 1000000})
+class BookViewPerformanceTestCase(TestCase):
+    """
+    Query budgets for the Book routes, with the table seeded at each of
+    perf.SCALES rows (PERF_SCALES=10,1000,100000 for a larger run). Every
+    route is paginated or a single-row lookup, so the query count may not
+    grow with the table.
+    """
+
+    # (url name, takes pk, max queries)
+    BUDGETS = [
+        ("book-list", False, 1),
+        ("book_all-list", False, 1),
+        ("book_all-detail", True, 1),
+        ("book_all-list-async", False, 1),
+        ("book_all-detail-async", True, 1),
+    ]
+
+    def setUp(self):
+        token_cache.clear()
+        cache.clear()
+        self.token = Token.objects.create(user=User.objects.create_user(username="testuser"))
+        self.auth = {"Authorization": f"Token {self.token.key}"}
+        self.seeded = 0
+
+    def seed(self, rows):
+        """Grow the Book table to `rows` rows."""
+        Book.objects.bulk_create(Book(title=f"Book {i}", author=f"Author {i % 50}") for i in range(self.seeded, rows))
+        self.seeded = rows
+
+    def test_routes_within_budget_at_every_scale(self):
+        """Ensure query counts stay within budget and flat as the table grows."""
+        # Resolve the token once so budgets measure the views, not auth
+        self.client.get(reverse("book-list"), headers=self.auth)
+
+        counts = {}
+        for rows in SCALES:
+            self.seed(rows)
+            pk = Book.objects.order_by("-pk").values_list("pk", flat=True).first()
+            for name, takes_pk, max_queries in self.BUDGETS:
+                url = reverse(name, kwargs={"pk": pk}) if takes_pk else reverse(name)
+                with self.subTest(rows=rows, view=name):
+                    with query_budget(max_queries, label=name) as queries:
+                        response = self.client.get(url, headers=self.auth)
+                    self.assertEqual(response.status_code, 200)
+                counts.setdefault(name, {})[rows] = len(queries)
+
+        for name, count in counts.items():
+            with self.subTest(view=name):
+                assert_constant_queries(count, label=name)
+
+
+@override_settings(REPLICA={'ENABLED': True, 'ALIAS': 'replica', 'STICKY_SECONDS': 5, 'COOKIE': 'db_primary_until'})
+class ReplicaRoutingTestCase(TestCase):
+    """
+    Test suite for read/write classification and sticky-primary routing.
+    The test database has no separate replica, so the router's decisions
+    are recorded and the queries still run on "default".
+    """
+
+    def setUp(self):
+        token_cache.clear()
+        cache.clear()
+        self.token = Token.objects.create(user=User.objects.create_user(username="testuser"))
+        self.auth = {"Authorization": f"Token {self.token.key}"}
+        self.book = Book.objects.create(title="Book", author="Author")
+        self.decisions = []
+        original = PrimaryReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            self.decisions.append(original(router, model, **hints))
+            return 'default'
+
+        patcher = mock.patch.object(PrimaryReplicaRouter, 'db_for_read', record)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_classification(self):
+        """Ensure list/retrieve reads are replica reads and everything else is not."""
+        detail = reverse("book_all-detail", kwargs={"pk": 1})
+        cases = [
+            (reverse("book-list"), "GET", True),
+            (reverse("book_all-list"), "GET", True),
+            (reverse("book_all-list"), "POST", False),
+            (detail, "GET", True),
+            (detail, "PUT", False),
+            (detail, "DELETE", False),
+            (reverse("book_all-list-async"), "GET", True),
+        ]
+        for url, method, expected in cases:
+            with self.subTest(url=url, method=method):
+                self.assertEqual(is_replica_view(resolve(url).func, method), expected)
+
+    def test_write_pins_client_to_primary(self):
+        """Ensure reads right after a write see the primary, then go back to the replica."""
+        self.client.get(reverse("book_all-list"), headers=self.auth)
+        self.assertEqual(set(self.decisions), {'replica'})
+
+        response = self.client.post(reverse("book_all-list"), {"title": "New", "author": "Author"}, headers=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn("db_primary_until", response.cookies)
+
+        self.decisions.clear()
+        self.client.get(reverse("book_all-list"), headers=self.auth)
+        self.assertEqual(set(self.decisions), {'default'})
+
+        self.client.cookies["db_primary_until"] = str(time.time() - 1)
+        self.decisions.clear()
+        self.client.get(reverse("book_all-list"), headers=self.auth)
+        self.assertEqual(set(self.decisions), {'replica'})
@@ -0,0 +1,75 @@
+"""
+Token-bucket throttling keyed per API token and per route.
+
+Each (client, route) pair owns a bucket holding up to BURST tokens that
+refills at RATE tokens per second; a request spends one token. Bucket
+state lives in the default cache, so a throttling decision never touches
+the database. With LocMemCache the buckets are per worker process; point
+CACHES at a shared backend to enforce one limit across workers.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Allows RATE requests per second on average with bursts up to BURST.
+    Rejected requests get a Retry-After of the time until the next token.
+    """
+    cache = cache
+    cache_prefix = 'throttle:bucket'
+    # get/set on the cache is not atomic; serialize updates in this process
+    lock = threading.Lock()
+
+    def __init__(self):
+        config = getattr(settings, 'TOKEN_BUCKET_THROTTLE', {})
+        self.rate = float(config.get('RATE', 10))
+        self.burst = float(config.get('BURST', 60))
+        self.retry_after = None
+
+    def get_client_ident(self, request):
+        """
+        Prefer the API token, then the user, then the client address.
+        Token keys are hashed so raw credentials never become cache keys.
+        """
+        token_key = getattr(request.auth, 'key', None)
+        if token_key:
+            return 'token:' + hashlib.sha256(token_key.encode()).hexdigest()[:32]
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return 'ip:' + self.get_ident(request)
+
+    def get_route(self, request, view):
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.view_name:
+            return match.view_name
+        return f"{view.__class__.__name__}.{getattr(view, 'action', None) or request.method}"
+
+    def get_cache_key(self, request, view):
+        return f'{self.cache_prefix}:{self.get_client_ident(request)}:{self.get_route(request, view)}'
+
+    def allow_request(self, request, view):
+        key = self.get_cache_key(request, view)
+        now = time.time()
+        # Idle buckets are full again after burst / rate seconds
+        timeout = int(self.burst / self.rate) + 1
+
+        with self.lock:
+            tokens, updated = self.cache.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+                self.retry_after = None
+            else:
+                self.retry_after = (1 - tokens) / self.rate
+            self.cache.set(key, (tokens, now), timeout)
+        return allowed
+
+    def wait(self):
+        return self.retry_after
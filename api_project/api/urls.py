@@ -1,14 +1,19 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import BookList, BookViewSet
+from .async_views import AsyncBookList, AsyncBookDetail
 
 router = DefaultRouter()
 router.register(r'books_all', BookViewSet, basename='book_all')
 
 urlpatterns = [
-    # Original read-only list endpoint
+    # Original read-only list endpoint (same read path as BookViewSet.list)
     path('books/', BookList.as_view(), name='book-list'),
 
+    # Async (ASGI) versions of BookViewSet.list / retrieve
+    path('async/books_all/', AsyncBookList.as_view(), name='book_all-list-async'),
+    path('async/books_all/<int:pk>/', AsyncBookDetail.as_view(), name='book_all-detail-async'),
+
     # All CRUD routes for BookViewSet
     path('', include(router.urls)),
 ]
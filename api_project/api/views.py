@@ -1,13 +1,33 @@
-from rest_framework import viewsets
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from rest_framework import generics, viewsets
 from .models import Book
+from .pagination import BookCursorPagination
 from .serializers import BookSerializer
 
-class BookViewSet(viewsets.ModelViewSet):
+
+class BookReadMixin:
+    """
+    Shared read path for every Book listing route (BookList and BookViewSet).
+    - Cursor-paginates on the primary key
+    - Lets clients cache successful GETs briefly; the cache is private
+      because every route requires authentication
+    """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
+    pagination_class = BookCursorPagination
+    cache_max_age = 60  # seconds
 
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method in ('GET', 'HEAD') and response.status_code == 200:
+            patch_cache_control(response, private=True, max_age=self.cache_max_age)
+            patch_vary_headers(response, ['Authorization'])
+        return response
+
+
+class BookViewSet(BookReadMixin, viewsets.ModelViewSet):
+    replica_read_actions = {'list', 'retrieve'}
 
-class BookList(generics.ListAPIView):
-    queryset = Book.objects.all()
-    serializer_class = BookSerializer
 
+class BookList(BookReadMixin, generics.ListAPIView):
+    replica_reads = True
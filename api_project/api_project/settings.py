@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.replica.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,11 +56,28 @@ MIDDLEWARE = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.TokenBucketThrottle',
+    ],
+}
+
+# Per-token, per-route token bucket (api/throttling.py).
+# Buckets live in the default cache, so no DB round trips.
+TOKEN_BUCKET_THROTTLE = {
+    'RATE': 10,   # tokens refilled per second
+    'BURST': 60,  # bucket capacity
+}
+
+# Token -> user lookups cached in each worker process.
+# TTL bounds how long a revoked token stays valid in *other* workers.
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 60,  # seconds
 }
 
 
@@ -92,6 +111,17 @@ DATABASES = {
     }
 }
 
+# Read replica routing, see api/replica.py
+REPLICA = {
+    'ENABLED': os.environ.get('DJANGO_READ_REPLICA') == '1',
+    'ALIAS': 'replica',
+    'STICKY_SECONDS': 5,
+}
+if REPLICA['ENABLED']:
+    DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['api.replica.PrimaryReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -1,7 +0,0 @@
-from rest_framework import generics
-from .models import Book
-from .serializers import BookSerializer
-
-class BookList(generics.ListAPIView):
-    queryset = Book.objects.all()
-    serializer_class = BookSerializer